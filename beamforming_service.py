@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import numpy as np
+
+from main import load_config
+from src.simulation.service import BeamformingService, make_replay_channels, run_replay, summarize_replay
+
+def print_stats(title, stats):
+    print(f"\n{title}")
+    for key, value in stats.items():
+        print(f"  {key}: {value:.2f}" if isinstance(value, float) else f"  {key}: {value}")
+
+async def serve(config, host, port):
+    service = BeamformingService(config)
+    server = await service.start_server(host, port)
+    print(f"Dịch vụ beamforming lắng nghe tại {host}:{port} "
+          f"(hạn chót {service.deadline * 1e3:.0f} ms, {service.n_workers} luồng solver)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        print_stats("Thống kê phía server:", service.stats.summary())
+        service.close()
+
+async def replay(config, host, port):
+    service_cfg = config['service']
+    channels = make_replay_channels(config, int(service_cfg['replay_cells']), int(service_cfg['replay_slots']))
+    n_slots, n_cells = channels.shape[:2]
+    print(f"Phát lại {n_slots} slot x {n_cells} cell, mỗi slot {service_cfg['replay_interval_ms']} ms")
+    results = await run_replay(host, port, channels, float(service_cfg['replay_interval_ms']) / 1e3)
+    print_stats("Thống kê phía client (RTT):", summarize_replay(results, n_slots * n_cells))
+
+async def load_test(config, host):
+    """Server + client replay trong cùng một event loop (port 0 = cổng trống bất kỳ)"""
+    service = BeamformingService(config)
+    server = await service.start_server(host, 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        await replay(config, host, port)
+    finally:
+        await service.stop(server)
+    print_stats("Thống kê phía server (độ trễ từ lúc nhận):", service.stats.summary())
+
+def run_service():
+    parser = argparse.ArgumentParser(description="Dịch vụ beamforming theo slot với hạn chót (mục 'service' trong config)")
+    parser.add_argument('mode', nargs='?', choices=('loadtest', 'serve', 'replay'), default='loadtest',
+                        help="loadtest: server + client replay cục bộ | serve: chỉ chạy server | "
+                             "replay: client phát lại kênh tới server đang chạy")
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--host', default=None)
+    parser.add_argument('--port', type=int, default=None)
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    host = args.host or config['service'].get('host', '127.0.0.1')
+    port = args.port if args.port is not None else int(config['service'].get('port', 8765))
+    # Seed cố định cho chuỗi kênh phát lại (nghiệm vẫn phụ thuộc thời gian do hạn chót)
+    seed = config['simulation'].get('seed')
+    if seed is not None:
+        np.random.seed(seed)
+
+    if args.mode == 'serve':
+        asyncio.run(serve(config, host, port))
+    elif args.mode == 'replay':
+        asyncio.run(replay(config, host, port))
+    else:
+        asyncio.run(load_test(config, host))
+
+if __name__ == "__main__":
+    run_service()
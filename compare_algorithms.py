@@ -5,9 +5,11 @@ from tqdm import tqdm
 # Import các module từ dự án của bạn
 from main import load_config
 from src.system_model.channel import ChannelModel
+from src.system_model.channel_dataset import load_channel
 from src.system_model.metrics import SystemMetrics
 from src.algorithms.abc_base import ArtificialBeeColony
 from src.algorithms.abc_variants import GbestABC
+from src.algorithms.precoders import PRECODERS, compute_precoder
 
 def run_comparison():
     # 1. Cấu hình hệ thống
@@ -21,7 +23,7 @@ def run_comparison():
     # 2. Tạo môi trường (QUAN TRỌNG: Cả 2 thuật toán phải chạy trên cùng 1 kênh H)
     print("1. Khởi tạo kênh truyền ngẫu nhiên...")
     channel_model = ChannelModel(M, K, N)
-    H = channel_model.generate_rayleigh_channel()
+    H = load_channel(config, 0, channel_model)
     metrics = SystemMetrics(config)
     
     # 3. Chạy thuật toán 1: ABC Gốc
@@ -33,9 +35,20 @@ def run_comparison():
     print("3. Đang chạy G-ABC (Gbest-guided)...")
     gabc_solver = GbestABC(config, H, metrics)
     fit_gabc, curve_gabc = gabc_solver.solve()
+    if gabc_solver.sensing is not None:
+        # Fitness gồm cả thành phần cảm biến => tách riêng 2 thành phần để so sánh
+        for label, solver in (('ABC', abc_solver), ('G-ABC', gabc_solver)):
+            sum_rate, sensing_gain = solver.objective_terms(solver.best_solution)
+            print(f"   {label}: Sum Rate {sum_rate:.4f} bps/Hz | độ lợi cảm biến chuẩn hóa {sensing_gain:.4f}")
     
-    # 5. Vẽ đồ thị so sánh trực quan
-    print("4. Đang vẽ đồ thị...")
+    # 5. Baseline: các precoder giải tích (nhanh nhất, không cần tối ưu lặp)
+    print("4. Baseline precoder giải tích (MRT / ZF / RZF / WMMSE)...")
+    for name in PRECODERS:
+        W = compute_precoder(name, H, config, metrics)
+        print(f"   Baseline {name.upper()}: {metrics.calculate_sum_rate(W, H):.4f} bps/Hz")
+    
+    # 6. Vẽ đồ thị so sánh trực quan
+    print("5. Đang vẽ đồ thị...")
     visualize_comparison(curve_abc, fit_abc, curve_gabc, fit_gabc)
 
 def visualize_comparison(curve1, final1, curve2, final2):
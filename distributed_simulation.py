@@ -0,0 +1,55 @@
+import copy
+import time
+
+from main import load_config
+from src.system_model.channel import ChannelModel
+from src.system_model.channel_dataset import load_channel
+from src.system_model.metrics import SystemMetrics
+from src.system_model.context import build_context
+from src.algorithms.abc_variants import GbestABC
+from src.algorithms.distributed import DistributedGABC
+
+def run_distributed_comparison():
+    config = load_config()
+    M = config['system']['M']
+    K = config['system']['K']
+    N = config['system']['N']
+    seed = config['simulation'].get('seed')
+    print("--- G-ABC PHÂN TÁN THEO CỤM AP vs G-ABC TẬP TRUNG ---")
+
+    channel_model = ChannelModel(M, K, N)
+    H = load_channel(config, 0, channel_model)
+    metrics = SystemMetrics(config)
+
+    # 1. Phân tán: mỗi cụm một colony cục bộ, chỉ trao đổi ma trận độ lợi (K, K)
+    distributed = DistributedGABC(config, H, seed=seed)
+    start = time.perf_counter()
+    dist_fit, _ = distributed.solve()
+    dist_time = time.perf_counter() - start
+    summary = distributed.exchange_summary()
+
+    # 2. So sánh: 1 colony tập trung trên cả tensor (M, K, N), cùng ngân sách đánh giá
+    central_config = copy.deepcopy(config)
+    central_config['algorithm']['max_cycle'] = distributed.rounds * distributed.local_cycles * len(distributed.clusters)
+    central_config['algorithm']['max_evaluations'] = distributed.n_evaluations
+    central = GbestABC(central_config, H, metrics, build_context(H, central_config, channel_model.beta))
+    start = time.perf_counter()
+    central_fit, _ = central.solve()
+    central_time = time.perf_counter() - start
+    central.close()
+
+    print(f"\nPhân tán ({summary['n_clusters']} cụm, transport {config['distributed']['transport']}): "
+          f"{dist_fit:.4f} bps/Hz trong {dist_time:.2f} s ({distributed.n_evaluations} lần đánh giá)")
+    print(f"Tập trung ({len(central.convergence_curve)} vòng lặp): {central_fit:.4f} bps/Hz "
+          f"trong {central_time:.2f} s ({central.n_evaluations} lần đánh giá)")
+
+    print(f"\nTrao đổi mỗi vòng ({summary['rounds']} vòng):")
+    print(f"  xuống (điều phối -> cụm): {summary['bytes_down_per_round']:.0f} bytes")
+    print(f"  lên (cụm -> điều phối):   {summary['bytes_up_per_round']:.0f} bytes")
+    print(f"  thời gian: {summary['seconds_per_round'] * 1e3:.2f} ms "
+          f"(tính toán cụm chậm nhất {summary['compute_seconds_per_round'] * 1e3:.2f} ms)")
+    print(f"Gom các khối W_c khi kết thúc: {summary['collection_bytes']} bytes")
+    print(f"Tham chiếu - gom toàn bộ kênh H về trung tâm: {summary['centralized_channel_bytes']} bytes")
+
+if __name__ == "__main__":
+    run_distributed_comparison()
@@ -0,0 +1,48 @@
+import copy
+import time
+
+from main import load_config
+from src.system_model.channel import ChannelModel
+from src.system_model.channel_dataset import load_channel
+from src.system_model.metrics import SystemMetrics
+from src.system_model.context import build_context
+from src.algorithms.abc_variants import GbestABC
+from src.algorithms.island import IslandModelGABC
+from src.utils.visualization import plot_island_convergence
+
+def run_island_comparison():
+    config = load_config()
+    M = config['system']['M']
+    K = config['system']['K']
+    N = config['system']['N']
+    seed = config['simulation'].get('seed')
+    print("--- MÔ HÌNH ĐẢO (ISLAND MODEL) G-ABC vs 1 QUẦN THỂ LỚN ---")
+    
+    channel_model = ChannelModel(M, K, N)
+    H = load_channel(config, 0, channel_model)
+    metrics = SystemMetrics(config)
+    
+    # 1. Mô hình đảo: n_islands quần thể, mỗi quần thể pop_size con ong
+    islands = IslandModelGABC(config, H, channel_model.beta, seed=seed)
+    start = time.perf_counter()
+    island_fit, _ = islands.solve()
+    island_time = time.perf_counter() - start
+    
+    # 2. So sánh: 1 quần thể có cùng tổng số con ong, cùng số vòng lặp
+    single_config = copy.deepcopy(config)
+    single_config['algorithm']['pop_size'] = config['algorithm']['pop_size'] * islands.n_islands
+    single = GbestABC(single_config, H, metrics, build_context(H, single_config, channel_model.beta))
+    start = time.perf_counter()
+    single_fit, single_curve = single.solve()
+    single_time = time.perf_counter() - start
+    
+    print(f"\nIsland model ({islands.n_islands} đảo, {islands.topology}): {island_fit:.4f} bps/Hz "
+          f"trong {island_time:.2f} s ({islands.n_evaluations} lần đánh giá)")
+    print(f"1 quần thể (SN = {single.pop_size}): {single_fit:.4f} bps/Hz "
+          f"trong {single_time:.2f} s ({single.n_evaluations} lần đánh giá)")
+    
+    psi_values = [result['psi'] for result in islands.island_results]
+    plot_island_convergence(islands.island_curves, psi_values, single_curve)
+
+if __name__ == "__main__":
+    run_island_comparison()
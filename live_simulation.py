@@ -1,11 +1,15 @@
 import matplotlib.pyplot as plt
 import numpy as np
+import threading
 import time
 
 # Import các module đã viết
 from src.system_model.channel import ChannelModel
+from src.system_model.channel_dataset import load_channel
 from src.system_model.metrics import SystemMetrics
 from src.algorithms.abc_variants import GbestABC
+from src.utils.live_queue import LatestValueQueue
+from src.utils.visualization import steering_matrix, beampattern
 from main import load_config
 
 def run_live_demo():
@@ -23,12 +27,11 @@ def run_live_demo():
     
     print("--- KHỞI TẠO MÔ PHỎNG TRỰC TIẾP (LIVE DEMO) ---")
     channel_model = ChannelModel(M, K, N)
-    H = channel_model.generate_rayleigh_channel()
+    H = load_channel(config, 0, channel_model)
     metrics = SystemMetrics(config)
     
     # Khởi tạo thuật toán G-ABC
     optimizer = GbestABC(config, H, metrics)
-    optimizer.initialize_population() # Bước 1: Khởi tạo bầy ong
     
     # --- THIẾT LẬP ĐỒ THỊ LIVE ---
     plt.ion() # Bật chế độ Interactive (vẽ động)
@@ -49,26 +52,46 @@ def run_live_demo():
     # Subplot 2: Búp sóng (Beam Pattern) thay đổi hình dạng
     ax2 = fig.add_subplot(1, 2, 2, projection='polar')
     theta = np.linspace(-np.pi, np.pi, 360)
+    # Ma trận dẫn hướng tính một lần: mỗi lần vẽ chỉ còn 1 phép nhân ma trận
+    A = steering_matrix(N, theta)
     
-    # Lưu dữ liệu để vẽ
-    history_fitness = []
+    # Số khung hình mỗi giây của renderer (độc lập với tốc độ tối ưu)
+    fps = float(config.get('live', {}).get('fps', 10))
+    frame_interval = 1.0 / fps
+    # Thời gian nhường tối thiểu cho vòng lặp sự kiện GUI khi khung hình đã hết giờ
+    min_pause = 0.001
     
     print(">>> Đang chạy vòng lặp tối ưu...")
     
-    # 3. VÒNG LẶP THỦ CÔNG (Thay vì gọi .solve(), ta gọi từng bước)
-    for cycle in range(max_cycle):
-        # --- A. Các bước của thuật toán ABC ---
-        optimizer.employed_bees_phase()
-        optimizer.onlooker_bees_phase()
-        optimizer.scout_bees_phase()
-        optimizer.memorize_best_solution()
-        
-        # --- B. Lấy dữ liệu cập nhật ---
-        current_best = optimizer.best_fitness
-        history_fitness.append(current_best)
-        
-        # --- C. Cập nhật đồ thị (Cứ mỗi 2 vòng lặp vẽ 1 lần cho đỡ lag) ---
-        if cycle % 2 == 0 or cycle == max_cycle - 1:
+    # 3. SOLVER CHẠY HẾT TỐC LỰC TRÊN THREAD RIÊNG
+    # Sau mỗi vòng lặp chỉ đẩy snapshot (đường hội tụ + beam của User 1 @ AP 1)
+    # vào hàng đợi "giá trị mới nhất thắng", không bao giờ chờ renderer.
+    snapshots = LatestValueQueue()
+    
+    def publish(solver, stats):
+        snapshots.put((stats['cycle'],
+                       np.array(solver.convergence_curve),
+                       solver.best_beamformer[0, 0, :].copy()))
+    
+    def optimize():
+        try:
+            optimizer.solve()
+        finally:
+            snapshots.close()
+    
+    optimizer.add_callback(publish)
+    solver_thread = threading.Thread(target=optimize, daemon=True)
+    solver_thread.start()
+    
+    # 4. RENDERER (thread chính) VẼ LẠI VỚI TỐC ĐỘ KHUNG HÌNH CỐ ĐỊNH
+    # Chờ snapshot, vẽ và nhường GUI đều tính vào cùng một khung hình
+    frame_deadline = time.perf_counter() + frame_interval
+    while not snapshots.is_finished():
+        snapshot = snapshots.get(timeout=max(frame_deadline - time.perf_counter(), 0))
+        if snapshot is not None:
+            cycle, history_fitness, w_k = snapshot
+            current_best = history_fitness[-1]
+            
             # 1. Update biểu đồ đường
             line.set_xdata(range(len(history_fitness)))
             line.set_ydata(history_fitness)
@@ -81,27 +104,20 @@ def run_live_demo():
             
             # 2. Update biểu đồ cực (Polar)
             ax2.clear() # Xóa hình cũ
-            # Lấy vector beamforming tốt nhất hiện tại của AP đầu tiên
-            W_best = optimizer.best_solution
-            
-            # Giả lập vị trí user để vẽ (đánh dấu bằng đường kẻ đứt)
+            # Vẽ pattern cho User 1 (để minh họa sự tập trung năng lượng)
             # Lưu ý: Trong code metrics mình không cố định góc user, 
             # nên ở đây vẽ minh họa hình dạng búp sóng thay đổi là chính.
-            
-            # Vẽ pattern cho User 1 (để minh họa sự tập trung năng lượng)
-            w_k = W_best[0, 0, :] # User đầu tiên
-            pattern = []
-            for ang in theta:
-                a_theta = np.exp(-1j * np.pi * np.arange(N) * np.sin(ang))
-                gain = np.abs(np.vdot(w_k, a_theta))**2
-                pattern.append(gain)
-            
-            ax2.plot(theta, pattern, 'r-', linewidth=2)
+            ax2.plot(theta, beampattern(w_k, A), 'r-', linewidth=2)
             ax2.set_title(f"Hình dạng Búp sóng (Beam Pattern)\nUser 1 @ AP 1", va='bottom')
             
-            # Dừng 0.1s để mắt người kịp nhìn thấy thay đổi
             plt.draw()
-            plt.pause(0.1)
+        
+        # Nhường vòng lặp sự kiện GUI phần còn lại của khung hình
+        plt.pause(max(frame_deadline - time.perf_counter(), min_pause))
+        # Vẽ chậm hơn fps => bắt đầu khung mới từ bây giờ, không dồn khung
+        frame_deadline = max(frame_deadline, time.perf_counter()) + frame_interval
+    
+    solver_thread.join()
 
     print("✅ Hoàn tất mô phỏng!")
     plt.ioff() # Tắt chế độ interactive
@@ -1,64 +1,61 @@
-import yaml
 import numpy as np
 from tqdm import tqdm
 
-from src.system_model.channel import ChannelModel
-from src.system_model.metrics import SystemMetrics
-from src.algorithms.abc_base import ArtificialBeeColony
-from src.algorithms.abc_variants import GbestABC
+from src.simulation.monte_carlo import MonteCarloRunner, MultiInstanceRunner
+from src.utils.results_store import ResultsStore
+# load_config (đọc UTF-8 + kiểm tra hợp lệ) được các script khác import từ main
+from src.utils.config_loader import load_config
 from src.utils.visualization import plot_convergence, plot_beampattern
 
-def load_config(path='config.yaml'):
-    # SỬA LỖI: Thêm encoding='utf-8' để đọc tiếng Việt trong config
-    with open(path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
-
 def run_simulation():
     # 1. Load Cấu hình
     config = load_config()
     n_realizations = config['simulation']['n_realizations']
     print(f"--- Bắt đầu mô phỏng Cell-free ISAC (Chạy {n_realizations} lần) ---")
     
-    # Lưu trữ kết quả trung bình
-    avg_curve_abc = np.zeros(config['algorithm']['max_cycle'])
-    avg_curve_gabc = np.zeros(config['algorithm']['max_cycle'])
+    n_workers = config['simulation'].get('n_workers', 1)
+    seed = config['simulation'].get('seed')
+    # Kho kết quả trên đĩa: realization nào đã xong thì không chạy lại
+    results_dir = config['simulation'].get('results_dir')
+    store = ResultsStore(results_dir) if results_dir else None
     
-    # Biến lưu lại giải pháp tốt nhất cuối cùng để vẽ búp sóng
-    final_best_W = None 
+    # 2. Vòng lặp Monte Carlo (song song theo realization và theo thuật toán)
+    # Mỗi realization có luồng RNG riêng sinh từ root seed => kết quả
+    # giống hệt nhau dù chạy với bao nhiêu worker
+    if config['simulation'].get('mode', 'tasks') == 'multi_instance':
+        # Mọi realization của một lô được tối ưu đồng thời trên một core
+        runner = MultiInstanceRunner(config, batch_size=config['simulation'].get('instance_batch'),
+                                     seed=seed, store=store)
+    else:
+        runner = MonteCarloRunner(config, n_workers=n_workers, seed=seed, store=store)
+    print(f"Root seed entropy: {runner.root_entropy} | Workers: {runner.n_workers}")
+    
+    with tqdm(total=n_realizations, desc="Realizations") as progress:
+        avg_curves = runner.run(on_realization_done=lambda i: progress.update(1))
+    if store is not None:
+        n_reused = sum(1 for i in runner.stored if i < runner.n_completed)
+        print(f"Kho kết quả {results_dir}: {n_reused} realization đọc lại, "
+              f"{runner.n_completed - n_reused} realization chạy mới")
     
-    # 2. Vòng lặp Monte Carlo
-    for i in range(n_realizations):
-        print(f"\nRunning Realization {i+1}/{n_realizations}...")
-        
-        # a. Tạo môi trường
-        M = config['system']['M']
-        K = config['system']['K']
-        N = config['system']['N']
-        
-        channel_model = ChannelModel(M, K, N)
-        H = channel_model.generate_rayleigh_channel()
-        
-        metrics = SystemMetrics(config)
-        
-        # b. Chạy ABC gốc
-        print("  > [1] Running ABC Original...")
-        abc = ArtificialBeeColony(config, H, metrics)
-        _, curve_abc = abc.solve()
-        avg_curve_abc += np.array(curve_abc)
-        
-        # c. Chạy G-ABC
-        print("  > [2] Running G-ABC...")
-        gabc = GbestABC(config, H, metrics)
-        _, curve_gabc = gabc.solve()
-        avg_curve_gabc += np.array(curve_gabc)
-        
-        # Lưu lại giải pháp G-ABC của lần chạy cuối cùng
-        if i == n_realizations - 1:
-            final_best_W = gabc.best_solution
-
     # 3. Tính trung bình
-    avg_curve_abc /= n_realizations
-    avg_curve_gabc /= n_realizations
+    avg_curve_abc = avg_curves['abc']
+    avg_curve_gabc = avg_curves['gabc']
+    
+    # Giải pháp G-ABC của realization cuối cùng để vẽ búp sóng
+    final_best_W = runner.final_best_W
+    
+    # Thống kê dạng luồng: trung bình ± độ lệch chuẩn, phân vị rate từng user, khoảng tin cậy
+    statistics = runner.statistics
+    for name in ('abc', 'gabc'):
+        rate_p5, rate_p50, rate_p95 = statistics.user_rates[name].quantile(np.array([0.05, 0.5, 0.95]))
+        print(f"  > {name.upper()}: Sum Rate {statistics.final[name].mean:.4f} ± {statistics.final[name].std:.4f}, "
+              f"trung bình {statistics.evaluations[name].mean:.0f} lần đánh giá, "
+              f"lý do dừng: {dict(statistics.stop_reasons[name])}")
+        print(f"    Rate từng user (p5 / p50 / p95): {rate_p5:.3f} / {rate_p50:.3f} / {rate_p95:.3f} bps/Hz")
+    gap_low, gap_high = statistics.gap_interval(runner.ci_level)
+    print(f"  > Chênh lệch G-ABC - ABC: {statistics.gap.mean:.4f} bps/Hz, "
+          f"khoảng tin cậy {runner.ci_level:.0%}: [{gap_low:.4f}, {gap_high:.4f}] "
+          f"sau {runner.n_completed} realization (lý do dừng: {runner.stop_reason})")
     
     # 4. Vẽ và Lưu đồ thị
     print("\n--- Đang vẽ đồ thị ---")
@@ -67,7 +64,9 @@ def run_simulation():
     
     # Biểu đồ 2: Búp sóng (Beam Pattern) của giải pháp tốt nhất
     if final_best_W is not None:
-        plot_beampattern(final_best_W, N=config['system']['N'])
+        sensing_cfg = config.get('sensing') or {}
+        targets = sensing_cfg.get('target_angles_deg') if sensing_cfg.get('enabled', False) else None
+        plot_beampattern(final_best_W, N=config['system']['N'], target_angles_deg=targets)
         
     print("\nMô phỏng hoàn tất! Kiểm tra thư mục 'results/figures'.")
 
@@ -0,0 +1,24 @@
+import argparse
+
+from main import load_config
+from src.system_model.channel_dataset import ChannelDataset
+
+def make_dataset():
+    parser = argparse.ArgumentParser(description="Sinh bộ dữ liệu kênh (memmap .npy + meta.json) theo config.yaml")
+    parser.add_argument('path', help="Thư mục đích, vd. results/channels/rayleigh_M16_K4")
+    parser.add_argument('--n', type=int, default=None, help="Số realization (mặc định: simulation.n_realizations)")
+    parser.add_argument('--seed', type=int, default=None, help="Seed (mặc định: simulation.seed)")
+    parser.add_argument('--config', default='config.yaml')
+    args = parser.parse_args()
+    
+    config = load_config(args.config)
+    n = args.n if args.n is not None else int(config['simulation']['n_realizations'])
+    seed = args.seed if args.seed is not None else config['simulation'].get('seed')
+    
+    dataset = ChannelDataset.create(args.path, config, n, seed)
+    print(f"Đã ghi {len(dataset)} realization (M={dataset.M}, K={dataset.K}, N={dataset.N}) "
+          f"vào {args.path} | bộ sinh: {dataset.meta['generator'].get('channel_model', 'rayleigh')}, seed={seed}")
+    print(f"Dùng trong config.yaml: simulation.channel_dataset: {args.path}")
+
+if __name__ == "__main__":
+    make_dataset()
@@ -0,0 +1,31 @@
+import argparse
+
+from main import load_config
+from src.utils.results_store import ResultsStore
+from src.utils.visualization import plot_convergence, plot_beampattern
+
+def plot_results():
+    """Vẽ lại đồ thị từ kho kết quả (simulation.results_dir) mà không chạy lại mô phỏng"""
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Vẽ đồ thị từ kho kết quả Monte Carlo")
+    parser.add_argument('results_dir', nargs='?', default=config['simulation'].get('results_dir'),
+                        help="Thư mục kho kết quả (mặc định: simulation.results_dir)")
+    args = parser.parse_args()
+    if not args.results_dir:
+        parser.error("Chưa có kho kết quả: đặt simulation.results_dir hoặc truyền đường dẫn")
+    
+    store = ResultsStore(args.results_dir)
+    realizations, _ = store.load_curves()
+    if not realizations:
+        parser.error(f"Kho {args.results_dir} chưa có realization nào")
+    print(f"--- Đọc {len(realizations)} realization từ {args.results_dir} ---")
+    
+    avg_curves = store.average_curves(int(config['algorithm']['max_cycle']))
+    plot_convergence(avg_curves['abc'], avg_curves['gabc'])
+    
+    # Búp sóng của giải pháp G-ABC ở realization cuối cùng (giống main.py)
+    final_best_W = store.load_realization(realizations[-1])['gabc']['best_solution']
+    plot_beampattern(final_best_W, N=store.meta['N'])
+
+if __name__ == "__main__":
+    plot_results()
@@ -0,0 +1,46 @@
+import argparse
+import json
+import time
+
+from main import load_config
+from src.utils.benchmark import run_benchmark_suite, run_precision_check, save_results, compare_results
+
+def run_benchmarks():
+    parser = argparse.ArgumentParser(description="Benchmark hiệu năng: hàm fitness, chiếu công suất, sinh ứng viên, solve()")
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--output', default=None, help="File JSON kết quả (mặc định: results/benchmarks/bench_<thời gian>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="So sánh 2 file kết quả thay vì chạy benchmark")
+    parser.add_argument('--threshold', type=float, default=0.1, help="Ngưỡng chậm đi (tương đối) coi là hồi quy")
+    parser.add_argument('--precision', action='store_true',
+                        help="Kiểm tra độ chính xác single (complex64) so với double thay vì benchmark")
+    args = parser.parse_args()
+    
+    if args.compare:
+        with open(args.compare[0], encoding='utf-8') as f:
+            old = json.load(f)
+        with open(args.compare[1], encoding='utf-8') as f:
+            new = json.load(f)
+        n_regressions = 0
+        print(f"{'Điểm':<22} {'Nhóm':<28} {'Chỉ số':<22} {'Cũ':>12} {'Mới':>12} {'x':>7}")
+        for point, group, metric, before, after, speedup, regression in compare_results(old, new, args.threshold):
+            flag = '  <-- HỒI QUY' if regression else ''
+            n_regressions += regression
+            print(f"{point:<22} {group:<28} {metric:<22} {before:>12.4g} {after:>12.4g} {speedup:>6.2f}x{flag}")
+        print(f"\nSố chỉ số hồi quy (> {args.threshold:.0%}): {n_regressions}")
+        return
+    
+    config = load_config(args.config)
+    if args.precision:
+        results = run_precision_check(config)
+        output = args.output or f"results/benchmarks/precision_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        save_results(results, output)
+        print(f"\nĐã lưu kết quả kiểm tra precision tại: {output}")
+        return
+    
+    results = run_benchmark_suite(config)
+    output = args.output or f"results/benchmarks/bench_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    save_results(results, output)
+    print(f"\nĐã lưu kết quả benchmark tại: {output}")
+
+if __name__ == "__main__":
+    run_benchmarks()
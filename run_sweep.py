@@ -0,0 +1,28 @@
+import argparse
+
+from main import load_config
+from src.simulation.sweep import SweepRunner, save_table
+
+def run_sweep():
+    parser = argparse.ArgumentParser(description="Quét tham số (mục 'sweep' trong config), có cache theo hash config + seed")
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--output', default=None, help="File CSV gộp kết quả (mặc định: sweep.output)")
+    args = parser.parse_args()
+    
+    config = load_config(args.config)
+    sweeper = SweepRunner(config)
+    print(f"--- Quét {len(sweeper.points)} điểm | seed {sweeper.seed} | cache: {sweeper.cache_dir} ---")
+    
+    def report(key, entry):
+        print(f"  [{key}] {entry['overrides']}: ABC = {entry['abc_mean']:.4f}, "
+              f"G-ABC = {entry['gabc_mean']:.4f} bps/Hz ({entry['seconds']:.1f} s)")
+    
+    rows, n_computed = sweeper.run(on_point_done=report)
+    print(f"Đã tính mới {n_computed} điểm, {len(rows) - n_computed} điểm lấy từ cache")
+    
+    output = args.output or config['sweep'].get('output', 'results/sweep_results.csv')
+    save_table(rows, output)
+    print(f"Đã lưu bảng kết quả tại: {output}")
+
+if __name__ == "__main__":
+    run_sweep()
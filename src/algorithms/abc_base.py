@@ -1,59 +1,397 @@
 import numpy as np
 import copy
+import os
+import time
 from src.system_model.constraints import enforce_power_constraint
+from src.system_model.context import build_context
+from src.system_model.sensing import build_sensing
+from src.system_model.shared_evaluator import SharedMemoryEvaluator
+from src.algorithms.precoders import compute_precoder
+from src.utils.instrumentation import Instrumentation, ProgressPrinter
 
 class ArtificialBeeColony:
-    def __init__(self, config, channel_H, metrics_calculator):
+    def __init__(self, config, channel_H, metrics_calculator, context=None):
         # 1. Load tham số từ config
         self.pop_size = int(config['algorithm']['pop_size']) # SN
         self.max_cycle = int(config['algorithm']['max_cycle'])
         self.limit = int(config['algorithm']['limit'])
         self.p_max_dbm = float(config['system']['p_max_dbm'])
+        # Chế độ thực thi: 'loop' (từng con ong), 'batched' (vector hóa cả quần thể)
+        # hoặc 'coordinate' (mỗi lần thử chỉ đổi 1 phần tử / 1 AP, cập nhật tăng dần)
+        self.engine = config['algorithm'].get('engine', 'loop')
+        if self.engine not in ('loop', 'batched', 'coordinate'):
+            raise ValueError(f"Engine không hợp lệ: {self.engine}")
+        self.coordinate_unit = config['algorithm'].get('coordinate_unit', 'element')
+        if self.coordinate_unit not in ('element', 'ap'):
+            raise ValueError(f"coordinate_unit không hợp lệ: {self.coordinate_unit}")
+        # Số vòng lặp giữa 2 lần tính lại cache từ đầu (chống tích lũy sai số)
+        self.cache_refresh = int(config['algorithm'].get('cache_refresh', 10))
+        
+        self.config = config
         
         # 2. Lưu môi trường (Kênh và Hàm tính điểm)
         self.H = channel_H
         self.metrics = metrics_calculator
+        # Ngữ cảnh kênh dựng một lần: H làm phẳng, P_max (W), bộ đệm làm việc...
+        # (có thể truyền sẵn, vd. ngữ cảnh user-centric dựng từ beta thật)
+        self.context = context if context is not None else build_context(channel_H, config)
         
         # Kích thước bài toán: (M, K, N)
         self.M = int(config['system']['M'])
         self.K = int(config['system']['K'])
         self.N = int(config['system']['N'])
+        # Kích thước một giải pháp trong không gian tìm kiếm: (M, K, N) khi
+        # dày đặc, (P, N) khi user-centric (chỉ các khối w_mk đang hoạt động)
+        self.solution_shape = self.context.solution_shape
+        # Kiểu số của quần thể theo algorithm.precision (double | single)
+        self.real_dtype = self.context.real_dtype
+        self.complex_dtype = self.context.complex_dtype
+        if self.engine == 'coordinate' and self.solution_shape != (self.M, self.K, self.N):
+            raise ValueError("Engine 'coordinate' chỉ hỗ trợ bố cục dày đặc (M, K, N)")
+        # Thành phần cảm biến ISAC của fitness (None = fitness chỉ là Sum Rate).
+        # Từ điển dẫn hướng chỉ phụ thuộc hình học => dựng một lần, giữ qua update_channel
+        self.sensing = build_sensing(config, self.N, self.M)
         
         # 3. Khởi tạo quần thể
-        # self.population là mảng 4 chiều: (SN, M, K, N)
+        # self.population là mảng 4 chiều: (SN, M, K, N) (hoặc (SN, P, N) khi user-centric)
         # Mỗi phần tử population[i] là một giải pháp Beamforming hoàn chỉnh
         self.population = None 
         self.fitness = np.zeros(self.pop_size)
         self.trial_counters = np.zeros(self.pop_size) # Đếm số lần không cải thiện (cho Scout bee)
         
+        # Cache cho engine 'coordinate' (chỉ dùng khi engine == 'coordinate')
+        self.gain = None               # Ma trận độ lợi hiệu dụng (SN, K, K)
+        self.signal_power = None       # Công suất tín hiệu của từng user (SN, K)
+        self.interference_power = None # Công suất nhiễu của từng user (SN, K)
+        self.ap_power = None           # Công suất phát của từng AP (SN, M)
+        self.sensing_gain = None       # Độ lợi cảm biến chuẩn hóa (SN,), khi bật sensing
+        self.cycles_since_refresh = 0
+        
+        algo_cfg = config['algorithm']
+        # Hạt giống từ precoder giải tích (MRT/ZF/RZF/WMMSE) cho khởi tạo và Ong trinh sát
+        self.seed_precoders = list(algo_cfg.get('seed_precoders') or [])
+        self.seed_fraction = float(algo_cfg.get('seed_fraction', 0.2))     # Tỉ lệ quần thể ban đầu lấy từ hạt giống
+        self.seed_noise = float(algo_cfg.get('seed_noise', 0.1))           # Độ lớn nhiễu (tương đối) quanh hạt giống
+        self.scout_seed_prob = float(algo_cfg.get('scout_seed_prob', 0.0)) # Xác suất Ong trinh sát khởi động lại từ hạt giống
+        self.precoder_seeds = None # Tính lười theo kênh hiện tại (S, *solution_shape)
+        
+        # Đánh giá song song trên shared memory cho một bài toán lớn (engine batched):
+        # số process đánh giá (0/1 = tắt) và cỡ lô tối thiểu để chia việc
+        self.eval_workers = int(algo_cfg.get('eval_workers') or 0)
+        self.eval_min_batch = int(algo_cfg.get('eval_min_batch', 8))
+        self.evaluator = None # Khởi động lười ở lần đánh giá lô đầu tiên
+        
+        # Tìm kiếm cục bộ memetic: leo gradient có chiếu công suất trên các nguồn tốt nhất
+        self.memetic_interval = int(algo_cfg.get('memetic_interval') or 0)      # Mỗi N vòng lặp (0 = tắt)
+        self.memetic_elites = int(algo_cfg.get('memetic_elites', 3))            # Số nguồn tốt nhất được tinh chỉnh
+        self.memetic_steps = int(algo_cfg.get('memetic_steps', 5))              # Số bước gradient mỗi lần
+        self.memetic_step_size = float(algo_cfg.get('memetic_step_size', 0.1))  # Bước ban đầu, tương đối theo ||W||
+        self.memetic_final_steps = int(algo_cfg.get('memetic_final_steps', 0))  # Số bước đánh bóng best_solution sau solve()
+        
+        # Tiêu chí dừng sớm / ngân sách (None = tắt)
+        self.stall_window = algo_cfg.get('stall_window')       # Số vòng lặp xét trì trệ
+        self.stall_tol = float(algo_cfg.get('stall_tol', 1e-4)) # Cải thiện tương đối tối thiểu
+        self.target_rate = algo_cfg.get('target_rate')         # Sum-rate mục tiêu (bps/Hz)
+        self.max_evaluations = algo_cfg.get('max_evaluations') # Số lần đánh giá fitness tối đa
+        self.time_limit = algo_cfg.get('time_limit')           # Giới hạn thời gian chạy (giây)
+        
+        # Thống kê của lần chạy
+        self.n_evaluations = 0   # Số lần đánh giá fitness đã dùng
+        self.n_acceptances = 0   # Số lần chọn lọc tham lam chấp nhận ứng viên mới
+        self.n_scout_resets = 0  # Số nguồn thức ăn bị Ong trinh sát reset
+        self.n_gradient_evaluations = 0 # Số lần tính gradient (tìm kiếm cục bộ memetic)
+        self.stop_reason = None  # Tiêu chí đã kích hoạt dừng
+        self.start_time = None
+        
+        # Lưu checkpoint mỗi N vòng lặp khi solve() được gọi với checkpoint_path
+        self.checkpoint_interval = int(algo_cfg.get('checkpoint_interval') or 0)
+        
+        # Đo đạc theo pha + callback theo vòng lặp (None/rỗng = không tốn chi phí)
+        self.instrumentation = Instrumentation() if algo_cfg.get('instrument', False) else None
+        self.callbacks = []
+        self.counter_snapshot = (0, 0, 0)
+        log_interval = int(algo_cfg.get('log_interval', 10))
+        if log_interval > 0:
+            self.add_callback(ProgressPrinter(log_interval, self.max_cycle))
+        
         # Lưu kết quả tốt nhất toàn cục
         self.best_solution = None
         self.best_fitness = -np.inf
         self.convergence_curve = [] # Để vẽ biểu đồ
 
+    def add_callback(self, callback):
+        """
+        Đăng ký callback(solver, stats) được gọi sau mỗi vòng lặp.
+        stats gồm: cycle, best_fitness, n_evaluations, n_acceptances,
+        n_scout_resets (trong vòng lặp đó) và thời gian từng pha nếu bật
+        instrumentation.
+        """
+        self.callbacks.append(callback)
+
+    def evaluate(self, W):
+        """Đánh giá fitness của một giải pháp (có đếm số lần đánh giá)"""
+        if self.sensing is not None:
+            return self.evaluate_batch(W[np.newaxis])[0]
+        self.n_evaluations += 1
+        if self.instrumentation is None:
+            return self.metrics.calculate_sum_rate(W, self.context)
+        with self.instrumentation.timer('evaluation'):
+            return self.metrics.calculate_sum_rate(W, self.context)
+
+    def evaluate_batch(self, W_batch):
+        """Đánh giá fitness của một lô giải pháp (B, M, K, N) -> (B,)"""
+        self.n_evaluations += len(W_batch)
+        if self.instrumentation is None:
+            return self.objective_batch(W_batch)
+        with self.instrumentation.timer('evaluation'):
+            return self.objective_batch(W_batch)
+
+    def objective_batch(self, W_batch):
+        """Sum Rate của cả lô, cộng thành phần cảm biến (nếu bật) tính batched trên cùng lô"""
+        if self.eval_workers > 1:
+            sum_rates = self.shared_evaluator().sum_rates(W_batch)
+        else:
+            sum_rates, _ = self.metrics.calculate_sum_rate_batch(W_batch, self.context)
+        if self.sensing is None:
+            return sum_rates
+        return self.sensing.combine(sum_rates, self.sensing.gain(W_batch, len(self.solution_shape)))
+
+    def shared_evaluator(self):
+        """SharedMemoryEvaluator của solver (các process đánh giá giữ sống tới close())"""
+        if self.evaluator is None:
+            self.evaluator = SharedMemoryEvaluator(self.context, self.config, self.eval_workers,
+                                                   min_batch=self.eval_min_batch, capacity=self.pop_size)
+        return self.evaluator
+
+    def close(self):
+        """Dừng các process đánh giá và giải phóng shared memory (nếu đã khởi động)"""
+        if self.evaluator is not None:
+            self.evaluator.close()
+            self.evaluator = None
+
+    def objective_gradient_batch(self, W_batch):
+        """
+        Fitness và gradient giải tích của nó theo W cho cả lô (B, *solution_shape),
+        gồm cả thành phần cảm biến nếu bật. Đếm là B lần đánh giá fitness
+        (gradient dùng chung ma trận độ lợi nên chỉ tốn thêm một phép co tensor)
+        và tính vào thời gian pha 'evaluation' như evaluate_batch. Luôn tính
+        trong process chính: SharedMemoryEvaluator chỉ trả về Sum Rate, không
+        trả ma trận độ lợi cần cho gradient.
+        """
+        self.n_evaluations += len(W_batch)
+        self.n_gradient_evaluations += len(W_batch)
+        if self.instrumentation is None:
+            return self.objective_gradient(W_batch)
+        with self.instrumentation.timer('evaluation'):
+            return self.objective_gradient(W_batch)
+
+    def objective_gradient(self, W_batch):
+        """Phần tính của objective_gradient_batch (không đếm, không đo thời gian)"""
+        sum_rates, gradient = self.metrics.sum_rate_gradient_batch(W_batch, self.context)
+        if self.sensing is None:
+            return sum_rates, gradient
+        gain, gain_gradient = self.sensing.gain_gradient(W_batch, len(self.solution_shape))
+        return (self.sensing.combine(sum_rates, gain),
+                self.sensing.combine_gradient(sum_rates, gradient, gain, gain_gradient))
+
+    def gradient_ascent(self, W, n_steps):
+        """
+        Leo gradient có chiếu (projected gradient ascent) cho một lô giải pháp:
+            W <- P(W + step * ||W|| * grad / ||grad||)
+        với phép chiếu P = enforce_power_constraint. Mỗi giải pháp có bước
+        riêng: tăng 1.5 lần khi bước được chấp nhận, giảm một nửa khi không
+        (fitness không giảm). Mỗi bước là một lần đánh giá batch, đồng thời
+        cho luôn gradient tại điểm mới.
+        
+        Args:
+            W: Lô giải pháp (B, *solution_shape) thỏa ràng buộc công suất
+            n_steps: Số bước
+        
+        Returns:
+            W, fitness sau tinh chỉnh (bản sao mới)
+        """
+        W = W.copy()
+        fitness, gradient = self.objective_gradient_batch(W)
+        step = np.full(len(W), self.memetic_step_size, dtype=self.real_dtype)
+        axes = tuple(range(1, W.ndim))
+        expand = (slice(None),) + (np.newaxis,) * len(self.solution_shape)
+        for _ in range(n_steps):
+            grad_norm = np.sqrt(np.sum(np.abs(gradient)**2, axis=axes))
+            W_norm = np.sqrt(np.sum(np.abs(W)**2, axis=axes))
+            scale = step * W_norm / np.maximum(grad_norm, np.finfo(self.real_dtype).tiny)
+            candidates = enforce_power_constraint(W + scale[expand] * gradient, self.p_max_dbm,
+                                                  context=self.context, inplace=True)
+            new_fitness, new_gradient = self.objective_gradient_batch(candidates)
+            improved = new_fitness > fitness
+            W[improved] = candidates[improved]
+            fitness[improved] = new_fitness[improved]
+            gradient[improved] = new_gradient[improved]
+            step = np.where(improved, step * 1.5, step * 0.5).astype(self.real_dtype)
+        return W, fitness
+
+    def memetic_phase(self):
+        """Tinh chỉnh memetic_elites nguồn tốt nhất bằng gradient_ascent"""
+        idx = np.argsort(self.fitness)[-self.memetic_elites:]
+        W, fitness = self.gradient_ascent(self.population[idx], self.memetic_steps)
+        improved = fitness > self.fitness[idx]
+        idx, W, fitness = idx[improved], W[improved], fitness[improved]
+        self.population[idx] = W
+        self.fitness[idx] = fitness
+        self.trial_counters[idx] = 0
+        self.n_acceptances += len(idx)
+        if self.engine == 'coordinate' and len(idx) > 0:
+            self.refresh_cache(idx)
+
+    def polish_best_solution(self, n_steps):
+        """Đánh bóng best_solution (có thể không còn trong quần thể) sau khi solve() kết thúc"""
+        W, fitness = self.gradient_ascent(self.best_solution[np.newaxis], n_steps)
+        if fitness[0] > self.best_fitness:
+            self.best_solution = W[0]
+            self.best_fitness = fitness[0]
+
+    def objective_terms(self, W):
+        """(Sum Rate, độ lợi cảm biến chuẩn hóa) của một giải pháp, để báo cáo (không đếm đánh giá)"""
+        sum_rate = self.metrics.calculate_sum_rate(W, self.context)
+        if self.sensing is None:
+            return sum_rate, None
+        return sum_rate, float(self.sensing.gain(W[np.newaxis], len(self.solution_shape))[0])
+
+    def random_normal(self, *shape):
+        """np.random.randn ép về kiểu thực của precision (không nâng kiểu khi single)"""
+        return np.random.randn(*shape).astype(self.real_dtype, copy=False)
+
+    def random_uniform(self, low, high, size):
+        """np.random.uniform ép về kiểu thực của precision"""
+        return np.random.uniform(low, high, size=size).astype(self.real_dtype, copy=False)
+
     def initialize_population(self):
         """Khởi tạo ngẫu nhiên quần thể ban đầu"""
         # Tạo số phức ngẫu nhiên: Thực + Ảo
-        X_real = np.random.randn(self.pop_size, self.M, self.K, self.N)
-        X_imag = np.random.randn(self.pop_size, self.M, self.K, self.N)
+        X_real = self.random_normal(self.pop_size, *self.solution_shape)
+        X_imag = self.random_normal(self.pop_size, *self.solution_shape)
         self.population = X_real + 1j * X_imag
         
         # Quan trọng: Chuẩn hóa công suất ngay từ đầu
-        for i in range(self.pop_size):
-            self.population[i] = enforce_power_constraint(self.population[i], self.p_max_dbm)
-            self.fitness[i] = self.metrics.calculate_sum_rate(self.population[i], self.H)
+        self.population = enforce_power_constraint(self.population, self.p_max_dbm, context=self.context, inplace=True)
+        if self.seed_precoders:
+            # Một phần quần thể xuất phát từ precoder: bản gốc + các bản có nhiễu
+            n_exact = len(self.seed_precoders)
+            n_seeded = min(self.pop_size, max(n_exact, int(round(self.seed_fraction * self.pop_size))))
+            self.population[:n_seeded] = self.seeded_solutions(n_seeded, n_exact)
+        # Đánh giá cả quần thể bằng một lần gọi batch
+        self.fitness = self.evaluate_batch(self.population)
+        if self.engine == 'coordinate':
+            self.refresh_cache()
             
         # Cập nhật Best Global
         best_idx = np.argmax(self.fitness)
         self.best_fitness = self.fitness[best_idx]
         self.best_solution = copy.deepcopy(self.population[best_idx])
 
+    def get_precoder_seeds(self):
+        """Các precoder trong seed_precoders cho kênh hiện tại, ở bố cục giải pháp"""
+        if self.precoder_seeds is None:
+            H = np.asarray(self.context.H)
+            dense = np.stack([compute_precoder(name, H, self.config, self.metrics)
+                              for name in self.seed_precoders]).astype(self.complex_dtype)
+            self.precoder_seeds = enforce_power_constraint(self.context.from_dense(dense), self.p_max_dbm,
+                                                           context=self.context, inplace=True)
+        return self.precoder_seeds
+
+    def seeded_solutions(self, n, n_exact=0):
+        """
+        n giải pháp lấy vòng quanh các hạt giống precoder: n_exact giải pháp
+        đầu giữ nguyên, các giải pháp còn lại cộng nhiễu phức có độ lớn
+        seed_noise lần biên độ RMS của hạt giống rồi chiếu lại công suất.
+        """
+        seeds = self.get_precoder_seeds()
+        W = seeds[np.arange(n) % len(seeds)]
+        n_noisy = n - min(n_exact, n)
+        if n_noisy > 0:
+            noisy = W[n - n_noisy:]
+            rms = np.sqrt(np.mean(np.abs(noisy)**2, axis=tuple(range(1, noisy.ndim)), keepdims=True))
+            shape = noisy.shape
+            noise = (self.random_normal(*shape) + 1j * self.random_normal(*shape)) / 2**0.5
+            noisy += self.seed_noise * rms * noise
+            W[n - n_noisy:] = enforce_power_constraint(noisy, self.p_max_dbm, context=self.context, inplace=True)
+        return W
+
+    def scout_solutions(self, n):
+        """
+        n giải pháp mới cho Ong trinh sát: ngẫu nhiên, hoặc (với xác suất
+        scout_seed_prob) xuất phát lại quanh một hạt giống precoder.
+        """
+        shape = (n,) + self.solution_shape
+        new_sol = self.random_normal(*shape) + 1j * self.random_normal(*shape)
+        new_sol = enforce_power_constraint(new_sol, self.p_max_dbm, context=self.context, inplace=True)
+        if self.seed_precoders and self.scout_seed_prob > 0:
+            from_seed = np.flatnonzero(np.random.uniform(size=n) < self.scout_seed_prob)
+            if len(from_seed) > 0:
+                new_sol[from_seed] = self.seeded_solutions(len(from_seed))
+        return new_sol
+
+    @property
+    def best_beamformer(self):
+        """best_solution ở dạng tensor đầy đủ (M, K, N), vd. để vẽ búp sóng"""
+        if self.best_solution is None:
+            return None
+        return self.context.to_dense(self.best_solution)
+
+    def inject_solutions(self, solutions, fitness):
+        """
+        Đưa các giải pháp từ bên ngoài (vd. di cư giữa các đảo) vào quần thể:
+        mỗi giải pháp thay thế nguồn thức ăn kém nhất nếu tốt hơn nó. Khi số
+        giải pháp tới nhiều hơn pop_size, chỉ pop_size giải pháp tốt nhất được xét.
+        
+        Args:
+            solutions: Lô giải pháp (B, *solution_shape) đã thỏa ràng buộc công suất
+            fitness: Fitness tương ứng trên cùng kênh (B,)
+        
+        Returns:
+            Số giải pháp được nhận vào quần thể
+        """
+        order = np.argsort(fitness)[::-1][:len(self.fitness)]
+        worst = np.argsort(self.fitness)[:len(order)]
+        accepted = fitness[order] > self.fitness[worst]
+        idx, src = worst[accepted], order[accepted]
+        
+        self.population[idx] = solutions[src]
+        self.fitness[idx] = fitness[src]
+        self.trial_counters[idx] = 0
+        if self.engine == 'coordinate' and len(idx) > 0:
+            self.refresh_cache(idx)
+        self.memorize_best_solution()
+        return len(idx)
+
+    def update_channel(self, channel_H):
+        """
+        Đổi sang kênh mới nhưng giữ lại quần thể (warm start cho bài toán
+        theo dõi kênh biến đổi chậm). Quần thể và best_solution được chấm
+        điểm lại trên kênh mới; bộ đếm thử nghiệm được reset.
+        """
+        self.H = channel_H
+        self.context = self.context.with_channel(channel_H)
+        if self.evaluator is not None:
+            self.evaluator.set_context(self.context)
+        self.precoder_seeds = None
+        if self.population is None:
+            return
+        
+        self.fitness = self.evaluate_batch(self.population)
+        if self.engine == 'coordinate':
+            self.refresh_cache()
+        self.trial_counters[:] = 0
+        
+        # Best cũ có thể không còn trong quần thể => chấm lại riêng rồi so sánh
+        self.best_fitness = self.evaluate(self.best_solution)
+        self.memorize_best_solution()
+
     def generate_candidate(self, current_idx, partner_idx):
         """
         Hàm sinh giải pháp mới (Logic cốt lõi của ABC gốc).
         v_i = x_i + phi * (x_i - x_k)
         """
-        phi = np.random.uniform(-1, 1, size=(self.M, self.K, self.N))
+        phi = self.random_uniform(-1, 1, size=self.solution_shape)
         
         current_sol = self.population[current_idx]
         partner_sol = self.population[partner_idx]
@@ -62,8 +400,61 @@ class ArtificialBeeColony:
         new_candidate = current_sol + phi * (current_sol - partner_sol)
         return new_candidate
 
+    def select_partners(self, idx):
+        """
+        Chọn đối tác k != i cho toàn bộ mảng chỉ số idx trong một lần gọi.
+        Rút k trong [0, SN-2] rồi dịch lên 1 nếu k >= i => phân phối đều trên
+        các chỉ số khác i, không cần dựng lại list(range(SN)) cho mỗi con ong.
+        """
+        k = np.random.randint(0, self.pop_size - 1, size=len(idx))
+        return k + (k >= idx)
+
+    def generate_candidates_batch(self, idx, partner_idx):
+        """
+        Phiên bản batch của generate_candidate: sinh len(idx) giải pháp mới
+        cùng lúc, kết quả có kích thước (B, M, K, N).
+        """
+        phi = self.random_uniform(-1, 1, size=(len(idx),) + self.solution_shape)
+        
+        current_sol = self.population[idx]
+        partner_sol = self.population[partner_idx]
+        
+        return current_sol + phi * (current_sol - partner_sol)
+
+    def greedy_selection_batch(self, idx, candidates):
+        """
+        Chiếu công suất, đánh giá và chọn lọc tham lam cho cả lô ứng viên.
+        
+        Args:
+            idx: Chỉ số nguồn thức ăn ứng với từng ứng viên (B,) - có thể trùng
+            candidates: Lô giải pháp mới (B, M, K, N)
+        """
+        candidates = enforce_power_constraint(candidates, self.p_max_dbm, context=self.context, inplace=True)
+        new_fitness = self.evaluate_batch(candidates)
+        improved = new_fitness > self.fitness[idx]
+        
+        # Một nguồn có thể được nhiều ong quan sát chọn cùng lúc:
+        # chỉ giữ lại ứng viên tốt nhất của mỗi nguồn (masked update)
+        order = np.lexsort((-new_fitness, idx))
+        is_first = np.ones(len(order), dtype=bool)
+        is_first[1:] = idx[order][1:] != idx[order][:-1]
+        winners = order[is_first & improved[order]]
+        
+        # Cập nhật bộ đếm: +1 cho mỗi lần thất bại, reset về 0 nếu có cải thiện
+        np.add.at(self.trial_counters, idx[~improved], 1)
+        self.trial_counters[idx[winners]] = 0
+        self.n_acceptances += len(winners)
+        
+        self.population[idx[winners]] = candidates[winners]
+        self.fitness[idx[winners]] = new_fitness[winners]
+
     def employed_bees_phase(self):
         """Giai đoạn Ong thợ"""
+        if self.engine == 'batched':
+            return self.employed_bees_phase_batched()
+        if self.engine == 'coordinate':
+            return self.employed_bees_phase_coordinate()
+        
         for i in range(self.pop_size):
             # 1. Chọn đối tác ngẫu nhiên k khác i
             candidates = list(range(self.pop_size))
@@ -74,20 +465,33 @@ class ArtificialBeeColony:
             new_sol = self.generate_candidate(i, k)
             
             # 3. Xử lý ràng buộc công suất (Cực quan trọng)
-            new_sol = enforce_power_constraint(new_sol, self.p_max_dbm)
+            new_sol = enforce_power_constraint(new_sol, self.p_max_dbm, context=self.context, inplace=True)
             
             # 4. Đánh giá và Tham lam (Greedy Selection)
-            new_fitness = self.metrics.calculate_sum_rate(new_sol, self.H)
+            new_fitness = self.evaluate(new_sol)
             
             if new_fitness > self.fitness[i]:
                 self.population[i] = new_sol
                 self.fitness[i] = new_fitness
                 self.trial_counters[i] = 0 # Reset bộ đếm
+                self.n_acceptances += 1
             else:
                 self.trial_counters[i] += 1 # Tăng bộ đếm thất bại
 
+    def employed_bees_phase_batched(self):
+        """Giai đoạn Ong thợ (batched): SN ứng viên được sinh và chấm điểm cùng lúc"""
+        idx = np.arange(self.pop_size)
+        partners = self.select_partners(idx)
+        candidates = self.generate_candidates_batch(idx, partners)
+        self.greedy_selection_batch(idx, candidates)
+
     def onlooker_bees_phase(self):
         """Giai đoạn Ong quan sát (Roulette Wheel Selection)"""
+        if self.engine == 'batched':
+            return self.onlooker_bees_phase_batched()
+        if self.engine == 'coordinate':
+            return self.onlooker_bees_phase_coordinate()
+        
         # Tính xác suất chọn lọc
         # Để tránh chia cho 0 hoặc số âm, ta dùng hàm exp hoặc shift dương
         # Ở đây Sum-rate luôn dương nên tính trực tiếp tỉ lệ
@@ -104,28 +508,202 @@ class ArtificialBeeColony:
             k = np.random.choice(candidates)
             
             new_sol = self.generate_candidate(i, k)
-            new_sol = enforce_power_constraint(new_sol, self.p_max_dbm)
-            new_fitness = self.metrics.calculate_sum_rate(new_sol, self.H)
+            new_sol = enforce_power_constraint(new_sol, self.p_max_dbm, context=self.context, inplace=True)
+            new_fitness = self.evaluate(new_sol)
             
             if new_fitness > self.fitness[i]:
                 self.population[i] = new_sol
                 self.fitness[i] = new_fitness
                 self.trial_counters[i] = 0
+                self.n_acceptances += 1
             else:
                 self.trial_counters[i] += 1
 
+    def onlooker_bees_phase_batched(self):
+        """Giai đoạn Ong quan sát (batched): rút toàn bộ SN lượt Roulette một lần"""
+        prob = self.fitness / np.sum(self.fitness)
+        idx = np.random.choice(self.pop_size, size=self.pop_size, p=prob)
+        partners = self.select_partners(idx)
+        candidates = self.generate_candidates_batch(idx, partners)
+        self.greedy_selection_batch(idx, candidates)
+
     def scout_bees_phase(self):
         """Giai đoạn Ong trinh sát"""
+        if self.engine == 'batched':
+            return self.scout_bees_phase_batched()
+        if self.engine == 'coordinate':
+            return self.scout_bees_phase_coordinate()
+        
         for i in range(self.pop_size):
             if self.trial_counters[i] > self.limit:
-                # Reset hoàn toàn giải pháp này (Random search)
-                X_real = np.random.randn(self.M, self.K, self.N)
-                X_imag = np.random.randn(self.M, self.K, self.N)
-                new_sol = X_real + 1j * X_imag
-                
-                self.population[i] = enforce_power_constraint(new_sol, self.p_max_dbm)
-                self.fitness[i] = self.metrics.calculate_sum_rate(self.population[i], self.H)
+                # Reset hoàn toàn giải pháp này (Random search / hạt giống precoder)
+                self.population[i] = self.scout_solutions(1)[0]
+                self.fitness[i] = self.evaluate(self.population[i])
                 self.trial_counters[i] = 0
+                self.n_scout_resets += 1
+
+    def scout_bees_phase_batched(self):
+        """Giai đoạn Ong trinh sát (batched): reset mọi nguồn cạn kiệt cùng lúc"""
+        idx = np.flatnonzero(self.trial_counters > self.limit)
+        if len(idx) == 0:
+            return
+        
+        self.population[idx] = self.scout_solutions(len(idx))
+        self.fitness[idx] = self.evaluate_batch(self.population[idx])
+        self.trial_counters[idx] = 0
+        self.n_scout_resets += len(idx)
+
+    # ------------------------------------------------------------------
+    # Engine 'coordinate': mỗi lần thử chỉ thay đổi 1 phần tử w[m, j, n]
+    # (hoặc cả khối W[m] của 1 AP). Mỗi nguồn thức ăn giữ sẵn ma trận độ lợi
+    # G (K x K) và công suất từng AP, nên fitness được cập nhật tăng dần:
+    #   - 1 phần tử, AP chưa vượt công suất: O(K)
+    #   - AP phải scale lại (hoặc đổi cả W[m]): O(K^2 N)
+    # thay vì O(M K^2 N) của calculate_sum_rate.
+    # ------------------------------------------------------------------
+    def refresh_cache(self, idx=None):
+        """Tính lại từ đầu cache (G, S, I, P_ap, fitness) cho các nguồn idx"""
+        if idx is None:
+            idx = np.arange(self.pop_size)
+        if self.gain is None:
+            self.gain = np.zeros((self.pop_size, self.K, self.K), dtype=self.complex_dtype)
+            self.signal_power = np.zeros((self.pop_size, self.K), dtype=self.real_dtype)
+            self.interference_power = np.zeros((self.pop_size, self.K), dtype=self.real_dtype)
+            self.ap_power = np.zeros((self.pop_size, self.M), dtype=self.real_dtype)
+            self.sensing_gain = np.zeros(self.pop_size, dtype=self.real_dtype)
+        
+        W = self.population[idx]
+        self.gain[idx] = self.metrics.effective_gain_batch(W, self.context)
+        self.signal_power[idx], self.interference_power[idx] = \
+            self.metrics.split_gain_power(self.gain[idx])
+        self.ap_power[idx] = np.sum(np.abs(W)**2, axis=(-2, -1))
+        rates = self.metrics.rates_from_power(self.signal_power[idx], self.interference_power[idx])
+        self.fitness[idx] = np.sum(rates, axis=-1)
+        if self.sensing is not None:
+            self.sensing_gain[idx] = self.sensing.gain(W, len(self.solution_shape))
+            self.fitness[idx] = self.sensing.combine(self.fitness[idx], self.sensing_gain[idx])
+
+    def generate_block(self, current_idx, partner_idx, block):
+        """
+        Sinh giá trị mới cho một khối tọa độ của giải pháp current_idx.
+        block = (m, j, n) cho 1 phần tử hoặc (m,) cho cả W[m] của 1 AP.
+        """
+        current = self.population[current_idx][block]
+        partner = self.population[partner_idx][block]
+        phi = self.random_uniform(-1, 1, size=np.shape(current))
+        return current + phi * (current - partner)
+
+    def coordinate_trial(self, i, partner_idx):
+        """Một lần thử của engine 'coordinate' trên nguồn i, kèm chọn lọc tham lam"""
+        self.n_evaluations += 1
+        m = np.random.randint(self.M)
+        if self.coordinate_unit == 'element':
+            j = np.random.randint(self.K)
+            n = np.random.randint(self.N)
+            old_value = self.population[i, m, j, n]
+            new_value = self.generate_block(i, partner_idx, (m, j, n))
+            new_ap_power = self.ap_power[i, m] + abs(new_value)**2 - abs(old_value)**2
+            
+            if new_ap_power <= self.context.p_max_watts:
+                # Chỉ cột j của G thay đổi: G[:, j] += conj(H[m, :, n]) * delta
+                old_col = self.gain[i, :, j]
+                new_col = old_col + self.context.H_conj[m, :, n] * (new_value - old_value)
+                delta = np.abs(new_col)**2 - np.abs(old_col)**2
+                
+                signal = self.signal_power[i].copy()
+                interference = self.interference_power[i] + delta
+                signal[j] += delta[j]
+                interference[j] -= delta[j]
+                
+                new_fitness = np.sum(self.metrics.rates_from_power(signal, interference))
+                if self.sensing is not None:
+                    # Độ lợi cảm biến chỉ đổi theo phần tử w_mj: O(N T)
+                    old_vec = self.population[i, m, j]
+                    new_vec = old_vec.copy()
+                    new_vec[n] = new_value
+                    sensing_gain = self.sensing_gain[i] + \
+                        self.sensing.block_gain(new_vec) - self.sensing.block_gain(old_vec)
+                    new_fitness = self.sensing.combine(new_fitness, sensing_gain)
+                if new_fitness > self.fitness[i]:
+                    self.population[i, m, j, n] = new_value
+                    if self.sensing is not None:
+                        self.sensing_gain[i] = sensing_gain
+                    self.gain[i, :, j] = new_col
+                    self.signal_power[i] = signal
+                    self.interference_power[i] = interference
+                    self.ap_power[i, m] = new_ap_power
+                    self.fitness[i] = new_fitness
+                    self.trial_counters[i] = 0
+                    self.n_acceptances += 1
+                else:
+                    self.trial_counters[i] += 1
+                return
+            
+            new_block = self.population[i, m].copy()
+            new_block[j, n] = new_value
+        else:
+            new_block = self.generate_block(i, partner_idx, (m,))
+            new_ap_power = np.sum(np.abs(new_block)**2)
+        
+        # Cả khối W[m] thay đổi (hoặc phải scale về P_max): cập nhật G qua
+        # đóng góp của riêng AP m, C[k, j] = sum_n conj(H[m, k, n]) * w_mjn
+        if new_ap_power > self.context.p_max_watts:
+            new_block = new_block * np.sqrt(self.context.p_max_watts / new_ap_power)
+            new_ap_power = self.context.p_max_watts
+        delta_block = new_block - self.population[i, m]
+        gain = self.gain[i] + self.context.H_conj[m] @ delta_block.T
+        signal, interference = self.metrics.split_gain_power(gain)
+        
+        new_fitness = np.sum(self.metrics.rates_from_power(signal, interference))
+        if self.sensing is not None:
+            # Độ lợi cảm biến chỉ đổi theo khối W[m]: O(K N T)
+            sensing_gain = self.sensing_gain[i] + \
+                self.sensing.block_gain(new_block) - self.sensing.block_gain(self.population[i, m])
+            new_fitness = self.sensing.combine(new_fitness, sensing_gain)
+        if new_fitness > self.fitness[i]:
+            self.population[i, m] = new_block
+            if self.sensing is not None:
+                self.sensing_gain[i] = sensing_gain
+            self.gain[i] = gain
+            self.signal_power[i] = signal
+            self.interference_power[i] = interference
+            self.ap_power[i, m] = new_ap_power
+            self.fitness[i] = new_fitness
+            self.trial_counters[i] = 0
+            self.n_acceptances += 1
+        else:
+            self.trial_counters[i] += 1
+
+    def employed_bees_phase_coordinate(self):
+        """Giai đoạn Ong thợ (coordinate): mỗi ong thử 1 tọa độ"""
+        idx = np.arange(self.pop_size)
+        partners = self.select_partners(idx)
+        for i, k in zip(idx, partners):
+            self.coordinate_trial(i, k)
+
+    def onlooker_bees_phase_coordinate(self):
+        """Giai đoạn Ong quan sát (coordinate)"""
+        prob = self.fitness / np.sum(self.fitness)
+        idx = np.random.choice(self.pop_size, size=self.pop_size, p=prob)
+        partners = self.select_partners(idx)
+        for i, k in zip(idx, partners):
+            self.coordinate_trial(i, k)
+
+    def scout_bees_phase_coordinate(self):
+        """Giai đoạn Ong trinh sát (coordinate) + làm mới cache định kỳ"""
+        idx = np.flatnonzero(self.trial_counters > self.limit)
+        if len(idx) > 0:
+            self.population[idx] = self.scout_solutions(len(idx))
+            self.trial_counters[idx] = 0
+            self.n_scout_resets += len(idx)
+            self.refresh_cache(idx)
+            self.n_evaluations += len(idx)
+        
+        # Các cập nhật tăng dần tích lũy sai số làm tròn => định kỳ tính lại
+        self.cycles_since_refresh += 1
+        if self.cycles_since_refresh >= self.cache_refresh:
+            self.refresh_cache()
+            self.cycles_since_refresh = 0
 
     def memorize_best_solution(self):
         """Lưu lại kết quả tốt nhất vòng lặp này"""
@@ -134,21 +712,167 @@ class ArtificialBeeColony:
             self.best_fitness = self.fitness[current_best_idx]
             self.best_solution = copy.deepcopy(self.population[current_best_idx])
 
-    def solve(self):
-        """Hàm chạy chính"""
-        self.initialize_population()
-        
-        for cycle in range(self.max_cycle):
+    def run_cycle(self):
+        """Một vòng lặp đầy đủ: Ong thợ -> Ong quan sát -> Ong trinh sát -> ghi nhớ"""
+        instrumentation = self.instrumentation
+        if instrumentation is None:
             self.employed_bees_phase()
             self.onlooker_bees_phase()
             self.scout_bees_phase()
-            self.memorize_best_solution()
+        else:
+            instrumentation.start_cycle()
+            with instrumentation.timer('employed'):
+                self.employed_bees_phase()
+            with instrumentation.timer('onlooker'):
+                self.onlooker_bees_phase()
+            with instrumentation.timer('scout'):
+                self.scout_bees_phase()
+        if self.memetic_interval > 0 and (len(self.convergence_curve) + 1) % self.memetic_interval == 0:
+            if instrumentation is None:
+                self.memetic_phase()
+            else:
+                with instrumentation.timer('memetic'):
+                    self.memetic_phase()
+        self.memorize_best_solution()
+        
+        # Lưu lịch sử hội tụ
+        self.convergence_curve.append(self.best_fitness)
+        
+        if self.callbacks or instrumentation is not None:
+            self.notify_cycle()
+
+    def notify_cycle(self):
+        """Dựng thống kê của vòng lặp vừa chạy và gọi các callback"""
+        counters = (self.n_evaluations, self.n_acceptances, self.n_scout_resets)
+        stats = {
+            'cycle': len(self.convergence_curve),
+            'best_fitness': self.best_fitness,
+            'n_evaluations': counters[0] - self.counter_snapshot[0],
+            'n_acceptances': counters[1] - self.counter_snapshot[1],
+            'n_scout_resets': counters[2] - self.counter_snapshot[2],
+        }
+        self.counter_snapshot = counters
+        if self.instrumentation is not None:
+            stats = self.instrumentation.end_cycle(stats)
+        for callback in self.callbacks:
+            callback(self, stats)
+
+    def check_stopping(self):
+        """
+        Kiểm tra các tiêu chí dừng sớm sau mỗi vòng lặp.
+        Ngân sách đánh giá / thời gian được kiểm tra ở ranh giới vòng lặp,
+        nên có thể vượt tối đa một vòng lặp.
+        
+        Returns:
+            Tên tiêu chí đã kích hoạt, hoặc None nếu tiếp tục chạy
+        """
+        if self.target_rate is not None and self.best_fitness >= float(self.target_rate):
+            return 'target_rate'
+        if self.max_evaluations is not None and self.n_evaluations >= int(self.max_evaluations):
+            return 'max_evaluations'
+        if self.time_limit is not None and time.perf_counter() - self.start_time >= float(self.time_limit):
+            return 'time_limit'
+        if self.stall_window is not None:
+            window = int(self.stall_window)
+            if len(self.convergence_curve) > window:
+                previous = self.convergence_curve[-1 - window]
+                gain = self.convergence_curve[-1] - previous
+                if gain <= self.stall_tol * abs(previous):
+                    return 'stall'
+        return None
+
+    def get_state(self):
+        """
+        Trạng thái đầy đủ của lần chạy (quần thể, fitness, bộ đếm, best,
+        đường hội tụ và trạng thái RNG toàn cục) dưới dạng dict các mảng,
+        đủ để tiếp tục chạy và cho kết quả giống hệt lần chạy không bị ngắt.
+        """
+        _, rng_keys, rng_pos, rng_has_gauss, rng_cached_gaussian = np.random.get_state()
+        return {
+            'population': self.population,
+            'fitness': self.fitness,
+            'trial_counters': self.trial_counters,
+            'best_solution': self.best_solution,
+            'best_fitness': np.float64(self.best_fitness),
+            'convergence_curve': np.asarray(self.convergence_curve, dtype=float),
+            'counters': np.array([self.n_evaluations, self.n_acceptances, self.n_scout_resets]),
+            'gradient_evaluations': np.int64(self.n_gradient_evaluations),
+            'cycles_since_refresh': np.int64(self.cycles_since_refresh),
+            'rng_keys': rng_keys,
+            'rng_state': np.array([rng_pos, rng_has_gauss]),
+            'rng_cached_gaussian': np.float64(rng_cached_gaussian),
+        }
+
+    def set_state(self, state):
+        """Khôi phục trạng thái từ get_state() (hoặc từ file checkpoint đã đọc)"""
+        if tuple(state['population'].shape[1:]) != self.solution_shape:
+            raise ValueError(f"Checkpoint có kích thước giải pháp {state['population'].shape[1:]}, "
+                             f"solver yêu cầu {self.solution_shape}")
+        self.population = np.array(state['population'])
+        self.fitness = np.array(state['fitness'])
+        self.trial_counters = np.array(state['trial_counters'])
+        self.best_solution = np.array(state['best_solution'])
+        self.best_fitness = float(state['best_fitness'])
+        self.convergence_curve = [float(value) for value in state['convergence_curve']]
+        self.n_evaluations, self.n_acceptances, self.n_scout_resets = (int(value) for value in state['counters'])
+        self.cycles_since_refresh = int(state['cycles_since_refresh'])
+        # Checkpoint cũ (trước khi có tìm kiếm cục bộ) không có khóa này
+        self.n_gradient_evaluations = int(state['gradient_evaluations']) if 'gradient_evaluations' in state else 0
+        rng_pos, rng_has_gauss = (int(value) for value in state['rng_state'])
+        np.random.set_state(('MT19937', np.array(state['rng_keys']), rng_pos, rng_has_gauss,
+                             float(state['rng_cached_gaussian'])))
+        if self.engine == 'coordinate':
+            self.refresh_cache()
+
+    def save_checkpoint(self, path):
+        """Ghi trạng thái ra file .npz (ghi file tạm rồi đổi tên => không bao giờ để lại file hỏng)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **self.get_state())
+        os.replace(tmp_path, path)
+
+    def load_checkpoint(self, path):
+        with np.load(path) as state:
+            self.set_state(state)
+
+    def solve(self, checkpoint_path=None):
+        """
+        Hàm chạy chính.
+        Dừng khi hết max_cycle hoặc khi một tiêu chí dừng sớm kích hoạt.
+        Sau khi chạy: self.stop_reason, self.n_evaluations cho biết lý do dừng
+        và số lần đánh giá đã dùng; convergence_curve chỉ chứa các vòng đã chạy.
+        
+        Args:
+            checkpoint_path: File checkpoint (tùy chọn). Nếu đã tồn tại thì tiếp tục
+                chạy từ trạng thái trong file; trạng thái được ghi lại mỗi
+                checkpoint_interval vòng lặp.
+        """
+        self.start_time = time.perf_counter()
+        self.stop_reason = 'max_cycle'
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            self.load_checkpoint(checkpoint_path)
+        else:
+            self.initialize_population()
+        self.counter_snapshot = (self.n_evaluations, self.n_acceptances, self.n_scout_resets)
+        
+        for cycle in range(len(self.convergence_curve), self.max_cycle):
+            # Log tiến độ (mỗi log_interval vòng) do callback ProgressPrinter đảm nhận
+            self.run_cycle()
             
-            # Lưu lịch sử hội tụ
-            self.convergence_curve.append(self.best_fitness)
+            if checkpoint_path is not None and self.checkpoint_interval > 0 \
+                    and (cycle + 1) % self.checkpoint_interval == 0:
+                self.save_checkpoint(checkpoint_path)
             
-            # (Tùy chọn) In log mỗi 10 vòng
-            if (cycle+1) % 10 == 0:
-                print(f"Cycle {cycle+1}/{self.max_cycle}: Best Rate = {self.best_fitness:.4f} bps/Hz")
+            reason = self.check_stopping()
+            if reason is not None:
+                self.stop_reason = reason
+                print(f"Dừng sớm tại cycle {cycle+1}: {reason} "
+                      f"(Best Rate = {self.best_fitness:.4f} bps/Hz, {self.n_evaluations} lần đánh giá)")
+                break
+        
+        if self.memetic_final_steps > 0 and self.convergence_curve:
+            self.polish_best_solution(self.memetic_final_steps)
+            self.convergence_curve[-1] = self.best_fitness
                 
-        return self.best_fitness, self.convergence_curve
\ No newline at end of file
+        return self.best_fitness, self.convergence_curve
@@ -2,9 +2,9 @@ import numpy as np
 from src.algorithms.abc_base import ArtificialBeeColony
 
 class GbestABC(ArtificialBeeColony):
-    def __init__(self, config, channel_H, metrics_calculator):
+    def __init__(self, config, channel_H, metrics_calculator, context=None):
         # Gọi hàm khởi tạo của lớp cha
-        super().__init__(config, channel_H, metrics_calculator)
+        super().__init__(config, channel_H, metrics_calculator, context)
         
         # Load thêm tham số psi cho G-ABC
         self.psi_factor = float(config['algorithm']['psi'])
@@ -16,11 +16,11 @@ class GbestABC(ArtificialBeeColony):
         v_i = x_i + phi*(x_i - x_k) + psi*(x_best - x_i)
         """
         # 1. Thành phần ngẫu nhiên (Exploration)
-        phi = np.random.uniform(-1, 1, size=(self.M, self.K, self.N))
+        phi = self.random_uniform(-1, 1, size=self.solution_shape)
         
         # 2. Thành phần dẫn hướng (Exploitation)
         # psi là số dương khoảng [0, 1.5]
-        psi = np.random.uniform(0, self.psi_factor, size=(self.M, self.K, self.N))
+        psi = self.random_uniform(0, self.psi_factor, size=self.solution_shape)
         
         current_sol = self.population[current_idx]
         partner_sol = self.population[partner_idx]
@@ -32,4 +32,36 @@ class GbestABC(ArtificialBeeColony):
         
         new_candidate = current_sol + term1 + term2
         
-        return new_candidate
\ No newline at end of file
+        return new_candidate
+
+    def generate_candidates_batch(self, idx, partner_idx):
+        """
+        OVERRIDE: Phiên bản batch của công thức G-ABC cho chế độ 'batched'.
+        phi, psi được rút cho toàn bộ lô (B, M, K, N) trong một lần gọi.
+        """
+        shape = (len(idx),) + self.solution_shape
+        phi = self.random_uniform(-1, 1, size=shape)
+        psi = self.random_uniform(0, self.psi_factor, size=shape)
+        
+        current_sol = self.population[idx]
+        partner_sol = self.population[partner_idx]
+        
+        # best_solution (M, K, N) được broadcast theo trục batch
+        term1 = phi * (current_sol - partner_sol)
+        term2 = psi * (self.best_solution - current_sol)
+        
+        return current_sol + term1 + term2
+
+
+    def generate_block(self, current_idx, partner_idx, block):
+        """
+        OVERRIDE: Công thức G-ABC áp dụng trên một khối tọa độ (engine 'coordinate').
+        """
+        current = self.population[current_idx][block]
+        partner = self.population[partner_idx][block]
+        best = self.best_solution[block]
+        
+        phi = self.random_uniform(-1, 1, size=np.shape(current))
+        psi = self.random_uniform(0, self.psi_factor, size=np.shape(current))
+        
+        return current + phi * (current - partner) + psi * (best - current)
@@ -0,0 +1,350 @@
+import copy
+import time
+import pickle
+import traceback
+import multiprocessing as mp
+import numpy as np
+
+from src.system_model.metrics import SystemMetrics
+from src.system_model.context import BlockChannelContext
+from src.algorithms.abc_variants import GbestABC
+
+
+def cluster_partition(M, n_clusters=None):
+    """Chia M AP thành n_clusters cụm liên tiếp gần bằng nhau (None = mỗi AP một cụm)"""
+    n_clusters = M if n_clusters is None else int(n_clusters)
+    if not 1 <= n_clusters <= M:
+        raise ValueError(f"n_clusters phải trong [1, {M}] (nhận {n_clusters})")
+    return np.array_split(np.arange(M), n_clusters)
+
+
+def message_bytes(message):
+    """Kích thước một thông điệp khi tuần tự hóa để gửi qua mạng (bytes)"""
+    return len(pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class ClusterAgent:
+    def __init__(self, config, H_block, cluster_id, seed_seq):
+        """
+        Một cụm AP chạy colony G-ABC cục bộ trên khối W_c (M_c, K, N) của mình.
+        Agent chỉ biết kênh cục bộ H_c; phần còn lại của mạng đến dưới dạng
+        tóm tắt nhiễu: tổng độ lợi hiệu dụng G (K, K) của mọi cụm. Ràng buộc
+        công suất từng AP được áp ngay trong colony cục bộ (như bài toán đầy đủ).
+
+        Như Island, trạng thái RNG riêng được lưu lại sau mỗi lần chạy nên các
+        agent chạy xen kẽ trong một process cho kết quả giống khi mỗi agent
+        chạy trong process riêng.
+        """
+        config = copy.deepcopy(config)
+        config['system']['M'] = H_block.shape[0]
+        config['algorithm']['log_interval'] = 0 # Các agent không in tiến độ riêng
+        config['algorithm']['eval_workers'] = 0
+        self.cluster_id = cluster_id
+
+        np.random.seed(seed_seq.generate_state(4))
+        self.context = BlockChannelContext(H_block, config)
+        self.solver = GbestABC(config, H_block, SystemMetrics(config), self.context)
+        # Khởi tạo theo góc nhìn cục bộ (chưa biết nhiễu từ các cụm khác)
+        self.solver.initialize_population()
+        self.rng_state = np.random.get_state()
+
+        self.committed = self.solver.best_solution.copy() # Khối đang được mạng sử dụng
+        self.proposal = None                                # Khối đề xuất ở vòng gần nhất
+
+    def gain(self, W):
+        """Đóng góp (K, K) của một khối W_c vào ma trận độ lợi toàn mạng"""
+        return self.context.block_gain(W[np.newaxis])[0]
+
+    def commit(self, accepted):
+        if accepted and self.proposal is not None:
+            self.committed = self.proposal
+        self.proposal = None
+
+    def retarget(self, G_total, rate):
+        """
+        Cập nhật tóm tắt nhiễu từ các cụm khác rồi chấm lại quần thể cục bộ.
+        Khối đã commit trên kênh mới cho đúng Sum Rate toàn mạng rate nên được
+        đưa lại vào quần thể mà không tốn thêm lần đánh giá.
+        """
+        solver = self.solver
+        self.context.interference = (G_total - self.gain(self.committed)).astype(self.context.complex_dtype)
+        solver.fitness = solver.evaluate_batch(solver.population)
+        if solver.engine == 'coordinate':
+            solver.refresh_cache()
+        solver.best_solution = self.committed.copy()
+        solver.best_fitness = rate
+        solver.inject_solutions(self.committed[np.newaxis], np.array([rate]))
+
+    def handle(self, message):
+        """
+        Xử lý một thông điệp của bộ điều phối, trả lời bằng dict nhỏ:
+            ('init',)                                -> gain của khối ban đầu
+            ('round', G_total, rate, accepted, n)    -> chạy n vòng lặp, gain của khối đề xuất
+            ('finish', accepted)                     -> khối W_c cuối cùng (chỉ gửi một lần)
+        """
+        kind = message[0]
+        if kind == 'init':
+            return {'gain': self.gain(self.committed)}
+        if kind == 'round':
+            _, G_total, rate, accepted, n_cycles = message
+            start = time.perf_counter()
+            self.commit(accepted)
+            self.retarget(G_total, rate)
+            np.random.set_state(self.rng_state)
+            for _ in range(n_cycles):
+                self.solver.run_cycle()
+            self.rng_state = np.random.get_state()
+            self.proposal = self.solver.best_solution.copy()
+            return {'gain': self.gain(self.proposal), 'local_rate': float(self.solver.best_fitness),
+                    'seconds': time.perf_counter() - start}
+        if kind == 'finish':
+            self.commit(message[1])
+            return {'W': self.committed, 'n_evaluations': self.solver.n_evaluations}
+        raise ValueError(f"Thông điệp không hợp lệ: {kind}")
+
+
+class LocalTransport:
+    def __init__(self, agent_args):
+        """
+        Mọi agent trong process hiện tại, xử lý tuần tự. Thông điệp không cần
+        tuần tự hóa nhưng vẫn được đo kích thước như khi gửi qua mạng, để số
+        liệu trao đổi so sánh được giữa các transport.
+
+        :param agent_args: Tham số dựng ClusterAgent của từng cụm
+        """
+        self.agents = [ClusterAgent(*args) for args in agent_args]
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def request(self, messages):
+        """Gửi messages[c] tới agent c, trả về các câu trả lời theo thứ tự cụm"""
+        replies = []
+        for agent, message in zip(self.agents, messages):
+            self.bytes_sent += message_bytes(message)
+            replies.append(agent.handle(message))
+            self.bytes_received += message_bytes(replies[-1])
+        return replies
+
+    def close(self):
+        pass
+
+
+def run_agent_process(agent_args, conn):
+    """Vòng đời một agent trong process riêng: nhận / trả thông điệp đã tuần tự hóa qua Pipe"""
+    try:
+        agent = ClusterAgent(*agent_args)
+        conn.send_bytes(pickle.dumps({'ready': True}))
+        for payload in iter(conn.recv_bytes, b''):
+            reply = agent.handle(pickle.loads(payload))
+            conn.send_bytes(pickle.dumps(reply, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        conn.send_bytes(pickle.dumps({'error': traceback.format_exc()}))
+    finally:
+        conn.close()
+
+
+class ProcessTransport:
+    def __init__(self, agent_args):
+        """
+        Mỗi agent một process, trao đổi bằng bytes đã tuần tự hóa qua mp.Pipe
+        (cùng giao diện với một transport mạng thật). bytes_sent /
+        bytes_received đếm đúng số byte đi qua đường truyền.
+        """
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.connections = []
+        self.processes = []
+        for args in agent_args:
+            parent_conn, child_conn = mp.Pipe()
+            process = mp.Process(target=run_agent_process, args=(args, child_conn), daemon=True)
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+        try:
+            self.receive_all()
+        except Exception:
+            self.close()
+            raise
+        self.bytes_received = 0 # Không tính thông điệp báo sẵn sàng
+
+    def receive_all(self):
+        replies = []
+        for cluster_id, conn in enumerate(self.connections):
+            payload = conn.recv_bytes()
+            self.bytes_received += len(payload)
+            reply = pickle.loads(payload)
+            if 'error' in reply:
+                raise RuntimeError(f"Agent cụm {cluster_id} lỗi:\n{reply['error']}")
+            replies.append(reply)
+        return replies
+
+    def request(self, messages):
+        # Gửi cho mọi agent trước rồi mới nhận => các cụm tính song song
+        for conn, message in zip(self.connections, messages):
+            payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+            self.bytes_sent += len(payload)
+            conn.send_bytes(payload)
+        return self.receive_all()
+
+    def close(self):
+        for conn in self.connections:
+            try:
+                conn.send_bytes(b'')
+            except (OSError, ValueError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for conn in self.connections:
+            conn.close()
+
+
+# Transport giữa bộ điều phối và các agent: tên -> class(agent_args) có request() / close()
+TRANSPORTS = {
+    'local': LocalTransport,
+    'process': ProcessTransport,
+}
+
+
+class DistributedGABC:
+    def __init__(self, config, channel_H, seed=None, transport=None):
+        """
+        G-ABC phân rã theo cụm AP: mỗi cụm (hoặc mỗi AP) chạy colony cục bộ
+        trên khối W_c của mình; qua fronthaul chỉ trao đổi tóm tắt nhiễu - ma
+        trận độ lợi hiệu dụng (K, K) - thay vì kênh (M, K, N) hay W.
+
+        Mỗi vòng trao đổi:
+        1. Bộ điều phối gửi cho mọi cụm tổng độ lợi G, Sum Rate hiện tại và cờ
+           chấp nhận đề xuất của vòng trước.
+        2. Mỗi cụm commit / bỏ đề xuất cũ, lấy G_rest = G - G_c làm nhiễu cố
+           định, chạy local_cycles vòng G-ABC rồi gửi lại độ lợi G_c' của khối
+           tốt nhất.
+        3. Bộ điều phối xét lần lượt từng cụm: thay G_c bằng G_c' nếu Sum Rate
+           toàn mạng tăng (chấp nhận tham lam => Sum Rate không bao giờ giảm,
+           tránh dao động khi mọi cụm cùng đổi một lúc).
+        Khối W_c chỉ được gửi về một lần khi kết thúc.
+
+        :param config: Cấu hình đã load từ config.yaml (mục 'distributed')
+        :param channel_H: Ma trận kênh (M, K, N); cụm c chỉ nhận H[các AP của c]
+        :param seed: Root seed (None = lấy entropy ngẫu nhiên từ hệ điều hành)
+        :param transport: Tên trong TRANSPORTS hoặc class transport (None = distributed.transport)
+        """
+        dist_cfg = config.get('distributed') or {}
+        if config['system'].get('user_centric', False):
+            raise ValueError("DistributedGABC chỉ hỗ trợ bố cục dày đặc (tắt system.user_centric)")
+        if (config.get('sensing') or {}).get('enabled', False):
+            raise ValueError("DistributedGABC chưa hỗ trợ thành phần cảm biến (sensing.enabled)")
+        self.config = config
+        self.H = channel_H
+        self.M, self.K, self.N = channel_H.shape
+        self.clusters = cluster_partition(self.M, dist_cfg.get('n_clusters'))
+        self.rounds = int(dist_cfg.get('rounds', 20))
+        self.local_cycles = int(dist_cfg.get('local_cycles', 5))
+        transport = transport or dist_cfg.get('transport', 'local')
+        if isinstance(transport, str):
+            if transport not in TRANSPORTS:
+                raise ValueError(f"Transport không hợp lệ: {transport} (chọn một trong {tuple(TRANSPORTS)})")
+            transport = TRANSPORTS[transport]
+        self.transport_class = transport
+        self.root_entropy = np.random.SeedSequence(seed).entropy
+        self.metrics = SystemMetrics(config)
+
+        self.best_fitness = -np.inf
+        self.best_solution = None
+        self.convergence_curve = [] # Sum Rate toàn mạng sau mỗi vòng trao đổi
+        self.round_stats = []       # Số liệu trao đổi / thời gian của từng vòng
+        self.n_evaluations = 0
+        self.collection_bytes = 0   # Gửi các khối W_c về một lần khi kết thúc
+
+    def agent_args(self):
+        return [(self.config, np.ascontiguousarray(self.H[aps]), c,
+                 np.random.SeedSequence(self.root_entropy, spawn_key=(c,)))
+                for c, aps in enumerate(self.clusters)]
+
+    def sum_rate(self, G):
+        signal_power, interference_power = self.metrics.split_gain_power(G)
+        return float(np.sum(self.metrics.rates_from_power(signal_power, interference_power)))
+
+    def accept_proposals(self, gains, proposals):
+        """
+        Chấp nhận tham lam theo thứ tự cụm: (G mới, Sum Rate mới, cờ chấp nhận từng cụm).
+        G luôn được cộng lại từ độ lợi của các cụm (complex128) thay vì cộng / trừ
+        dồn qua các vòng: khi nhiễu gần như triệt tiêu, sai số làm tròn tích lũy
+        (nhất là với precision: single) làm sai lệch đáng kể Sum Rate.
+        """
+        rate = self.sum_rate(np.sum(gains, axis=0))
+        accepted = []
+        for c, proposal in enumerate(proposals):
+            G_try = np.sum(gains[:c] + [proposal] + gains[c + 1:], axis=0)
+            rate_try = self.sum_rate(G_try)
+            accepted.append(rate_try > rate)
+            if accepted[-1]:
+                rate = rate_try
+                gains[c] = proposal
+        return np.sum(gains, axis=0), rate, accepted
+
+    def solve(self):
+        """
+        Chạy rounds vòng trao đổi. Sau khi chạy: best_solution (M, K, N) ghép
+        từ các khối, round_stats gồm bytes gửi xuống / nhận lên và thời gian
+        (tổng, tính toán lâu nhất trong các cụm) của từng vòng.
+
+        Returns:
+            best_fitness: Sum Rate toàn mạng (tính lại trên W đã ghép)
+            convergence_curve: Sum Rate sau mỗi vòng (rounds,)
+        """
+        transport = self.transport_class(self.agent_args())
+        try:
+            gains = [reply['gain'].astype(np.complex128)
+                     for reply in transport.request([('init',)] * len(self.clusters))]
+            G_total = np.sum(gains, axis=0)
+            rate = self.sum_rate(G_total)
+            accepted = [False] * len(self.clusters)
+            for round_idx in range(self.rounds):
+                sent, received = transport.bytes_sent, transport.bytes_received
+                start = time.perf_counter()
+                replies = transport.request([('round', G_total, rate, flag, self.local_cycles)
+                                             for flag in accepted])
+                G_total, rate, accepted = self.accept_proposals(
+                    gains, [reply['gain'].astype(np.complex128) for reply in replies])
+                self.convergence_curve.append(rate)
+                self.round_stats.append({
+                    'round': round_idx + 1,
+                    'sum_rate': rate,
+                    'n_accepted': int(sum(accepted)),
+                    'bytes_down': transport.bytes_sent - sent,
+                    'bytes_up': transport.bytes_received - received,
+                    'seconds': time.perf_counter() - start,
+                    'compute_seconds': max(reply['seconds'] for reply in replies),
+                })
+
+            received = transport.bytes_received
+            replies = transport.request([('finish', flag) for flag in accepted])
+            self.collection_bytes = transport.bytes_received - received
+        finally:
+            transport.close()
+
+        self.best_solution = np.zeros(self.H.shape, dtype=replies[0]['W'].dtype)
+        for aps, reply in zip(self.clusters, replies):
+            self.best_solution[aps] = reply['W']
+        self.n_evaluations = sum(reply['n_evaluations'] for reply in replies)
+        self.best_fitness = self.metrics.calculate_sum_rate_batch(self.best_solution[np.newaxis], self.H)[0][0]
+        return self.best_fitness, self.convergence_curve
+
+    def exchange_summary(self):
+        """Trung bình theo vòng: bytes mỗi chiều, thời gian vòng và phần tính toán"""
+        stats = self.round_stats
+        return {
+            'n_clusters': len(self.clusters),
+            'rounds': len(stats),
+            'bytes_down_per_round': float(np.mean([s['bytes_down'] for s in stats])),
+            'bytes_up_per_round': float(np.mean([s['bytes_up'] for s in stats])),
+            'seconds_per_round': float(np.mean([s['seconds'] for s in stats])),
+            'compute_seconds_per_round': float(np.mean([s['compute_seconds'] for s in stats])),
+            'collection_bytes': self.collection_bytes,
+            # Tham chiếu: gom toàn bộ kênh về một nơi để giải tập trung
+            'centralized_channel_bytes': int(np.asarray(self.H).nbytes),
+        }
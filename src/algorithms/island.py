@@ -0,0 +1,221 @@
+import copy
+import traceback
+import multiprocessing as mp
+import numpy as np
+
+from src.system_model.metrics import SystemMetrics
+from src.system_model.context import build_context
+from src.algorithms.abc_variants import GbestABC
+
+# Topology di cư giữa các đảo
+TOPOLOGIES = ('ring', 'full')
+
+
+def migration_targets(island_id, n_islands, topology):
+    """Các đảo nhận giải pháp di cư từ island_id"""
+    if topology == 'ring':
+        return [(island_id + 1) % n_islands] if n_islands > 1 else []
+    if topology == 'full':
+        return [j for j in range(n_islands) if j != island_id]
+    raise ValueError(f"Topology không hợp lệ: {topology} (chọn một trong {TOPOLOGIES})")
+
+
+def migration_segments(max_cycle, interval):
+    """Chia max_cycle vòng lặp thành các đoạn; di cư ở ranh giới giữa 2 đoạn"""
+    if not interval or interval >= max_cycle:
+        return [max_cycle]
+    segments = [interval] * (max_cycle // interval)
+    if max_cycle % interval:
+        segments.append(max_cycle % interval)
+    return segments
+
+
+class Island:
+    def __init__(self, config, channel_H, beta, island_id, seed_seq, psi):
+        """
+        Một quần thể G-ABC độc lập (một đảo) với luồng RNG và psi riêng.
+        Trạng thái RNG toàn cục được lưu lại sau mỗi đoạn chạy, nên nhiều
+        đảo có thể chạy xen kẽ trong cùng một process mà vẫn cho kết quả
+        giống hệt khi mỗi đảo chạy trong process riêng.
+        """
+        config = copy.deepcopy(config)
+        config['algorithm']['psi'] = psi
+        config['algorithm']['log_interval'] = 0 # Các đảo không in tiến độ riêng
+        config['algorithm']['eval_workers'] = 0 # Process đảo là daemon, không tạo được process đánh giá
+        self.island_id = island_id
+        self.psi = psi
+
+        np.random.seed(seed_seq.generate_state(4))
+        context = build_context(channel_H, config, beta)
+        self.solver = GbestABC(config, channel_H, SystemMetrics(config), context)
+        self.solver.initialize_population()
+        self.rng_state = np.random.get_state()
+
+    def advance(self, n_cycles):
+        np.random.set_state(self.rng_state)
+        for _ in range(n_cycles):
+            self.solver.run_cycle()
+        self.rng_state = np.random.get_state()
+
+    def emigrants(self, n_migrants):
+        """n_migrants nguồn thức ăn tốt nhất của đảo (bản sao) cùng fitness"""
+        top = np.argsort(self.solver.fitness)[::-1][:n_migrants]
+        return self.solver.population[top].copy(), self.solver.fitness[top].copy()
+
+    def immigrate(self, packets):
+        """Nhận các gói di cư (epoch, nguồn, giải pháp, fitness), theo thứ tự đảo nguồn"""
+        packets = sorted(packets, key=lambda packet: packet[1])
+        solutions = np.concatenate([packet[2] for packet in packets])
+        fitness = np.concatenate([packet[3] for packet in packets])
+        return self.solver.inject_solutions(solutions, fitness)
+
+    def result(self):
+        return {
+            'island': self.island_id,
+            'psi': self.psi,
+            'best_fitness': self.solver.best_fitness,
+            'curve': list(self.solver.convergence_curve),
+            'best_solution': self.solver.best_beamformer,
+            'n_evaluations': self.solver.n_evaluations,
+        }
+
+
+def run_island_process(config, channel_H, beta, island_id, seed_seq, psi, segments,
+                       n_migrants, targets, n_sources, inboxes, result_queue):
+    """
+    Vòng đời một đảo trong process riêng. Di cư đồng bộ: sau mỗi đoạn, đảo
+    gửi giải pháp tốt nhất tới các đảo đích rồi chờ đủ gói của cùng epoch
+    từ mọi đảo nguồn (gói của epoch sau đến sớm được giữ lại trong bộ đệm).
+    """
+    try:
+        island = Island(config, channel_H, beta, island_id, seed_seq, psi)
+        pending = {}
+        for epoch, n_cycles in enumerate(segments):
+            island.advance(n_cycles)
+            if epoch == len(segments) - 1:
+                break
+            packet = (epoch, island_id, *island.emigrants(n_migrants))
+            for target in targets:
+                inboxes[target].put(packet)
+            while len(pending.get(epoch, ())) < n_sources:
+                received = inboxes[island_id].get()
+                pending.setdefault(received[0], []).append(received)
+            if n_sources > 0:
+                island.immigrate(pending.pop(epoch))
+        result_queue.put(island.result())
+    except Exception:
+        result_queue.put({'island': island_id, 'error': traceback.format_exc()})
+
+
+class IslandModelGABC:
+    def __init__(self, config, channel_H, beta=None, seed=None):
+        """
+        Mô hình đảo: nhiều quần thể G-ABC độc lập (seed và psi khác nhau),
+        mỗi đảo chạy trong một process. Cứ migration_interval vòng lặp, mỗi
+        đảo gửi n_migrants nguồn thức ăn tốt nhất tới các đảo láng giềng
+        (ring hoặc full) và chúng thay thế các nguồn kém nhất nếu tốt hơn.
+
+        Tiêu chí dừng sớm của từng quần thể không áp dụng ở đây: mọi đảo chạy
+        đủ max_cycle vòng để giữ đồng bộ các lần di cư.
+
+        :param config: Cấu hình đã load từ config.yaml (mục 'island')
+        :param channel_H: Ma trận kênh (M, K, N), dùng chung cho mọi đảo
+        :param beta: Large-scale fading (M, K) cho chế độ user-centric (tùy chọn)
+        :param seed: Root seed (None = lấy entropy ngẫu nhiên từ hệ điều hành)
+        """
+        island_cfg = config.get('island', {})
+        self.config = config
+        self.H = channel_H
+        self.beta = beta
+        self.n_islands = int(island_cfg.get('n_islands', 4))
+        self.migration_interval = island_cfg.get('migration_interval', 10)
+        self.n_migrants = int(island_cfg.get('n_migrants', 2))
+        self.topology = island_cfg.get('topology', 'ring')
+        self.psi_values = island_cfg.get('psi_values') or [config['algorithm']['psi']]
+        self.parallel = bool(island_cfg.get('parallel', True))
+        self.max_cycle = int(config['algorithm']['max_cycle'])
+        self.root_entropy = np.random.SeedSequence(seed).entropy
+        if self.topology not in TOPOLOGIES:
+            raise ValueError(f"Topology không hợp lệ: {self.topology} (chọn một trong {TOPOLOGIES})")
+
+        self.best_fitness = -np.inf
+        self.best_solution = None
+        self.island_results = []
+        self.island_curves = None
+        self.n_evaluations = 0
+
+    def island_args(self, island_id):
+        """(seed_seq, psi) của đảo island_id: chỉ phụ thuộc chỉ số đảo"""
+        seed_seq = np.random.SeedSequence(self.root_entropy, spawn_key=(island_id,))
+        psi = float(self.psi_values[island_id % len(self.psi_values)])
+        return seed_seq, psi
+
+    def sources(self, island_id):
+        return [i for i in range(self.n_islands)
+                if island_id in migration_targets(i, self.n_islands, self.topology)]
+
+    def run_serial(self, segments):
+        """Chạy xen kẽ các đảo trong process hiện tại (cùng kết quả với run_parallel)"""
+        islands = [Island(self.config, self.H, self.beta, i, *self.island_args(i))
+                   for i in range(self.n_islands)]
+        for epoch, n_cycles in enumerate(segments):
+            for island in islands:
+                island.advance(n_cycles)
+            if epoch == len(segments) - 1:
+                break
+            packets = [(epoch, i, *island.emigrants(self.n_migrants)) for i, island in enumerate(islands)]
+            for i, island in enumerate(islands):
+                sources = self.sources(i)
+                if sources:
+                    island.immigrate([packets[j] for j in sources])
+        return [island.result() for island in islands]
+
+    def run_parallel(self, segments):
+        inboxes = [mp.Queue() for _ in range(self.n_islands)]
+        result_queue = mp.Queue()
+        processes = []
+        for i in range(self.n_islands):
+            args = (self.config, self.H, self.beta, i, *self.island_args(i), segments, self.n_migrants,
+                    migration_targets(i, self.n_islands, self.topology), len(self.sources(i)),
+                    inboxes, result_queue)
+            process = mp.Process(target=run_island_process, args=args, daemon=True)
+            process.start()
+            processes.append(process)
+
+        # Nhận kết quả trước khi join để process không bị chặn khi ghi vào queue
+        results = {}
+        try:
+            while len(results) < self.n_islands:
+                result = result_queue.get()
+                if 'error' in result:
+                    raise RuntimeError(f"Đảo {result['island']} lỗi:\n{result['error']}")
+                results[result['island']] = result
+        finally:
+            for process in processes:
+                if len(results) < self.n_islands:
+                    process.terminate()
+                process.join()
+        return [results[i] for i in range(self.n_islands)]
+
+    def solve(self):
+        """
+        Chạy toàn bộ mô hình đảo.
+        Sau khi chạy: self.best_solution (W dạng (M, K, N)) là giải pháp tốt nhất
+        toàn cục, self.island_curves (n_islands, max_cycle) là đường hội tụ từng đảo.
+
+        Returns:
+            best_fitness: Sum Rate tốt nhất trên mọi đảo
+            convergence_curve: Best-so-far toàn cục theo vòng lặp (max_cycle,)
+        """
+        segments = migration_segments(self.max_cycle, self.migration_interval)
+        if self.parallel and self.n_islands > 1:
+            self.island_results = self.run_parallel(segments)
+        else:
+            self.island_results = self.run_serial(segments)
+
+        self.island_curves = np.array([result['curve'] for result in self.island_results])
+        best = max(self.island_results, key=lambda result: result['best_fitness'])
+        self.best_fitness = best['best_fitness']
+        self.best_solution = best['best_solution']
+        self.n_evaluations = sum(result['n_evaluations'] for result in self.island_results)
+        return self.best_fitness, np.max(self.island_curves, axis=0)
@@ -0,0 +1,248 @@
+import numpy as np
+from src.system_model.constraints import enforce_power_constraint
+from src.system_model.context import BatchChannelContext
+
+
+def unsupported_options(config):
+    """
+    Các tùy chọn của ArtificialBeeColony mà MultiInstanceABC không thực hiện
+    (đặt khác mặc định => kết quả sẽ khác chế độ tasks): danh sách 'mục.khóa = giá trị'.
+    seed_fraction / seed_noise và memetic_elites / steps / step_size chỉ có
+    tác dụng khi bật seed_precoders / memetic nên không cần xét riêng.
+    """
+    algo_cfg = config['algorithm']
+    checks = {
+        # loop và batched là cùng một thuật toán; coordinate đổi cách sinh ứng viên
+        'engine': algo_cfg.get('engine', 'loop') == 'coordinate',
+        'seed_precoders': bool(algo_cfg.get('seed_precoders')),
+        'scout_seed_prob': float(algo_cfg.get('scout_seed_prob') or 0) > 0,
+        'memetic_interval': int(algo_cfg.get('memetic_interval') or 0) > 0,
+        'memetic_final_steps': int(algo_cfg.get('memetic_final_steps') or 0) > 0,
+        'stall_window': algo_cfg.get('stall_window') is not None,
+        'target_rate': algo_cfg.get('target_rate') is not None,
+        'max_evaluations': algo_cfg.get('max_evaluations') is not None,
+        'time_limit': algo_cfg.get('time_limit') is not None,
+    }
+    return [f"algorithm.{key} = {algo_cfg.get(key)!r}" for key, unsupported in checks.items() if unsupported]
+
+
+class MultiInstanceABC:
+    def __init__(self, config, channel_H_batch, metrics_calculator):
+        """
+        B quần thể ABC độc lập chạy song song theo từng bước (lockstep),
+        quần thể b tối ưu trên kênh riêng H[b]. Mọi phép toán của một pha
+        được thực hiện một lần trên tensor (B, SN, M, K, N), nên chi phí
+        thông dịch Python được chia đều cho cả lô bài toán - có lợi khi mỗi
+        bài toán nhỏ (vd. M=16, K=4, N=2) và có nhiều realization.
+
+        Mỗi quần thể giữ best_solution, trial_counters và bộ đếm đánh giá
+        riêng. Mọi quần thể chạy đủ max_cycle vòng lặp. Chỉ hỗ trợ bố cục dày
+        đặc; engine coordinate, hạt giống precoder, tìm kiếm cục bộ memetic và
+        các tiêu chí dừng sớm không được hỗ trợ (xem unsupported_options) - bật
+        chúng sẽ báo lỗi thay vì âm thầm cho kết quả khác chế độ tasks.
+
+        :param config: Cấu hình đã load từ config.yaml
+        :param channel_H_batch: Các ma trận kênh truyền (B, M, K, N)
+        :param metrics_calculator: SystemMetrics
+        """
+        self.pop_size = int(config['algorithm']['pop_size']) # SN
+        self.max_cycle = int(config['algorithm']['max_cycle'])
+        self.limit = int(config['algorithm']['limit'])
+        self.p_max_dbm = float(config['system']['p_max_dbm'])
+        if config['system'].get('user_centric', False):
+            raise ValueError("MultiInstanceABC chỉ hỗ trợ bố cục dày đặc (user_centric: false)")
+        if (config.get('sensing') or {}).get('enabled', False):
+            raise ValueError("MultiInstanceABC chưa hỗ trợ fitness có thành phần cảm biến (sensing.enabled: false)")
+        unsupported = unsupported_options(config)
+        if unsupported:
+            raise ValueError("MultiInstanceABC không hỗ trợ các tùy chọn (dùng simulation.mode: tasks): "
+                             + ", ".join(unsupported))
+
+        self.config = config
+        self.H = channel_H_batch
+        self.metrics = metrics_calculator
+        self.context = BatchChannelContext(channel_H_batch, config)
+        self.n_instances = self.context.n_instances
+        self.solution_shape = self.context.solution_shape
+        # Chỉ số instance dạng cột, dùng để lấy giải pháp theo (instance, nguồn)
+        self.instance_idx = np.arange(self.n_instances)[:, np.newaxis]
+
+        # Quần thể (B, SN, M, K, N), fitness và bộ đếm thất bại (B, SN)
+        self.population = None
+        self.fitness = np.zeros((self.n_instances, self.pop_size))
+        self.trial_counters = np.zeros((self.n_instances, self.pop_size))
+
+        # Thống kê theo từng instance
+        self.n_evaluations = np.zeros(self.n_instances, dtype=int)
+        self.n_acceptances = np.zeros(self.n_instances, dtype=int)
+        self.n_scout_resets = np.zeros(self.n_instances, dtype=int)
+
+        # Kết quả tốt nhất của từng instance
+        self.best_solution = None                          # (B, M, K, N)
+        self.best_fitness = np.full(self.n_instances, -np.inf) # (B,)
+        self.convergence_curve = []                        # Mỗi vòng lặp một mảng (B,)
+
+    def evaluate(self, W, instances=None):
+        """
+        Fitness của các giải pháp, mỗi giải pháp trên kênh của instance tương ứng.
+        W: (B, S, M, K, N) -> (B, S), hoặc (P, M, K, N) kèm instances (P,) -> (P,)
+        """
+        G = self.context.effective_gain(W, instances)
+        signal_power, interference_power = self.metrics.split_gain_power(G)
+        rates = self.metrics.rates_from_power(signal_power, interference_power)
+        if instances is None:
+            self.n_evaluations += W.shape[1]
+        else:
+            self.n_evaluations += np.bincount(instances, minlength=self.n_instances)
+        return np.sum(rates, axis=-1)
+
+    def random_normal(self, *shape):
+        """np.random.randn ép về kiểu thực của precision (như ArtificialBeeColony)"""
+        return np.random.randn(*shape).astype(self.context.real_dtype, copy=False)
+
+    def random_uniform(self, low, high, size):
+        return np.random.uniform(low, high, size=size).astype(self.context.real_dtype, copy=False)
+
+    def random_solutions(self, shape):
+        X = self.random_normal(*shape, *self.solution_shape) + 1j * self.random_normal(*shape, *self.solution_shape)
+        return enforce_power_constraint(X, self.p_max_dbm, context=self.context, inplace=True)
+
+    def initialize_population(self):
+        """Khởi tạo ngẫu nhiên B quần thể ban đầu"""
+        self.population = self.random_solutions((self.n_instances, self.pop_size))
+        self.fitness = self.evaluate(self.population)
+
+        best_idx = np.argmax(self.fitness, axis=1)
+        self.best_fitness = self.fitness[self.instance_idx[:, 0], best_idx]
+        self.best_solution = self.population[self.instance_idx[:, 0], best_idx].copy()
+
+    def select_partners(self, idx):
+        """Đối tác k != i cho mỗi (instance, con ong), cùng cách dịch như ArtificialBeeColony"""
+        k = np.random.randint(0, self.pop_size - 1, size=idx.shape)
+        return k + (k >= idx)
+
+    def generate_candidates(self, idx, partner_idx):
+        """
+        Công thức ABC gốc cho cả lô: v = x_i + phi * (x_i - x_k).
+        idx, partner_idx: (B, S) => ứng viên (B, S, M, K, N)
+        """
+        phi = self.random_uniform(-1, 1, size=idx.shape + self.solution_shape)
+
+        current_sol = self.population[self.instance_idx, idx]
+        partner_sol = self.population[self.instance_idx, partner_idx]
+
+        return current_sol + phi * (current_sol - partner_sol)
+
+    def greedy_selection(self, idx, candidates):
+        """
+        Chiếu công suất, đánh giá và chọn lọc tham lam cho mọi instance.
+        Trải phẳng (instance, nguồn) thành chỉ số toàn cục rồi áp dụng đúng
+        phép cập nhật có mặt nạ của engine 'batched' (nguồn bị chọn trùng chỉ
+        nhận ứng viên tốt nhất).
+        """
+        candidates = enforce_power_constraint(candidates, self.p_max_dbm, context=self.context, inplace=True)
+        new_fitness = self.evaluate(candidates).ravel()
+
+        flat_idx = (self.instance_idx * self.pop_size + idx).ravel()
+        fitness = self.fitness.reshape(-1)
+        trials = self.trial_counters.reshape(-1)
+        population = self.population.reshape((-1,) + self.solution_shape)
+        candidates = candidates.reshape((-1,) + self.solution_shape)
+        improved = new_fitness > fitness[flat_idx]
+
+        order = np.lexsort((-new_fitness, flat_idx))
+        is_first = np.ones(len(order), dtype=bool)
+        is_first[1:] = flat_idx[order][1:] != flat_idx[order][:-1]
+        winners = order[is_first & improved[order]]
+
+        np.add.at(trials, flat_idx[~improved], 1)
+        trials[flat_idx[winners]] = 0
+        self.n_acceptances += np.bincount(flat_idx[winners] // self.pop_size, minlength=self.n_instances)
+
+        population[flat_idx[winners]] = candidates[winners]
+        fitness[flat_idx[winners]] = new_fitness[winners]
+
+    def employed_bees_phase(self):
+        """Giai đoạn Ong thợ: SN ứng viên cho mỗi instance"""
+        idx = np.broadcast_to(np.arange(self.pop_size), self.fitness.shape)
+        partners = self.select_partners(idx)
+        self.greedy_selection(idx, self.generate_candidates(idx, partners))
+
+    def onlooker_bees_phase(self):
+        """
+        Giai đoạn Ong quan sát: Roulette theo fitness của từng instance.
+        Rút cả B x SN lượt bằng một lần searchsorted trên các CDF nối tiếp
+        (CDF của instance b được dịch lên b).
+        """
+        cdf = np.cumsum(self.fitness, axis=1)
+        cdf /= cdf[:, -1:]
+        offsets = np.arange(self.n_instances)[:, np.newaxis]
+        u = np.random.uniform(size=self.fitness.shape) + offsets
+        idx = np.searchsorted((cdf + offsets).ravel(), u.ravel(), side='right').reshape(u.shape)
+        idx = np.minimum(idx - offsets * self.pop_size, self.pop_size - 1)
+
+        partners = self.select_partners(idx)
+        self.greedy_selection(idx, self.generate_candidates(idx, partners))
+
+    def scout_bees_phase(self):
+        """Giai đoạn Ong trinh sát: reset mọi nguồn cạn kiệt của mọi instance cùng lúc"""
+        instances, idx = np.nonzero(self.trial_counters > self.limit)
+        if len(idx) == 0:
+            return
+
+        new_sol = self.random_solutions((len(idx),))
+        self.population[instances, idx] = new_sol
+        self.fitness[instances, idx] = self.evaluate(new_sol, instances)
+        self.trial_counters[instances, idx] = 0
+        self.n_scout_resets += np.bincount(instances, minlength=self.n_instances)
+
+    def memorize_best_solution(self):
+        """Cập nhật kết quả tốt nhất của từng instance"""
+        best_idx = np.argmax(self.fitness, axis=1)
+        current_best = self.fitness[self.instance_idx[:, 0], best_idx]
+        improved = np.flatnonzero(current_best > self.best_fitness)
+        self.best_fitness[improved] = current_best[improved]
+        self.best_solution[improved] = self.population[improved, best_idx[improved]]
+
+    def run_cycle(self):
+        """Một vòng lặp đầy đủ cho cả B quần thể"""
+        self.employed_bees_phase()
+        self.onlooker_bees_phase()
+        self.scout_bees_phase()
+        self.memorize_best_solution()
+        self.convergence_curve.append(self.best_fitness.copy())
+
+    def solve(self):
+        """
+        Returns:
+            best_fitness: Sum Rate tốt nhất của từng instance (B,)
+            convergence_curves: Đường hội tụ của từng instance (B, max_cycle)
+        """
+        self.initialize_population()
+        for _ in range(self.max_cycle):
+            self.run_cycle()
+        return self.best_fitness, np.array(self.convergence_curve).T
+
+
+class MultiInstanceGbestABC(MultiInstanceABC):
+    def __init__(self, config, channel_H_batch, metrics_calculator):
+        super().__init__(config, channel_H_batch, metrics_calculator)
+        self.psi_factor = float(config['algorithm']['psi'])
+
+    def generate_candidates(self, idx, partner_idx):
+        """
+        OVERRIDE: Công thức G-ABC, mỗi instance dẫn hướng theo x_best của chính nó.
+        v = x_i + phi*(x_i - x_k) + psi*(x_best - x_i)
+        """
+        shape = idx.shape + self.solution_shape
+        phi = self.random_uniform(-1, 1, size=shape)
+        psi = self.random_uniform(0, self.psi_factor, size=shape)
+
+        current_sol = self.population[self.instance_idx, idx]
+        partner_sol = self.population[self.instance_idx, partner_idx]
+
+        # best_solution (B, M, K, N) -> (B, 1, M, K, N) broadcast theo trục SN
+        term1 = phi * (current_sol - partner_sol)
+        term2 = psi * (self.best_solution[:, np.newaxis] - current_sol)
+
+        return current_sol + term1 + term2
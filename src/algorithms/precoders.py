@@ -0,0 +1,185 @@
+import numpy as np
+from src.system_model.constraints import enforce_power_constraint
+
+# Các precoder dạng đóng / lặp dùng làm baseline và làm hạt giống cho quần thể ABC.
+# Quy ước giống SystemMetrics: độ lợi của luồng j tại user k là
+#   a_kj = sum_m h_mk^H w_mj = h_k^H w_j
+# với h_k, w_j là vector ghép từ mọi AP (độ dài M*N).
+
+
+def stack_channel(H):
+    """(M, K, N) -> ma trận (M*N, K), cột k là vector kênh ghép h_k của user k"""
+    M, K, N = H.shape
+    return H.transpose(0, 2, 1).reshape(M * N, K)
+
+
+def unstack_beamformer(V, M, N):
+    """(M*N, K) -> (M, K, N), ngược với stack_channel"""
+    K = V.shape[1]
+    return V.reshape(M, N, K).transpose(0, 2, 1)
+
+
+def scale_to_per_ap_power(W, p_max_dbm):
+    """
+    Scale cả W bằng một hệ số chung sao cho AP tải nặng nhất phát đúng P_max.
+    Giữ nguyên hướng của precoder (vd. ZF vẫn triệt nhiễu hoàn toàn), khác
+    với enforce_power_constraint chỉ scale riêng các AP bị vượt.
+    """
+    p_max_watts = 10**((p_max_dbm - 30) / 10)
+    ap_power = np.sum(np.abs(W)**2, axis=(-2, -1))
+    return W * np.sqrt(p_max_watts / np.max(ap_power))
+
+
+def normalize_columns(V):
+    """Chia đều công suất cho các user: mỗi cột có chuẩn 1"""
+    return V / np.maximum(np.linalg.norm(V, axis=0, keepdims=True), 1e-30)
+
+
+def mrt(H, p_max_dbm):
+    """Maximum Ratio Transmission: w_k = h_k / ||h_k||"""
+    M, K, N = H.shape
+    V = normalize_columns(stack_channel(H))
+    return scale_to_per_ap_power(unstack_beamformer(V, M, N), p_max_dbm)
+
+
+def zero_forcing(H, p_max_dbm):
+    """Zero-Forcing: V = H (H^H H)^-1 => h_k^H w_j = 0 với mọi j != k"""
+    M, K, N = H.shape
+    H_s = stack_channel(H)
+    V = H_s @ np.linalg.pinv(H_s.conj().T @ H_s)
+    return scale_to_per_ap_power(unstack_beamformer(normalize_columns(V), M, N), p_max_dbm)
+
+
+def regularized_zf(H, p_max_dbm, noise_power):
+    """
+    Regularized ZF (MMSE precoder): V = H (H^H H + K*sigma^2/P_tổng I)^-1.
+    Với P_tổng = M * P_max (tổng công suất của mọi AP).
+    """
+    M, K, N = H.shape
+    H_s = stack_channel(H)
+    p_total = M * 10**((p_max_dbm - 30) / 10)
+    reg = K * noise_power / p_total
+    V = H_s @ np.linalg.inv(H_s.conj().T @ H_s + reg * np.eye(K))
+    return scale_to_per_ap_power(unstack_beamformer(normalize_columns(V), M, N), p_max_dbm)
+
+
+def power_constrained_minimizer(Q, B, p_max):
+    """
+    Nghiệm của min_X tr(X^H Q X) - 2 Re tr(B^H X) với ||X||_F^2 <= p_max
+    (Q Hermitian nửa xác định dương): X = (Q + mu I)^-1 B, mu >= 0 tìm bằng
+    chia đôi trên phổ của Q (phân rã trị riêng một lần).
+    """
+    eigvals, eigvecs = np.linalg.eigh(Q)
+    C = eigvecs.conj().T @ B
+    # Thành phần ứng với trị riêng ~0 nằm ngoài không gian kênh => bỏ qua
+    active = eigvals > 1e-12 * max(np.max(eigvals), 1e-300)
+    C_power = np.sum(np.abs(C[active])**2, axis=1)
+    lam = eigvals[active]
+
+    def power(mu):
+        return np.sum(C_power / (lam + mu)**2)
+
+    mu = 0.0
+    if power(0.0) > p_max:
+        lo, hi = 0.0, np.sqrt(np.sum(C_power) / p_max)
+        for _ in range(60):
+            mu = (lo + hi) / 2
+            if power(mu) > p_max:
+                lo = mu
+            else:
+                hi = mu
+        mu = hi
+
+    C_scaled = np.zeros_like(C)
+    C_scaled[active] = C[active] / (lam + mu)[:, np.newaxis]
+    return eigvecs @ C_scaled
+
+
+def wmmse_update(H_s, V, noise_power, p_ap, N, n_sweeps=5):
+    """
+    Một vòng WMMSE (Shi et al., 2011) với ràng buộc công suất theo từng AP:
+        u_k = a_kk / (sum_j |a_kj|^2 + sigma^2),  omega_k = 1 / (1 - conj(u_k) a_kk)
+        min_V tr(V^H Q V) - 2 Re tr(B^H V),  ||V_m||_F^2 <= p_ap với mọi AP m
+    với Q = sum_j omega_j |u_j|^2 h_j h_j^H, B = [omega_k u_k h_k]. Bài toán
+    theo V lồi, ràng buộc tách theo AP nên giải bằng n_sweeps lượt cập nhật
+    lần lượt từng khối V_m (mỗi khối một nhân tử Lagrange mu_m), xuất phát
+    từ V hiện tại => mục tiêu WMMSE không tăng, Sum Rate không giảm.
+    """
+    A = H_s.conj().T @ V # a_kj
+    gains = np.abs(A)**2
+    signal = np.diag(gains).copy()
+    np.fill_diagonal(gains, 0.0)
+    interference = np.sum(gains, axis=1) + noise_power
+    received = interference + signal
+    a_kk = np.diag(A)
+    u = a_kk / received
+    # 1 - conj(u_k) a_kk = (nhiễu + can nhiễu) / tổng thu: tính trực tiếp, tránh
+    # triệt tiêu số học khi SINR rất lớn
+    omega = received / interference
+
+    weights = omega * np.abs(u)**2
+    Q = (H_s * weights) @ H_s.conj().T
+    B = H_s * (omega * u)
+    V = V.copy()
+    for _ in range(n_sweeps):
+        for start in range(0, len(V), N):
+            rows = slice(start, start + N)
+            # Phần tuyến tính của khối m khi cố định các AP khác
+            B_m = B[rows] - Q[rows] @ V + Q[rows, rows] @ V[rows]
+            V[rows] = power_constrained_minimizer(Q[rows, rows], B_m, p_ap)
+    return V
+
+
+def wmmse(H, p_max_dbm, noise_power, metrics, n_iter=30, W_init=None):
+    """
+    WMMSE lặp cho bài toán tối đa Sum Rate với ràng buộc công suất theo từng
+    AP ngay trong mỗi vòng (wmmse_update). WMMSE chỉ hội tụ tới điểm dừng và
+    ở SNR cao RZF đã gần như là một điểm dừng, nên khi không có W_init sẽ chạy
+    từ cả RZF lẫn MRT rồi lấy nghiệm tốt hơn. Điểm xuất phát được đưa về miền
+    khả thi bằng enforce_power_constraint; nghiệm tốt nhất đã gặp được giữ lại
+    phòng sai số số học.
+
+    :param W_init: Điểm xuất phát (M, K, N); None = RZF và MRT
+    :return: (W tốt nhất (M, K, N), Sum Rate của nó)
+    """
+    M, K, N = H.shape
+    H_s = stack_channel(H)
+    p_ap = 10**((p_max_dbm - 30) / 10)
+    starts = [regularized_zf(H, p_max_dbm, noise_power), mrt(H, p_max_dbm)] if W_init is None else [W_init]
+
+    best_W, best_rate = None, -np.inf
+    for W in starts:
+        W = enforce_power_constraint(W, p_max_dbm)
+        rate = metrics.calculate_sum_rate(W, H)
+        if rate > best_rate:
+            best_W, best_rate = W, rate
+        V = stack_channel(W)
+        for _ in range(n_iter):
+            V = wmmse_update(H_s, V, noise_power, p_ap, N)
+            W = enforce_power_constraint(unstack_beamformer(V, M, N), p_max_dbm)
+            V = stack_channel(W)
+            rate = metrics.calculate_sum_rate(W, H)
+            if rate > best_rate:
+                best_W, best_rate = W, rate
+    return best_W, best_rate
+
+
+# Tên precoder trong config -> hàm dựng (H, config, metrics) -> W (M, K, N)
+PRECODERS = {
+    'mrt': lambda H, config, metrics: mrt(H, float(config['system']['p_max_dbm'])),
+    'zf': lambda H, config, metrics: zero_forcing(H, float(config['system']['p_max_dbm'])),
+    'rzf': lambda H, config, metrics: regularized_zf(H, float(config['system']['p_max_dbm']),
+                                                     metrics.noise_power),
+    'wmmse': lambda H, config, metrics: wmmse(H, float(config['system']['p_max_dbm']), metrics.noise_power,
+                                              metrics, int(config['algorithm'].get('wmmse_iterations', 30)))[0],
+}
+
+
+def compute_precoder(name, H, config, metrics):
+    """
+    Dựng precoder theo tên (mrt | zf | rzf | wmmse) cho kênh H (M, K, N).
+    Kết quả luôn thỏa ràng buộc công suất theo từng AP.
+    """
+    if name not in PRECODERS:
+        raise ValueError(f"Precoder không hợp lệ: {name} (chọn một trong {tuple(PRECODERS)})")
+    return PRECODERS[name](np.asarray(H), config, metrics)
@@ -0,0 +1,328 @@
+import os
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from src.system_model.channel import ChannelModel
+from src.system_model.channel_dataset import load_channel, load_channel_batch
+from src.system_model.metrics import SystemMetrics
+from src.system_model.context import build_context
+from src.algorithms.abc_base import ArtificialBeeColony
+from src.algorithms.abc_variants import GbestABC
+from src.algorithms.multi_instance import MultiInstanceABC, MultiInstanceGbestABC
+from src.utils.streaming_stats import MonteCarloStatistics
+
+# Các thuật toán chạy trong mỗi realization (thứ tự cố định để gộp kết quả)
+ALGORITHMS = {
+    'abc': ArtificialBeeColony,
+    'gabc': GbestABC,
+}
+
+# Phiên bản nhiều instance (lockstep) của từng thuật toán, cùng tên khóa
+MULTI_INSTANCE_ALGORITHMS = {
+    'abc': MultiInstanceABC,
+    'gabc': MultiInstanceGbestABC,
+}
+
+
+def make_seed_sequence(root_entropy, realization, stream):
+    """
+    Sinh luồng ngẫu nhiên độc lập cho (realization, stream) từ root seed.
+    stream = 0 dành cho kênh truyền, stream = 1.. dành cho từng thuật toán.
+    Chỉ phụ thuộc vào chỉ số => không phụ thuộc worker nào chạy task.
+    """
+    return np.random.SeedSequence(root_entropy, spawn_key=(realization, stream))
+
+
+def seed_global_rng(seed_seq):
+    """Các module hiện tại dùng np.random toàn cục => seed lại RNG của process"""
+    np.random.seed(seed_seq.generate_state(4))
+
+
+def pad_curve(curve, length):
+    """
+    Kéo dài đường hội tụ (best-so-far) tới độ dài cố định bằng giá trị cuối.
+    Lần chạy dừng sớm giữ nguyên kết quả tốt nhất cho các vòng còn lại,
+    nhờ đó có thể lấy trung bình các đường có độ dài khác nhau.
+    """
+    curve = np.asarray(curve, dtype=float)
+    if len(curve) >= length:
+        return curve[:length]
+    return np.concatenate([curve, np.full(length - len(curve), curve[-1])])
+
+
+def run_realization_task(config, root_entropy, realization, algorithm, checkpoint_path=None):
+    """
+    Một task độc lập: tạo kênh H của realization rồi chạy một thuật toán trên đó.
+    Hàm ở mức module để ProcessPoolExecutor có thể pickle được.
+    Có checkpoint_path => solver lưu checkpoint định kỳ và chạy tiếp từ đó nếu
+    task trước bị ngắt; checkpoint được xóa khi task hoàn tất.
+
+    Returns:
+        dict kết quả: realization, algorithm, best_fitness, curve, best_solution,
+        n_evaluations, stop_reason
+    """
+    M = config['system']['M']
+    K = config['system']['K']
+    N = config['system']['N']
+
+    # Kênh H chỉ phụ thuộc vào realization: mọi thuật toán thấy cùng một H
+    # (sinh từ luồng RNG riêng, hoặc đọc realization tương ứng từ bộ dữ liệu)
+    seed_global_rng(make_seed_sequence(root_entropy, realization, 0))
+    channel_model = ChannelModel(M, K, N)
+    H = load_channel(config, realization, channel_model)
+    metrics = SystemMetrics(config)
+    context = build_context(H, config, channel_model.beta)
+
+    stream = 1 + list(ALGORITHMS).index(algorithm)
+    seed_global_rng(make_seed_sequence(root_entropy, realization, stream))
+    solver = ALGORITHMS[algorithm](config, H, metrics, context)
+    best_fitness, curve = solver.solve(checkpoint_path)
+    solver.close()
+    if checkpoint_path is not None and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    # Rate của từng user tại nghiệm tốt nhất (fitness có thể gồm cả thành phần cảm biến)
+    _, user_rates = metrics.calculate_sum_rate_batch(solver.best_solution[np.newaxis], solver.context)
+
+    return {
+        'realization': realization,
+        'algorithm': algorithm,
+        'best_fitness': best_fitness,
+        'curve': curve,
+        'best_solution': solver.best_beamformer,
+        'n_evaluations': solver.n_evaluations,
+        'stop_reason': solver.stop_reason,
+        'user_rates': user_rates[0],
+    }
+
+
+class MonteCarloRunner:
+    def __init__(self, config, n_workers=None, seed=None, store=None):
+        """
+        Chạy các realization Monte Carlo song song trên một process pool.
+
+        :param config: Cấu hình đã load từ config.yaml
+        :param n_workers: Số process (None/0 = số CPU, 1 = chạy tuần tự tại chỗ)
+        :param seed: Root seed (None = lấy entropy ngẫu nhiên từ hệ điều hành)
+        :param store: ResultsStore (tùy chọn). Mỗi realization xong được ghi ngay
+            vào kho; lần chạy sau bỏ qua các realization đã có và chỉ chạy tiếp
+        """
+        self.config = config
+        self.n_realizations = int(config['simulation']['n_realizations'])
+        self.n_workers = n_workers or os.cpu_count() or 1
+        # Cố định entropy gốc để mọi worker sinh cùng một cây seed
+        # (chạy tiếp một kho cũ mà không cố định seed => dùng lại entropy của kho)
+        self.root_entropy = np.random.SeedSequence(seed).entropy
+        self.store = store
+        if store is not None:
+            self.root_entropy = store.bind(config, self.root_entropy, fixed_seed=seed is not None)
+
+        # Đường hội tụ có thể ngắn hơn max_cycle khi dừng sớm => pad về max_cycle
+        self.curve_length = int(config['algorithm']['max_cycle'])
+        sim_cfg = config['simulation']
+        # Thống kê dạng luồng: bộ nhớ không đổi dù chạy bao nhiêu realization
+        self.statistics = MonteCarloStatistics(
+            ALGORITHMS, self.curve_length,
+            rate_range=(0.0, float(sim_cfg.get('rate_hist_max', 40.0))),
+            n_bins=int(sim_cfg.get('rate_hist_bins', 400)))
+        self.final_best_W = None
+        self.n_completed = 0
+        
+        # Dừng thích nghi: n_realizations là ngân sách tối đa; dừng khi khoảng
+        # tin cậy của chênh lệch G-ABC - ABC hẹp hơn ci_width (bps/Hz)
+        self.adaptive = bool(sim_cfg.get('adaptive', False))
+        self.ci_level = float(sim_cfg.get('ci_level', 0.95))
+        self.ci_width = float(sim_cfg.get('ci_width', 0.5))
+        self.min_realizations = int(sim_cfg.get('min_realizations', 5))
+        self.stop_reason = None # 'ci_width' khi dừng thích nghi, 'n_realizations' khi chạy hết ngân sách
+        # Kết quả về sớm chờ được gộp theo đúng thứ tự realization
+        self.pending = {}
+        self.stored = set()
+
+    def tasks(self):
+        for i in range(self.n_realizations):
+            if i in self.stored:
+                continue
+            for name in ALGORITHMS:
+                yield i, name
+
+    @property
+    def finished(self):
+        return self.stop_reason is not None
+
+    def check_adaptive_stop(self):
+        """Dừng thích nghi sau mỗi realization đã gộp (theo thứ tự => cùng điểm dừng với mọi số worker)"""
+        if self.adaptive and self.n_completed >= max(self.min_realizations, 2):
+            low, high = self.statistics.gap_interval(self.ci_level)
+            if high - low <= self.ci_width:
+                self.stop_reason = 'ci_width'
+        if self.stop_reason is None and self.n_completed >= self.n_realizations:
+            self.stop_reason = 'n_realizations'
+
+    def checkpoint_path(self, realization, algorithm):
+        if self.store is None:
+            return None
+        return self.store.checkpoint_path(realization, algorithm)
+
+    def load_stored(self):
+        """Nạp các realization đã có trong kho vào hàng chờ gộp"""
+        if self.store is None:
+            return
+        self.stored = {i for i in self.store.completed() if i < self.n_realizations}
+        for i in sorted(self.stored):
+            self.pending[i] = self.store.load_realization(i)
+
+    def collect(self, realization, results, on_realization_done=None):
+        """
+        Nhận kết quả (một phần) của realization; ghi vào kho khi đủ mọi thuật
+        toán, rồi gộp các realization liên tiếp đã đủ.
+        """
+        entry = self.pending.setdefault(realization, {})
+        entry.update(results)
+        if self.store is not None and realization not in self.stored and len(entry) == len(ALGORITHMS):
+            self.store.save_realization(realization, entry)
+        self.drain(on_realization_done)
+
+    def drain(self, on_realization_done=None):
+        """Gộp các realization đã đủ kết quả, luôn theo thứ tự 0, 1, 2, ..."""
+        while not self.finished and len(self.pending.get(self.n_completed, ())) == len(ALGORITHMS):
+            index = self.n_completed
+            self.accumulate(self.pending.pop(index))
+            self.check_adaptive_stop()
+            if on_realization_done is not None:
+                on_realization_done(index)
+
+    def accumulate(self, results):
+        """Gộp kết quả của một realization (đủ mọi thuật toán) vào thống kê"""
+        curves = {name: pad_curve(results[name]['curve'], self.curve_length) for name in ALGORITHMS}
+        self.statistics.update(results, curves)
+
+        # Giống bản tuần tự: giữ giải pháp G-ABC của realization cuối cùng
+        self.final_best_W = results['gabc']['best_solution']
+        self.n_completed += 1
+
+    def run(self, on_realization_done=None):
+        """
+        Chạy toàn bộ Monte Carlo.
+
+        Kết quả được gộp ngay khi worker trả về, nhưng luôn theo đúng thứ tự
+        realization 0, 1, 2, ... (giữ lại các realization về sớm trong bộ đệm).
+        Nhờ vậy phép cộng dấu phẩy động cho kết quả giống hệt nhau từng bit
+        với mọi số lượng worker.
+
+        Có kho kết quả => các realization đã lưu được đọc lại thay vì chạy lại.
+
+        Task được nộp dần (tối đa 2 x n_workers task đang chạy), nên khi dừng
+        thích nghi chỉ bỏ phí các task đang dở, không phải cả ngân sách.
+
+        Returns:
+            avg_curves: dict {tên thuật toán: đường hội tụ trung bình}
+        """
+        def collect(result):
+            self.collect(result['realization'], {result['algorithm']: result}, on_realization_done)
+
+        self.load_stored()
+        self.drain(on_realization_done)
+        if self.n_workers == 1:
+            for i, name in self.tasks():
+                if self.finished:
+                    break
+                collect(run_realization_task(self.config, self.root_entropy, i, name,
+                                             self.checkpoint_path(i, name)))
+        else:
+            tasks = self.tasks()
+            with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+                def submit(n):
+                    for i, name in itertools.islice(tasks, n):
+                        in_flight.add(pool.submit(run_realization_task, self.config, self.root_entropy,
+                                                  i, name, self.checkpoint_path(i, name)))
+
+                in_flight = set()
+                submit(2 * self.n_workers)
+                while in_flight and not self.finished:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+                    if not self.finished:
+                        submit(len(done))
+                for future in in_flight:
+                    future.cancel()
+
+        return self.average_curves()
+
+    def average_curves(self):
+        """dict {tên thuật toán: đường hội tụ trung bình} trên các realization đã gộp"""
+        return {name: self.statistics.curves[name].mean.copy() for name in ALGORITHMS}
+
+
+class MultiInstanceRunner(MonteCarloRunner):
+    def __init__(self, config, batch_size=None, seed=None, store=None):
+        """
+        Chạy Monte Carlo trên một core bằng solver nhiều instance: mỗi lô
+        batch_size realization được tối ưu đồng thời (mỗi thuật toán một
+        solver MultiInstance*), thay vì tạo một solver cho từng realization.
+
+        Kênh của cả lô được sinh trong một lần gọi bộ sinh (hoặc đọc một lần
+        từ bộ dữ liệu trên đĩa) từ một luồng RNG riêng của lô; luồng RNG của
+        thuật toán cũng dùng chung cho cả lô, nên kết quả chỉ tương đương về
+        thống kê với MonteCarloRunner (trừ khi dùng chung simulation.channel_dataset).
+
+        :param config: Cấu hình đã load từ config.yaml
+        :param batch_size: Số realization mỗi lô (None/0 = tất cả cùng lúc)
+        :param seed: Root seed (None = lấy entropy ngẫu nhiên từ hệ điều hành)
+        :param store: ResultsStore (tùy chọn), chạy tiếp các realization chưa có trong kho
+        """
+        super().__init__(config, n_workers=1, seed=seed, store=store)
+        self.batch_size = batch_size or self.n_realizations
+
+    def load_channels(self, realizations):
+        """Kênh (B, M, K, N) của các realization trong lô, sinh/đọc trong một lần gọi"""
+        M = self.config['system']['M']
+        K = self.config['system']['K']
+        N = self.config['system']['N']
+        # Khóa (start, 0, 1) => tách biệt với luồng thuật toán (start, stream >= 1, 1) của lô
+        seed_global_rng(np.random.SeedSequence(self.root_entropy, spawn_key=(realizations[0], 0, 1)))
+        H_batch, _ = load_channel_batch(self.config, realizations, ChannelModel(M, K, N))
+        return H_batch
+
+    def run(self, on_realization_done=None):
+        """
+        Returns:
+            avg_curves: dict {tên thuật toán: đường hội tụ trung bình}
+        """
+        metrics = SystemMetrics(self.config)
+        self.load_stored()
+        self.drain(on_realization_done)
+        remaining = [i for i in range(self.n_realizations) if i not in self.stored]
+        for offset in range(0, len(remaining), self.batch_size):
+            if self.finished:
+                break
+            realizations = remaining[offset:offset + self.batch_size]
+            start = realizations[0]
+            H_batch = self.load_channels(realizations)
+
+            solvers = {}
+            for stream, name in enumerate(MULTI_INSTANCE_ALGORITHMS, start=1):
+                # Khóa 3 phần tử => tách biệt với luồng (realization, stream) của từng task
+                seed_global_rng(np.random.SeedSequence(self.root_entropy, spawn_key=(start, stream, 1)))
+                solvers[name] = MULTI_INSTANCE_ALGORITHMS[name](self.config, H_batch, metrics)
+                solvers[name].solve()
+
+            for b, realization in enumerate(realizations):
+                # Rate từng user tính riêng trên kênh của instance b
+                user_rates = {name: metrics.calculate_sum_rate_batch(solver.best_solution[b][np.newaxis],
+                                                                     H_batch[b])[1][0]
+                              for name, solver in solvers.items()}
+                self.collect(realization, {name: {
+                    'realization': realization,
+                    'algorithm': name,
+                    'best_fitness': solver.best_fitness[b],
+                    'curve': [fitness[b] for fitness in solver.convergence_curve],
+                    'best_solution': solver.best_solution[b],
+                    'n_evaluations': solver.n_evaluations[b],
+                    'stop_reason': 'max_cycle',
+                    'user_rates': user_rates[name],
+                } for name, solver in solvers.items()}, on_realization_done)
+
+        return self.average_curves()
@@ -0,0 +1,372 @@
+import io
+import copy
+import time
+import struct
+import asyncio
+import collections
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from src.system_model.channel import ChannelModel
+from src.system_model.metrics import SystemMetrics
+from src.algorithms.abc_variants import GbestABC
+
+# ----------------------------------------------------------------------
+# Giao thức socket: mỗi thông điệp là 4 byte độ dài (big-endian) + một file
+# .npz (np.savez, đọc với allow_pickle=False nên không thực thi dữ liệu lạ).
+#   Yêu cầu : request_id, cell, H (M, K, N), deadline_ms (tùy chọn, <= 0 = mặc định)
+#   Phản hồi: request_id, cell, status, latency, queue_wait, cycles,
+#             best_fitness, W ((M, K, N), rỗng nếu yêu cầu bị gộp)
+# ----------------------------------------------------------------------
+HEADER = struct.Struct('>I')
+MAX_MESSAGE_BYTES = 64 * 2**20
+
+
+def encode_message(**fields):
+    buffer = io.BytesIO()
+    np.savez(buffer, **fields)
+    payload = buffer.getvalue()
+    return HEADER.pack(len(payload)) + payload
+
+
+async def read_message(reader):
+    """Đọc một thông điệp thành dict mảng numpy; None khi kết nối đã đóng"""
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    size = HEADER.unpack(header)[0]
+    if size > MAX_MESSAGE_BYTES:
+        raise ValueError(f"Thông điệp quá lớn: {size} byte (tối đa {MAX_MESSAGE_BYTES})")
+    payload = await reader.readexactly(size)
+    with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+
+class LatencyTracker:
+    def __init__(self, window=1000):
+        """
+        Thống kê độ trễ đầu-cuối (từ lúc nhận yêu cầu tới lúc trả kết quả)
+        trên window mẫu gần nhất, kèm số yêu cầu theo trạng thái.
+        """
+        self.samples = collections.deque(maxlen=window)
+        self.counts = collections.Counter()
+        self.deadline_misses = 0
+
+    def record(self, latency, status, deadline_met=True):
+        self.counts[status] += 1
+        if status != 'superseded':
+            self.samples.append(latency)
+            self.deadline_misses += not deadline_met
+
+    def summary(self, percentiles=(50, 90, 95, 99)):
+        """dict: số yêu cầu theo trạng thái, số lần trễ hạn, các phân vị độ trễ (ms)"""
+        stats = {'counts': dict(self.counts), 'deadline_misses': self.deadline_misses,
+                 'n_samples': len(self.samples)}
+        if self.samples:
+            values = np.percentile(np.array(self.samples) * 1e3, percentiles)
+            stats.update({f'p{q}_ms': float(value) for q, value in zip(percentiles, values)})
+            stats['max_ms'] = float(np.max(self.samples) * 1e3)
+        return stats
+
+
+class CellState:
+    def __init__(self):
+        """Trạng thái của một cell: solver (warm start) + yêu cầu đang chờ (tối đa 1)"""
+        self.optimizer = None
+        self.pending = None
+        self.busy = False
+        self.cycle_time = 0.0 # Thời gian một vòng lặp (trung bình trượt), để dự đoán hạn
+
+
+class BeamformingService:
+    def __init__(self, config, n_workers=None):
+        """
+        Dịch vụ beamforming theo slot với hạn chót cho từng yêu cầu.
+
+        Mỗi yêu cầu (cell, H) được giải bằng GbestABC trong một luồng của
+        executor; solver chạy từng vòng lặp cho tới max_cycles hoặc tới khi
+        vòng kế tiếp (ước lượng theo thời gian vòng lặp trung bình) sẽ vượt
+        hạn chót trừ deadline_margin_ms, rồi trả về best_solution tốt nhất tới lúc đó.
+
+        - Mỗi cell giữ solver riêng: slot sau warm start từ quần thể của slot
+          trước (update_channel), như ChannelTracker.
+        - Mỗi cell chỉ giải một yêu cầu tại một thời điểm; yêu cầu mới tới khi
+          cell còn yêu cầu chưa bắt đầu thì yêu cầu cũ (đã lỗi thời) được trả
+          về ngay với status 'superseded' (latest-value-wins, như LatestValueQueue).
+        - Các cell khác nhau chạy song song trên n_workers luồng.
+
+        status của kết quả: 'completed' (chạy đủ max_cycles), 'deadline' (dừng
+        vì hết hạn, trả best-so-far), 'superseded' (bị gộp, không có W).
+
+        :param config: Cấu hình đã load từ config.yaml (mục service)
+        :param n_workers: Số luồng solver (None = service.n_workers)
+        """
+        service_cfg = config.get('service') or {}
+        # Solver chạy từng vòng lặp theo hạn chót => tắt log tiến độ của solve()
+        self.config = copy.deepcopy(config)
+        self.config['algorithm']['log_interval'] = 0
+        self.deadline = float(service_cfg.get('deadline_ms', 20)) / 1e3
+        # Thời gian dành cho việc trả kết quả (chép W, quay lại event loop, gửi socket)
+        self.margin = float(service_cfg.get('deadline_margin_ms', 2)) / 1e3
+        self.max_cycles = int(service_cfg.get('max_cycles', config['algorithm']['max_cycle']))
+        self.warm_start = bool(service_cfg.get('warm_start', True))
+        self.n_workers = n_workers or int(service_cfg.get('n_workers', 2))
+
+        self.metrics = SystemMetrics(self.config)
+        self.executor = ThreadPoolExecutor(max_workers=self.n_workers)
+        self.cells = {}
+        self.tasks = set()
+        self.connections = set()
+        self.stats = LatencyTracker(int(service_cfg.get('latency_window', 1000)))
+        self.next_request_id = 0
+
+    async def submit(self, cell, H, deadline=None, request_id=None):
+        """
+        Gửi một snapshot kênh của cell và chờ kết quả.
+
+        Args:
+            cell: Định danh cell (hashable)
+            H: Kênh (M, K, N)
+            deadline: Ngân sách độ trễ (giây) tính từ lúc nhận; None = service.deadline_ms
+            request_id: Định danh do client đặt (None = tự đánh số)
+
+        Returns:
+            dict: request_id, cell, status, best_solution, best_fitness, cycles,
+            latency, queue_wait, deadline_met
+        """
+        loop = asyncio.get_running_loop()
+        if request_id is None:
+            request_id = self.next_request_id
+            self.next_request_id += 1
+        arrival = time.perf_counter()
+        budget = self.deadline if deadline is None else deadline
+        request = {'request_id': request_id, 'cell': cell, 'H': np.asarray(H), 'arrival': arrival,
+                   'budget': budget, 'deadline': arrival + budget, 'future': loop.create_future()}
+
+        state = self.cells.setdefault(cell, CellState())
+        if state.pending is not None:
+            # Snapshot cũ chưa kịp giải đã lỗi thời => trả về ngay, chỉ giải bản mới nhất
+            self.finish(state.pending, {'status': 'superseded', 'best_solution': None,
+                                        'best_fitness': float('nan'), 'cycles': 0, 'queue_wait': 0.0})
+        state.pending = request
+        if not state.busy:
+            state.busy = True
+            task = loop.create_task(self.run_cell(state))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        return await request['future']
+
+    async def consume(self, queue, on_result=None):
+        """
+        Nhận snapshot (cell, H[, deadline]) từ asyncio.Queue cục bộ cho tới khi
+        gặp None; mỗi snapshot được giải đồng thời như khi gửi qua socket.
+        """
+        pending = set()
+        while (item := await queue.get()) is not None:
+            task = asyncio.ensure_future(self.submit(*item))
+            if on_result is not None:
+                task.add_done_callback(lambda done: on_result(done.result()))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def run_cell(self, state):
+        """Giải lần lượt các yêu cầu của một cell (luôn lấy bản mới nhất đang chờ)"""
+        loop = asyncio.get_running_loop()
+        try:
+            while state.pending is not None:
+                request, state.pending = state.pending, None
+                try:
+                    result = await loop.run_in_executor(self.executor, self.solve_request, state, request)
+                except Exception as error:
+                    if not request['future'].done():
+                        request['future'].set_exception(error)
+                    continue
+                self.finish(request, result)
+        finally:
+            state.busy = False
+
+    def solve_request(self, state, request):
+        """Chạy trong luồng của executor: tối ưu tới max_cycles hoặc tới hạn chót"""
+        start = time.perf_counter()
+        H = request['H']
+        if state.optimizer is None or not self.warm_start:
+            state.optimizer = GbestABC(self.config, H, self.metrics)
+            state.optimizer.initialize_population()
+        else:
+            if H.shape != state.optimizer.H.shape:
+                raise ValueError(f"Kích thước kênh {H.shape} khác các slot trước {state.optimizer.H.shape}")
+            state.optimizer.update_channel(H)
+        optimizer = state.optimizer
+        # Lịch sử hội tụ chỉ có nghĩa trong một slot (tránh phình bộ nhớ khi chạy lâu)
+        optimizer.convergence_curve = []
+
+        status = 'completed'
+        cycles = 0
+        while cycles < self.max_cycles:
+            cycle_start = time.perf_counter()
+            if cycle_start + state.cycle_time > request['deadline'] - self.margin:
+                status = 'deadline'
+                break
+            optimizer.run_cycle()
+            cycles += 1
+            elapsed = time.perf_counter() - cycle_start
+            state.cycle_time = elapsed if state.cycle_time == 0 else 0.8 * state.cycle_time + 0.2 * elapsed
+
+        return {'status': status, 'best_solution': optimizer.best_beamformer.copy(),
+                'best_fitness': float(optimizer.best_fitness), 'cycles': cycles,
+                'queue_wait': start - request['arrival']}
+
+    def finish(self, request, result):
+        """Gắn độ trễ, ghi thống kê và trả kết quả cho bên gửi"""
+        latency = time.perf_counter() - request['arrival']
+        result.update(request_id=request['request_id'], cell=request['cell'], latency=latency,
+                      deadline_met=latency <= request['budget'])
+        self.stats.record(latency, result['status'], result['deadline_met'])
+        if not request['future'].done():
+            request['future'].set_result(result)
+
+    # ------------------------------------------------------------------
+    # Socket TCP cục bộ
+    # ------------------------------------------------------------------
+    async def handle_connection(self, reader, writer):
+        """Mỗi yêu cầu được giải đồng thời; phản hồi gửi theo thứ tự hoàn thành"""
+        lock = asyncio.Lock()
+        pending = set()
+        connection = asyncio.current_task()
+        self.connections.add(connection)
+
+        async def respond(message):
+            deadline_ms = float(message['deadline_ms']) if 'deadline_ms' in message else 0.0
+            result = await self.submit(int(message['cell']), message['H'],
+                                       deadline_ms / 1e3 if deadline_ms > 0 else None,
+                                       int(message['request_id']))
+            W = result['best_solution']
+            response = encode_message(
+                request_id=result['request_id'], cell=result['cell'], status=result['status'],
+                latency=result['latency'], queue_wait=result['queue_wait'], cycles=result['cycles'],
+                best_fitness=result['best_fitness'], W=np.zeros(0, dtype=complex) if W is None else W)
+            async with lock:
+                writer.write(response)
+                await writer.drain()
+
+        try:
+            while (message := await read_message(reader)) is not None:
+                task = asyncio.ensure_future(respond(message))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+            self.connections.discard(connection)
+
+    async def start_server(self, host='127.0.0.1', port=8765):
+        """Mở server (port 0 = chọn cổng trống); trả về asyncio.Server"""
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def stop(self, server):
+        """Đóng server, chờ các kết nối đang mở trả nốt phản hồi rồi dừng executor"""
+        server.close()
+        if self.connections:
+            await asyncio.gather(*self.connections, return_exceptions=True)
+        await server.wait_closed()
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for state in self.cells.values():
+            if state.optimizer is not None:
+                state.optimizer.close()
+
+
+# ----------------------------------------------------------------------
+# Client phát lại kênh (load test)
+# ----------------------------------------------------------------------
+def make_replay_channels(config, n_cells, n_slots):
+    """
+    Chuỗi kênh Gauss-Markov (hệ số tương quan Jakes theo mục tracking) cho
+    từng cell, sinh sẵn trước khi phát lại.
+
+    Returns:
+        channels: (n_slots, n_cells, M, K, N)
+    """
+    M, K, N = (int(config['system'][key]) for key in ('M', 'K', 'N'))
+    tracking_cfg = config.get('tracking') or {}
+    rho = ChannelModel.jakes_correlation(float(tracking_cfg.get('doppler_hz', 10)),
+                                         float(tracking_cfg.get('slot_duration', 1e-3)))
+    channels = np.empty((n_slots, n_cells, M, K, N), dtype=complex)
+    for cell in range(n_cells):
+        channel_model = ChannelModel(M, K, N)
+        H = channel_model.generate_from_config(config)
+        for slot in range(n_slots):
+            if slot > 0:
+                H = channel_model.evolve_channel(H, rho)
+            channels[slot, cell] = H
+    return channels
+
+
+async def run_replay(host, port, channels, interval, deadline_ms=0.0, timeout=30.0):
+    """
+    Phát lại channels theo nhịp slot (vòng hở: gửi đúng lịch, không chờ phản
+    hồi) rồi thu mọi phản hồi.
+
+    Args:
+        channels: (n_slots, n_cells, M, K, N), vd. từ make_replay_channels
+        interval: Khoảng cách giữa 2 slot (giây)
+        deadline_ms: Ngân sách độ trễ gửi kèm (<= 0 = mặc định của server)
+        timeout: Thời gian chờ tối đa các phản hồi còn thiếu sau slot cuối (giây)
+
+    Returns:
+        list kết quả (dict) theo request_id, kèm rtt đo phía client (giây)
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    n_slots, n_cells = channels.shape[:2]
+    sent_at = {}
+    responses = {}
+
+    async def receive():
+        while len(responses) < n_slots * n_cells:
+            message = await read_message(reader)
+            if message is None:
+                break
+            request_id = int(message['request_id'])
+            result = {key: value.item() if value.ndim == 0 else value for key, value in message.items()}
+            result['rtt'] = time.perf_counter() - sent_at[request_id]
+            responses[request_id] = result
+
+    receiver = asyncio.ensure_future(receive())
+    start = time.perf_counter()
+    for slot in range(n_slots):
+        for cell in range(n_cells):
+            request_id = slot * n_cells + cell
+            sent_at[request_id] = time.perf_counter()
+            writer.write(encode_message(request_id=request_id, cell=cell, H=channels[slot, cell],
+                                        deadline_ms=float(deadline_ms)))
+        await writer.drain()
+        # Giữ đúng nhịp slot tuyệt đối (không cộng dồn sai lệch)
+        await asyncio.sleep(max(0.0, start + (slot + 1) * interval - time.perf_counter()))
+
+    try:
+        await asyncio.wait_for(receiver, timeout)
+    except asyncio.TimeoutError:
+        pass
+    writer.close()
+    await writer.wait_closed()
+    return [responses[key] for key in sorted(responses)]
+
+
+def summarize_replay(results, n_sent, percentiles=(50, 90, 95, 99)):
+    """Tóm tắt phía client: số phản hồi theo status, phân vị RTT (ms), Sum Rate trung bình"""
+    counts = collections.Counter(result['status'] for result in results)
+    solved = [result for result in results if result['status'] != 'superseded']
+    summary = {'sent': n_sent, 'received': len(results), 'counts': dict(counts)}
+    if solved:
+        rtt = np.array([result['rtt'] for result in solved]) * 1e3
+        summary.update({f'p{q}_ms': float(value) for q, value in zip(percentiles, np.percentile(rtt, percentiles))})
+        summary['mean_cycles'] = float(np.mean([result['cycles'] for result in solved]))
+        summary['mean_best_fitness'] = float(np.mean([result['best_fitness'] for result in solved]))
+    return summary
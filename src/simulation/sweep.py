@@ -0,0 +1,152 @@
+import os
+import csv
+import json
+import time
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.simulation.monte_carlo import ALGORITHMS, MonteCarloRunner, MultiInstanceRunner
+from src.utils.config_loader import apply_overrides, config_hash
+
+
+def expand_grid(axes):
+    """
+    Tích Descartes của các trục quét, theo đúng thứ tự khai báo.
+
+    :param axes: dict {'mục.khóa': [giá trị, ...]}, vd. {'system.M': [16, 32]}
+    :return: list các dict ghi đè, mỗi dict là một điểm của lưới
+    """
+    if not isinstance(axes, dict) or not axes:
+        raise ValueError("sweep.axes phải là mapping {'mục.khóa': [giá trị, ...]} không rỗng")
+    for path, values in axes.items():
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"Trục quét {path!r} phải là danh sách giá trị không rỗng")
+    paths = list(axes)
+    return [dict(zip(paths, values)) for values in itertools.product(*(axes[path] for path in paths))]
+
+
+def run_sweep_point(config, seed):
+    """
+    Chạy Monte Carlo cho một điểm (config đã resolve), tuần tự trong process
+    hiện tại vì các điểm đã được chạy song song với nhau.
+    Hàm ở mức module để ProcessPoolExecutor có thể pickle được.
+
+    Returns:
+        dict tóm tắt: Sum Rate cuối (trung bình, độ lệch chuẩn), số lần đánh giá,
+        đường hội tụ trung bình của từng thuật toán, thời gian chạy
+    """
+    start = time.perf_counter()
+    if config['simulation'].get('mode', 'tasks') == 'multi_instance':
+        runner = MultiInstanceRunner(config, batch_size=config['simulation'].get('instance_batch'), seed=seed)
+    else:
+        runner = MonteCarloRunner(config, n_workers=1, seed=seed)
+    avg_curves = runner.run()
+
+    summary = {'seconds': time.perf_counter() - start, 'n_realizations': runner.n_completed}
+    for name in ALGORITHMS:
+        summary[f'{name}_mean'] = float(runner.statistics.final[name].mean)
+        summary[f'{name}_std'] = float(runner.statistics.final[name].std)
+        summary[f'{name}_evaluations'] = float(runner.statistics.evaluations[name].mean)
+    summary['curves'] = {name: [float(value) for value in curve] for name, curve in avg_curves.items()}
+    return summary
+
+
+class SweepRunner:
+    def __init__(self, config, axes=None, seed=None, n_workers=None, cache_dir=None):
+        """
+        Quét tham số với cache theo nội dung: mỗi điểm được khóa bằng hash của
+        config đã resolve + seed (config_hash), kết quả lưu tại
+        cache_dir/<khóa>.json. Chạy lại sweep (vd. sau khi thêm một giá trị
+        vào một trục) chỉ tính các điểm chưa có trong cache.
+
+        :param config: Cấu hình gốc đã load (các tham số không quét lấy từ đây)
+        :param axes: Các trục quét (None = sweep.axes trong config)
+        :param seed: Root seed chung của mọi điểm (None = sweep.seed, rồi simulation.seed)
+        :param n_workers: Số process chạy các điểm (None/0 = số CPU, 1 = tuần tự)
+        :param cache_dir: Thư mục cache (None = sweep.cache_dir)
+        """
+        sweep_cfg = config.get('sweep') or {}
+        self.config = config
+        self.axes = axes if axes is not None else sweep_cfg.get('axes')
+        if seed is None:
+            seed = sweep_cfg.get('seed')
+        if seed is None:
+            seed = config['simulation'].get('seed')
+        if seed is None:
+            raise ValueError("Sweep cần seed cố định (sweep.seed hoặc simulation.seed) để cache có nghĩa")
+        self.seed = seed
+        self.n_workers = n_workers or sweep_cfg.get('n_workers') or os.cpu_count() or 1
+        self.cache_dir = cache_dir or sweep_cfg.get('cache_dir', 'results/sweep_cache')
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Resolve + kiểm tra mọi điểm trước khi chạy (lỗi config báo ngay)
+        self.points = []
+        for overrides in expand_grid(self.axes):
+            point_config = apply_overrides(config, overrides)
+            point_config['algorithm']['log_interval'] = 0 # Khóa runtime, không ảnh hưởng hash
+            self.points.append((overrides, point_config, config_hash(point_config, self.seed)))
+
+    def cache_path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def load_cached(self, key):
+        path = self.cache_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_cached(self, key, overrides, summary):
+        entry = {'key': key, 'seed': self.seed, 'overrides': overrides, **summary}
+        tmp_path = self.cache_path(key) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path(key))
+        return entry
+
+    def run(self, on_point_done=None):
+        """
+        Returns:
+            rows: Kết quả của mọi điểm theo thứ tự lưới (điểm trùng khóa chỉ chạy một lần)
+            n_computed: Số điểm phải tính mới ở lần chạy này
+        """
+        results = {}
+        pending = {}
+        for overrides, point_config, key in self.points:
+            cached = self.load_cached(key)
+            if cached is not None:
+                results[key] = cached
+            elif key not in pending:
+                pending[key] = (overrides, point_config)
+
+        def finish(key, summary):
+            results[key] = self.save_cached(key, pending[key][0], summary)
+            if on_point_done is not None:
+                on_point_done(key, results[key])
+
+        if self.n_workers == 1 or len(pending) <= 1:
+            for key, (_, point_config) in pending.items():
+                finish(key, run_sweep_point(point_config, self.seed))
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.n_workers, len(pending))) as pool:
+                futures = {pool.submit(run_sweep_point, point_config, self.seed): key
+                           for key, (_, point_config) in pending.items()}
+                for future in as_completed(futures):
+                    finish(futures[future], future.result())
+
+        rows = [dict(results[key], overrides=overrides) for overrides, _, key in self.points]
+        return rows, len(pending)
+
+
+def save_table(rows, path):
+    """Gộp kết quả các điểm thành một bảng CSV: các cột trục quét + các chỉ số"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    axis_names = list(rows[0]['overrides']) if rows else []
+    metric_names = ['key', 'n_realizations', 'seconds'] + \
+        [f'{name}_{metric}' for name in ALGORITHMS for metric in ('mean', 'std', 'evaluations')]
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(axis_names + metric_names)
+        for row in rows:
+            writer.writerow([row['overrides'][name] for name in axis_names] + [row[name] for name in metric_names])
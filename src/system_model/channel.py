@@ -1,4 +1,5 @@
 import numpy as np
+from scipy.special import j0
 
 class ChannelModel:
     def __init__(self, M, K, N):
@@ -11,6 +12,8 @@ class ChannelModel:
         self.M = M
         self.K = K
         self.N = N
+        # Large-scale fading (M, K) của kênh sinh gần nhất (None = chỉ có Rayleigh)
+        self.beta = None
 
     def generate_rayleigh_channel(self):
         """
@@ -42,10 +45,135 @@ class ChannelModel:
         # Log-normal distribution để mô phỏng shadowing
         beta_db = np.random.uniform(-10, 10, (self.M, self.K)) # Giả lập ngẫu nhiên
         beta = 10**(beta_db / 10)
+        self.beta = beta
         
-        H = np.zeros((self.M, self.K, self.N), dtype=complex)
-        for m in range(self.M):
-            for k in range(self.K):
-                H[m, k, :] = np.sqrt(beta[m, k]) * g[m, k, :]
+        # Nhân beta cho từng cặp (m, k) bằng broadcast thay vì vòng lặp đôi
+        H = np.sqrt(beta)[:, :, np.newaxis] * g
                 
-        return H
\ No newline at end of file
+        return H
+
+    def generate_geometric_channels(self, n_realizations, area_size=1000, ap_height=10.0,
+                                    pathloss_intercept_db=-30.5, pathloss_exponent=3.67,
+                                    shadowing_std_db=4.0):
+        """
+        Sinh đồng thời nhiều realization kênh có large-scale fading theo hình học.
+        AP và UE được rải đều ngẫu nhiên trong vùng vuông area_size x area_size,
+        pathloss theo khoảng cách (mô hình 3GPP UMi dạng log-distance) cộng
+        shadowing log-normal. Toàn bộ tính bằng broadcast, không vòng lặp.
+        
+            beta_dB = intercept - 10 * exponent * log10(d) + X_sigma
+        
+        Args:
+            n_realizations: Số realization B sinh cùng lúc
+            area_size: Cạnh vùng phủ (m)
+            ap_height: Chênh lệch độ cao AP - UE (m), tránh d = 0
+            pathloss_intercept_db: Hệ số pathloss tại d = 1 m (dB)
+            pathloss_exponent: Số mũ suy hao theo khoảng cách
+            shadowing_std_db: Độ lệch chuẩn shadowing (dB)
+            
+        Returns:
+            H: Kênh (B, M, K, N)
+            beta: Large-scale fading tuyến tính (B, M, K) - cũng lưu vào self.beta
+        """
+        B = n_realizations
+        
+        # Vị trí AP (B, M, 2) và UE (B, K, 2)
+        ap_pos = np.random.uniform(0, area_size, (B, self.M, 2))
+        ue_pos = np.random.uniform(0, area_size, (B, self.K, 2))
+        
+        # Khoảng cách 3D giữa mọi cặp (AP, UE): (B, M, K)
+        diff = ap_pos[:, :, np.newaxis, :] - ue_pos[:, np.newaxis, :, :]
+        distance = np.sqrt(np.sum(diff**2, axis=-1) + ap_height**2)
+        
+        shadowing_db = shadowing_std_db * np.random.randn(B, self.M, self.K)
+        beta_db = pathloss_intercept_db - 10 * pathloss_exponent * np.log10(distance) + shadowing_db
+        beta = 10**(beta_db / 10)
+        self.beta = beta
+        
+        # Small-scale fading Rayleigh cho cả lô
+        g = (np.random.randn(B, self.M, self.K, self.N)
+             + 1j * np.random.randn(B, self.M, self.K, self.N)) / np.sqrt(2)
+        H = np.sqrt(beta)[..., np.newaxis] * g
+        
+        return H, beta
+
+    def generate_batch_from_config(self, config, n_realizations):
+        """
+        Sinh đồng thời n_realizations kênh theo bộ sinh chọn trong config
+        (system.channel_model = rayleigh | pathloss | geometric), mỗi bộ sinh
+        chỉ gọi RNG một lần cho cả lô thay vì lặp từng realization.
+        
+        Returns:
+            H: Kênh (B, M, K, N)
+            beta: Large-scale fading (B, M, K), None với rayleigh - cũng lưu vào self.beta
+        """
+        system_cfg = config['system']
+        generator = system_cfg.get('channel_model', 'rayleigh')
+        area_size = float(system_cfg.get('area_size', 1000))
+        B = n_realizations
+        
+        if generator in ('rayleigh', 'pathloss'):
+            # Cùng thứ tự rút số ngẫu nhiên với generate_rayleigh_channel / generate_channel_with_pathloss
+            H = (np.random.randn(B, self.M, self.K, self.N)
+                 + 1j * np.random.randn(B, self.M, self.K, self.N)) / np.sqrt(2)
+            if generator == 'rayleigh':
+                self.beta = None
+                return H, None
+            beta = 10**(np.random.uniform(-10, 10, (B, self.M, self.K)) / 10)
+            self.beta = beta
+            return np.sqrt(beta)[..., np.newaxis] * H, beta
+        if generator == 'geometric':
+            return self.generate_geometric_channels(
+                B, area_size,
+                ap_height=float(system_cfg.get('ap_height', 10.0)),
+                pathloss_intercept_db=float(system_cfg.get('pathloss_intercept_db', -30.5)),
+                pathloss_exponent=float(system_cfg.get('pathloss_exponent', 3.67)),
+                shadowing_std_db=float(system_cfg.get('shadowing_std_db', 4.0)))
+        raise ValueError(f"Bộ sinh kênh không hợp lệ: {generator}")
+
+    def generate_from_config(self, config):
+        """
+        Sinh kênh cho một realization theo bộ sinh chọn trong config
+        (generate_batch_from_config với một realization, cùng luồng RNG).
+        
+        Returns:
+            H: Ma trận kênh (M, K, N); large-scale fading (nếu có) nằm ở self.beta
+        """
+        H, beta = self.generate_batch_from_config(config, 1)
+        self.beta = None if beta is None else beta[0]
+        return H[0]
+
+    @staticmethod
+    def jakes_correlation(doppler_hz, slot_duration):
+        """
+        Hệ số tương quan theo thời gian giữa 2 slot liên tiếp (mô hình Jakes):
+        rho = J0(2 * pi * f_d * T_slot)
+        
+        :param doppler_hz: Tần số Doppler lớn nhất f_d (Hz)
+        :param slot_duration: Độ dài một slot T_slot (s)
+        """
+        return float(j0(2 * np.pi * doppler_hz * slot_duration))
+
+    def evolve_channel(self, H_prev, rho, beta=None):
+        """
+        Tiến hóa kênh sang slot kế tiếp theo mô hình Gauss-Markov bậc 1:
+            H_t = rho * H_{t-1} + sqrt(1 - rho^2) * sqrt(beta) * E_t
+        với E_t là Rayleigh fading mới, độc lập. Phân phối biên của H_t
+        giữ nguyên, chỉ small-scale fading thay đổi chậm theo thời gian.
+        
+        Args:
+            H_prev: Kênh của slot trước (M, K, N)
+            rho: Hệ số tương quan, vd. từ jakes_correlation()
+            beta: Large-scale fading (M, K); mặc định dùng self.beta của kênh đã sinh
+            
+        Returns:
+            H: Kênh của slot hiện tại (M, K, N)
+        """
+        if beta is None:
+            beta = self.beta
+        
+        innovation = self.generate_rayleigh_channel()
+        if beta is not None:
+            innovation *= np.sqrt(beta)[..., np.newaxis]
+        
+        return rho * H_prev + np.sqrt(1 - rho**2) * innovation
@@ -0,0 +1,157 @@
+import os
+import json
+import numpy as np
+
+from src.system_model.channel import ChannelModel
+
+FORMAT_VERSION = 1
+# Số realization sinh trong một lần gọi bộ sinh khi tạo bộ dữ liệu (giới hạn bộ nhớ)
+CREATE_CHUNK = 1024
+
+# Các tham số bộ sinh kênh được ghi vào metadata để có thể sinh lại
+GENERATOR_KEYS = ('channel_model', 'area_size', 'ap_height', 'pathloss_intercept_db',
+                  'pathloss_exponent', 'shadowing_std_db')
+
+
+class ChannelDataset:
+    def __init__(self, path):
+        """
+        Bộ dữ liệu kênh trên đĩa, đọc lười (lazy) qua memmap.
+        Thư mục gồm:
+            channels.npy : các realization kênh phức (B, M, K, N)
+            beta.npy     : large-scale fading (B, M, K) - nếu bộ sinh có
+            meta.json    : M, K, N, tham số bộ sinh, seed, số realization
+
+        Truy cập ds[i] chỉ đọc trang dữ liệu của realization i, không nạp
+        toàn bộ file; nhiều worker có thể cùng mở một file và đọc các lát
+        rời nhau mà không sao chép.
+
+        :param path: Thư mục chứa bộ dữ liệu (tạo bằng ChannelDataset.create)
+        """
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Phiên bản định dạng không hỗ trợ: {self.meta.get('format_version')}")
+
+        self.M, self.K, self.N = self.meta['M'], self.meta['K'], self.meta['N']
+        self.H = np.load(os.path.join(path, 'channels.npy'), mmap_mode='r')
+        beta_path = os.path.join(path, 'beta.npy')
+        self.beta = np.load(beta_path, mmap_mode='r') if os.path.exists(beta_path) else None
+
+    @classmethod
+    def create(cls, path, config, n_realizations, seed):
+        """
+        Sinh và ghi bộ dữ liệu kênh theo config (system.channel_model, ...).
+        Mỗi lô CREATE_CHUNK realization được sinh trong một lần gọi bộ sinh
+        rồi ghi thẳng vào memmap, nên bộ nhớ dùng không phụ thuộc vào số
+        realization.
+
+        :param path: Thư mục đích (tạo mới nếu chưa có)
+        :param config: Cấu hình đã load từ config.yaml
+        :param n_realizations: Số realization cần sinh
+        :param seed: Seed của RNG => cùng seed + config cho cùng bộ dữ liệu
+        """
+        M = int(config['system']['M'])
+        K = int(config['system']['K'])
+        N = int(config['system']['N'])
+        os.makedirs(path, exist_ok=True)
+
+        np.random.seed(seed)
+        channel_model = ChannelModel(M, K, N)
+        H_store = np.lib.format.open_memmap(os.path.join(path, 'channels.npy'), mode='w+',
+                                            dtype=np.complex128, shape=(n_realizations, M, K, N))
+        beta_store = None
+        for start in range(0, n_realizations, CREATE_CHUNK):
+            stop = min(start + CREATE_CHUNK, n_realizations)
+            H_store[start:stop], beta = channel_model.generate_batch_from_config(config, stop - start)
+            if beta is not None:
+                if beta_store is None:
+                    beta_store = np.lib.format.open_memmap(os.path.join(path, 'beta.npy'), mode='w+',
+                                                           dtype=np.float64, shape=(n_realizations, M, K))
+                beta_store[start:stop] = beta
+        H_store.flush()
+        if beta_store is not None:
+            beta_store.flush()
+        del H_store, beta_store
+
+        meta = {
+            'format_version': FORMAT_VERSION,
+            'M': M, 'K': K, 'N': N,
+            'n_realizations': int(n_realizations),
+            'seed': seed,
+            'generator': {key: config['system'][key] for key in GENERATOR_KEYS if key in config['system']},
+        }
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+
+        return cls(path)
+
+    def __len__(self):
+        return self.H.shape[0]
+
+    def __getitem__(self, index):
+        """
+        Returns:
+            H: View (chỉ đọc) của realization index, (M, K, N)
+            beta: Large-scale fading (M, K) hoặc None
+        """
+        beta = self.beta[index] if self.beta is not None else None
+        return self.H[index], beta
+
+    def shard(self, worker_id, n_workers):
+        """Lát chỉ số liên tiếp, rời nhau dành cho worker_id trong n_workers"""
+        bounds = np.linspace(0, len(self), n_workers + 1).astype(int)
+        return range(bounds[worker_id], bounds[worker_id + 1])
+
+    def check_compatible(self, config):
+        """Đảm bảo kích thước (M, K, N) của bộ dữ liệu khớp với config"""
+        expected = (int(config['system']['M']), int(config['system']['K']), int(config['system']['N']))
+        if (self.M, self.K, self.N) != expected:
+            raise ValueError(f"Bộ dữ liệu có (M, K, N) = {(self.M, self.K, self.N)}, config yêu cầu {expected}")
+
+
+def load_channel(config, index, channel_model):
+    """
+    Lấy kênh cho realization index: đọc từ bộ dữ liệu trên đĩa nếu config có
+    simulation.channel_dataset, ngược lại sinh mới bằng channel_model.
+    Khi đọc từ đĩa, channel_model.beta được gán theo bộ dữ liệu.
+
+    Returns:
+        H: Ma trận kênh (M, K, N)
+    """
+    path = config.get('simulation', {}).get('channel_dataset')
+    if not path:
+        return channel_model.generate_from_config(config)
+
+    dataset = ChannelDataset(path)
+    dataset.check_compatible(config)
+    if index >= len(dataset):
+        raise IndexError(f"Bộ dữ liệu chỉ có {len(dataset)} realization, yêu cầu index {index}")
+    H, beta = dataset[index]
+    channel_model.beta = None if beta is None else np.asarray(beta)
+    return H
+
+
+def load_channel_batch(config, indices, channel_model):
+    """
+    Bản theo lô của load_channel: kênh (B, M, K, N) của các realization
+    indices, đọc một lần từ bộ dữ liệu trên đĩa hoặc sinh trong một lần gọi
+    channel_model.generate_batch_from_config (luồng RNG do nơi gọi seed).
+
+    Returns:
+        H: Kênh (B, M, K, N)
+        beta: Large-scale fading (B, M, K) hoặc None
+    """
+    path = config.get('simulation', {}).get('channel_dataset')
+    if not path:
+        return channel_model.generate_batch_from_config(config, len(indices))
+
+    dataset = ChannelDataset(path)
+    dataset.check_compatible(config)
+    indices = np.asarray(indices, dtype=int)
+    if len(indices) and indices.max() >= len(dataset):
+        raise IndexError(f"Bộ dữ liệu chỉ có {len(dataset)} realization, yêu cầu index {indices.max()}")
+    beta = None if dataset.beta is None else np.asarray(dataset.beta[indices])
+    channel_model.beta = beta
+    return np.asarray(dataset.H[indices]), beta
@@ -0,0 +1,31 @@
+import numpy as np
+
+def estimate_large_scale_fading(H):
+    """
+    Ước lượng large-scale fading beta (M, K) từ kênh tức thời:
+    công suất kênh trung bình trên N anten của mỗi cặp (AP, UE).
+    Dùng khi bộ sinh kênh không cung cấp beta.
+    """
+    return np.mean(np.abs(H)**2, axis=-1)
+
+def select_serving_clusters(beta, cluster_size):
+    """
+    Chọn cụm AP phục vụ cho từng UE (user-centric): mỗi UE được phục vụ bởi
+    cluster_size AP có large-scale fading mạnh nhất.
+    
+    Args:
+        beta: Large-scale fading (M, K)
+        cluster_size: Số AP phục vụ mỗi UE (L)
+        
+    Returns:
+        serving_mask: Ma trận bool (M, K), True nếu AP m phục vụ UE k
+    """
+    M, K = beta.shape
+    cluster_size = min(int(cluster_size), M)
+    
+    # Chỉ số L AP mạnh nhất của mỗi UE (theo từng cột)
+    strongest = np.argpartition(-beta, cluster_size - 1, axis=0)[:cluster_size]
+    
+    serving_mask = np.zeros((M, K), dtype=bool)
+    serving_mask[strongest, np.arange(K)] = True
+    return serving_mask
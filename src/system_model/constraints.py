@@ -1,34 +1,41 @@
 import numpy as np
 
-def enforce_power_constraint(W, p_max_dbm):
+def enforce_power_constraint(W, p_max_dbm, context=None, inplace=False):
     """
     Chuẩn hóa ma trận Beamforming để thỏa mãn ràng buộc công suất tại mỗi AP.
     
     Args:
         W: Ma trận Beamforming hiện tại (M, K, N) - Số phức
+           hoặc một lô giải pháp (..., M, K, N)
         p_max_dbm: Công suất tối đa (dBm)
+        context: ChannelContext (tùy chọn) - dùng P_max (Watts) tính sẵn
+        inplace: True => scale trực tiếp trên W, không tạo bản sao
+                 (chỉ dùng cho ứng viên mới sinh, không ai khác tham chiếu)
         
     Returns:
         W_normalized: Ma trận đã được chuẩn hóa
     """
-    # Chuyển đổi dBm sang Watts
-    p_max_watts = 10**((p_max_dbm - 30) / 10)
+    if context is not None:
+        p_max_watts = context.p_max_watts
+        power_current = context.ap_power(W)
+    else:
+        # Chuyển đổi dBm sang Watts
+        p_max_watts = 10**((p_max_dbm - 30) / 10)
+        # Công suất phát của từng AP: tổng |w|^2 trên trục (K, N) cuối cùng.
+        # Hỗ trợ cả một lô giải pháp (..., M, K, N), vd. cả quần thể (SN, M, K, N)
+        power_current = np.sum(np.abs(W)**2, axis=(-2, -1))
     
-    M, K, N = W.shape
-    W_norm = W.copy()
-    
-    # Duyệt qua từng AP để kiểm tra
-    for m in range(M):
-        # Tính tổng công suất phát của AP m dành cho tất cả K users
-        # P_total = sum(|w_m1|^2 + |w_m2|^2 + ... + |w_mK|^2)
-        # np.linalg.norm(vector)**2 tính tổng bình phương module
-        
-        # Flatten w[m, :, :] thành 1 vector dài K*N để tính tổng năng lượng nhanh
-        power_current = np.sum(np.abs(W[m, :, :])**2)
-        
-        # Nếu công suất vượt quá giới hạn -> Scale down
-        if power_current > p_max_watts:
-            scale_factor = np.sqrt(p_max_watts / power_current)
-            W_norm[m, :, :] *= scale_factor
+    # Nếu công suất vượt quá giới hạn -> Scale down, ngược lại giữ nguyên
+    scale_factor = np.sqrt(p_max_watts / np.maximum(power_current, p_max_watts))
+    if context is not None:
+        # Ngữ cảnh biết cách ánh xạ hệ số theo AP về bố cục giải pháp
+        # (dày đặc (M, K, N) hoặc thưa (P, N) trong chế độ user-centric)
+        scale_factor = context.broadcast_ap(scale_factor)
+    else:
+        scale_factor = scale_factor[..., np.newaxis, np.newaxis]
+    if inplace:
+        W *= scale_factor
+        return W
+    W_norm = W * scale_factor
             
     return W_norm
\ No newline at end of file
@@ -0,0 +1,275 @@
+import numpy as np
+from scipy import sparse
+
+from src.system_model.clustering import estimate_large_scale_fading, select_serving_clusters
+
+# Độ chính xác số học: algorithm.precision -> (kiểu thực, kiểu phức)
+PRECISIONS = {
+    'double': (np.float64, np.complex128),
+    'single': (np.float32, np.complex64),
+}
+
+
+def precision_dtypes(config):
+    """(real_dtype, complex_dtype) theo algorithm.precision (mặc định double)"""
+    precision = config.get('algorithm', {}).get('precision', 'double')
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision không hợp lệ: {precision} (chọn một trong {tuple(PRECISIONS)})")
+    return PRECISIONS[precision]
+
+class ChannelContext:
+    def __init__(self, H, config):
+        """
+        Ngữ cảnh bài toán gắn với một kênh H cố định.
+        Được dựng một lần (vd. khi khởi tạo ArtificialBeeColony) và truyền vào
+        các hàm metrics / constraints, để các lần đánh giá lặp lại trên cùng H
+        không phải tính lại những đại lượng chỉ phụ thuộc vào kênh.
+        Mọi tiền xử lý phụ thuộc kênh về sau đều đặt tại đây.
+
+        :param H: Ma trận kênh truyền (M, K, N)
+        :param config: Cấu hình đã load từ config.yaml
+        """
+        self.config = config
+        # Mọi mảng phụ thuộc kênh dùng cùng kiểu với quần thể (complex64 khi
+        # precision: single) để phép tính không bị nâng lên complex128
+        self.real_dtype, self.complex_dtype = precision_dtypes(config)
+        self.H = np.asarray(H, dtype=self.complex_dtype)
+        H = self.H
+        self.M, self.K, self.N = H.shape
+        # Kích thước của một giải pháp Beamforming trong không gian tìm kiếm
+        self.solution_shape = (self.M, self.K, self.N)
+
+        # Kênh "làm phẳng" liên tục trong bộ nhớ: hàng k là vector kênh
+        # của user k từ mọi AP ghép lại, kích thước (K, M*N)
+        self.H_flat = np.ascontiguousarray(H.transpose(1, 0, 2).reshape(self.K, self.M * self.N))
+        self.H_flat_conj = self.H_flat.conj()
+        # Liên hợp của H theo bố cục gốc (M, K, N), dùng cho cập nhật tăng dần
+        self.H_conj = H.conj()
+
+        # Các hằng số dẫn xuất (dBm -> Watts) chỉ tính một lần
+        self.p_max_watts = 10**((float(config['system']['p_max_dbm']) - 30) / 10)
+        self.noise_power = 10**((float(config['system']['noise_power_dbm']) - 30) / 10)
+
+        # Bộ đệm làm việc cấp phát sẵn, tái sử dụng theo kích thước batch
+        self.workspace = {}
+
+    def get_workspace(self, batch_size):
+        """Bộ đệm (B, K, M*N) chứa W đã chuyển vị sang bố cục của H_flat"""
+        buffer = self.workspace.get(batch_size)
+        if buffer is None:
+            buffer = np.empty((batch_size, self.K, self.M * self.N), dtype=self.H_flat.dtype)
+            self.workspace[batch_size] = buffer
+        return buffer
+
+    def effective_gain(self, W_batch):
+        """
+        Ma trận độ lợi hiệu dụng G[b, k, j] = sum_m h_mk^H * w_mj.
+
+        Args:
+            W_batch: Lô ma trận Beamforming (B, M, K, N)
+
+        Returns:
+            G: (B, K, K)
+        """
+        B = W_batch.shape[0]
+        W_flat = self.get_workspace(B)
+        # Sắp lại W thành (B, K, M*N) ngay trong bộ đệm, không cấp phát mới
+        np.copyto(W_flat.reshape(B, self.K, self.M, self.N), W_batch.transpose(0, 2, 1, 3))
+        return np.matmul(self.H_flat_conj, W_flat.transpose(0, 2, 1))
+
+    def ap_power(self, W_batch):
+        """Công suất phát của từng AP: (..., M, K, N) -> (..., M)"""
+        return np.sum(np.abs(W_batch)**2, axis=(-2, -1))
+
+    def broadcast_ap(self, values):
+        """Đưa đại lượng theo AP (..., M) về dạng broadcast được với giải pháp"""
+        return values[..., np.newaxis, np.newaxis]
+
+    def to_dense(self, W):
+        """Chuyển giải pháp về dạng đầy đủ (..., M, K, N) - ở đây đã là dạng đầy đủ"""
+        return W
+
+    def from_dense(self, W):
+        """Chuyển tensor đầy đủ (..., M, K, N) về bố cục giải pháp - ở đây giữ nguyên"""
+        return W
+
+    def with_channel(self, H):
+        """Ngữ cảnh cùng cấu trúc cho kênh mới (dùng khi theo dõi kênh theo slot)"""
+        return ChannelContext(H, self.config)
+
+
+class SparseChannelContext(ChannelContext):
+    def __init__(self, H, config, serving_mask):
+        """
+        Ngữ cảnh cho chế độ user-centric: mỗi UE chỉ được một cụm AP phục vụ.
+        Giải pháp chỉ chứa các khối w_mk đang hoạt động, xếp thành (P, N)
+        với P = số cặp (m, k) phục vụ, thay vì tensor dày đặc (M, K, N).
+        Chi phí đánh giá giảm từ O(M K^2 N) xuống O(P K N).
+
+        :param H: Ma trận kênh truyền (M, K, N)
+        :param config: Cấu hình đã load từ config.yaml
+        :param serving_mask: Ma trận bool (M, K), True nếu AP m phục vụ UE k
+        """
+        super().__init__(H, config)
+        self.serving_mask = serving_mask
+
+        # Các cặp (AP, UE) đang hoạt động, sắp theo UE để gộp theo đoạn
+        ue_idx, ap_idx = np.nonzero(serving_mask.T)
+        if len(np.unique(ue_idx)) != self.K:
+            raise ValueError("Mỗi UE phải được ít nhất một AP phục vụ")
+        self.pair_ap = ap_idx
+        self.pair_ue = ue_idx
+        self.n_pairs = len(ap_idx)
+        self.solution_shape = (self.n_pairs, self.N)
+        # Vị trí bắt đầu đoạn của từng UE trong danh sách cặp
+        self.ue_starts = np.searchsorted(ue_idx, np.arange(self.K))
+
+        # Kênh từ AP của cặp p tới mọi user: conj(H[m_p, k, :]) -> (P, K, N)
+        self.H_pairs_conj = np.ascontiguousarray(self.H_conj[ap_idx])
+
+        # Ma trận thưa (P, M) gộp công suất của các cặp về từng AP
+        self.ap_incidence = sparse.csr_matrix(
+            (np.ones(self.n_pairs, dtype=self.real_dtype), (np.arange(self.n_pairs), ap_idx)),
+            shape=(self.n_pairs, self.M))
+
+    def effective_gain(self, W_batch):
+        """
+        G[b, k, j] = sum_{p: ue(p) = j} h_{m_p k}^H * w_p
+
+        Args:
+            W_batch: Lô giải pháp thưa (B, P, N)
+
+        Returns:
+            G: (B, K, K)
+        """
+        # Biên độ của mỗi cặp p tới mọi user k: (B, P, K)
+        A = np.einsum('pkn,bpn->bpk', self.H_pairs_conj, W_batch, optimize=True)
+        # Cộng theo đoạn các cặp của cùng UE j -> (B, j, k)
+        G_t = np.add.reduceat(A, self.ue_starts, axis=1)
+        return G_t.transpose(0, 2, 1)
+
+    def ap_power(self, W_batch):
+        """Công suất phát của từng AP: (..., P, N) -> (..., M)"""
+        pair_power = np.sum(np.abs(W_batch)**2, axis=-1)
+        flat = pair_power.reshape(-1, self.n_pairs)
+        power = (self.ap_incidence.T @ flat.T).T
+        return power.reshape(pair_power.shape[:-1] + (self.M,))
+
+    def broadcast_ap(self, values):
+        """Lấy giá trị của AP phục vụ cho từng cặp: (..., M) -> (..., P, 1)"""
+        return values[..., self.pair_ap, np.newaxis]
+
+    def to_dense(self, W):
+        """Chuyển giải pháp thưa (..., P, N) về tensor đầy đủ (..., M, K, N)"""
+        dense = np.zeros(W.shape[:-2] + (self.M, self.K, self.N), dtype=W.dtype)
+        dense[..., self.pair_ap, self.pair_ue, :] = W
+        return dense
+
+    def from_dense(self, W):
+        """Giữ lại các khối w_mk của cặp đang phục vụ: (..., M, K, N) -> (..., P, N)"""
+        return W[..., self.pair_ap, self.pair_ue, :]
+
+    def with_channel(self, H):
+        """Giữ nguyên cụm phục vụ (và kích thước giải pháp) cho kênh mới"""
+        return SparseChannelContext(H, self.config, self.serving_mask)
+
+
+class BlockChannelContext(ChannelContext):
+    def __init__(self, H_block, config, interference=None):
+        """
+        Ngữ cảnh cho một cụm AP trong bài toán phân tán: giải pháp chỉ là khối
+        W_c (M_c, K, N) của cụm, phần đóng góp của các cụm khác vào ma trận độ
+        lợi được gộp sẵn thành một ma trận (K, K) cố định trong lúc tìm kiếm:
+            G = H_c^H W_c + interference
+        Mọi đường đánh giá (batched, coordinate, gradient) đi qua effective_gain
+        nên dùng lại nguyên vẹn cho bài toán con của cụm.
+
+        :param H_block: Kênh từ các AP của cụm tới mọi user (M_c, K, N)
+        :param config: Cấu hình đã load từ config.yaml
+        :param interference: Tổng độ lợi của các cụm còn lại (K, K) (None = 0)
+        """
+        super().__init__(H_block, config)
+        if interference is None:
+            interference = np.zeros((self.K, self.K), dtype=self.complex_dtype)
+        self.interference = np.asarray(interference, dtype=self.complex_dtype)
+
+    def block_gain(self, W_batch):
+        """Phần độ lợi do riêng khối của cụm tạo ra: (B, M_c, K, N) -> (B, K, K)"""
+        return super().effective_gain(W_batch)
+
+    def effective_gain(self, W_batch):
+        return self.block_gain(W_batch) + self.interference
+
+    def with_channel(self, H_block):
+        return BlockChannelContext(H_block, self.config, self.interference)
+
+
+class BatchChannelContext(ChannelContext):
+    def __init__(self, H_batch, config):
+        """
+        Ngữ cảnh cho nhiều bài toán độc lập cùng kích thước (vd. các realization
+        Monte Carlo): instance b có kênh riêng H_batch[b]. Giải pháp mang thêm
+        trục instance ở đầu: (B, ..., M, K, N). Chỉ hỗ trợ bố cục dày đặc.
+
+        :param H_batch: Các ma trận kênh truyền (B, M, K, N)
+        :param config: Cấu hình đã load từ config.yaml
+        """
+        self.config = config
+        self.real_dtype, self.complex_dtype = precision_dtypes(config)
+        self.H = np.asarray(H_batch, dtype=self.complex_dtype)
+        H_batch = self.H
+        self.n_instances, self.M, self.K, self.N = H_batch.shape
+        self.solution_shape = (self.M, self.K, self.N)
+
+        # Kênh làm phẳng của từng instance: (B, K, M*N)
+        self.H_flat = np.ascontiguousarray(
+            H_batch.transpose(0, 2, 1, 3).reshape(self.n_instances, self.K, self.M * self.N))
+        self.H_flat_conj = self.H_flat.conj()
+        self.H_conj = H_batch.conj()
+
+        self.p_max_watts = 10**((float(config['system']['p_max_dbm']) - 30) / 10)
+        self.noise_power = 10**((float(config['system']['noise_power_dbm']) - 30) / 10)
+        self.workspace = {}
+
+    def effective_gain(self, W_batch, instances=None):
+        """
+        G[b, s, k, j] = sum_m h_bmk^H * w_bsmj
+
+        Args:
+            W_batch: Giải pháp (B, S, M, K, N) - giải pháp s của instance b,
+                     hoặc (P, M, K, N) nếu truyền instances
+            instances: Chỉ số instance của từng giải pháp (P,) (tùy chọn)
+
+        Returns:
+            G: (B, S, K, K) hoặc (P, K, K)
+        """
+        # (..., M, K, N) -> (..., K, M*N) rồi nhân với kênh của đúng instance
+        W_flat = np.swapaxes(W_batch, -3, -2).reshape(W_batch.shape[:-3] + (self.K, self.M * self.N))
+        if instances is None:
+            H_flat_conj = self.H_flat_conj[:, np.newaxis]
+        else:
+            H_flat_conj = self.H_flat_conj[instances]
+        return np.matmul(H_flat_conj, np.swapaxes(W_flat, -1, -2))
+
+    def to_dense(self, W):
+        return W
+
+    def with_channel(self, H_batch):
+        return BatchChannelContext(H_batch, self.config)
+
+
+def build_context(H, config, beta=None):
+    """
+    Dựng ngữ cảnh kênh theo config: dày đặc (mặc định) hoặc user-centric.
+
+    :param H: Ma trận kênh truyền (M, K, N)
+    :param config: Cấu hình đã load từ config.yaml
+    :param beta: Large-scale fading (M, K) nếu biết; None => ước lượng từ H
+    """
+    if not config['system'].get('user_centric', False):
+        return ChannelContext(H, config)
+
+    if beta is None:
+        beta = estimate_large_scale_fading(H)
+    cluster_size = int(config['system'].get('cluster_size', 4))
+    return SparseChannelContext(H, config, select_serving_clusters(beta, cluster_size))
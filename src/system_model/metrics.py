@@ -1,4 +1,5 @@
 import numpy as np
+from src.system_model.context import ChannelContext
 
 class SystemMetrics:
     def __init__(self, config):
@@ -14,12 +15,17 @@ class SystemMetrics:
         
         Args:
             W: Ma trận Beamforming (M, K, N) - Biến cần tối ưu
-            H: Ma trận kênh truyền (M, K, N)
+            H: Ma trận kênh truyền (M, K, N) hoặc ChannelContext
             
         Returns:
             sum_rate: Tổng dung lượng (bps/Hz) hoặc (bps) tùy config
             individual_rates: List tốc độ của từng user
         """
+        # Có ngữ cảnh kênh dựng sẵn => dùng đường tính vector hóa
+        if isinstance(H, ChannelContext):
+            sum_rates, _ = self.calculate_sum_rate_batch(W[np.newaxis], H)
+            return sum_rates[0]
+        
         M, K, N = W.shape
         sinr_list = []
         
@@ -60,4 +66,92 @@ class SystemMetrics:
         individual_rates = np.log2(1 + np.array(sinr_list))
         sum_rate = np.sum(individual_rates)
         
-        return sum_rate
\ No newline at end of file
+        return sum_rate
+
+    def calculate_sum_rate_batch(self, W_batch, H):
+        """
+        Tính Sum Rate cho cả một lô (batch) giải pháp cùng lúc.
+        Kết quả trùng với calculate_sum_rate nhưng thay 3 vòng lặp Python
+        bằng một phép co tensor duy nhất.
+
+        Args:
+            W_batch: Lô ma trận Beamforming (B, M, K, N)
+            H: Ma trận kênh truyền (M, K, N) hoặc ChannelContext
+
+        Returns:
+            sum_rates: Tổng tốc độ của từng giải pháp (B,)
+            individual_rates: Tốc độ của từng user (B, K)
+        """
+        G = self.effective_gain_batch(W_batch, H)
+        signal_power, interference_power = self.split_gain_power(G)
+        individual_rates = self.rates_from_power(signal_power, interference_power)
+        sum_rates = np.sum(individual_rates, axis=-1)
+
+        return sum_rates, individual_rates
+
+    def effective_gain_batch(self, W_batch, H):
+        """
+        Ma trận độ lợi hiệu dụng: G[b, k, j] = sum_m h_mk^H * w_mj
+        (hàng k: user nhận, cột j: luồng dữ liệu phát cho user j).
+
+        Args:
+            W_batch: Lô ma trận Beamforming (B, M, K, N)
+            H: Ma trận kênh truyền (M, K, N) hoặc ChannelContext
+
+        Returns:
+            G: Ma trận độ lợi hiệu dụng (B, K, K)
+        """
+        if isinstance(H, ChannelContext):
+            return H.effective_gain(W_batch)
+        return np.einsum('mkn,bmjn->bkj', H.conj(), W_batch, optimize=True)
+
+    def split_gain_power(self, G):
+        """
+        Tách ma trận độ lợi (..., K, K) thành công suất tín hiệu mong muốn
+        (đường chéo) và công suất nhiễu giao thoa (phần còn lại của hàng k).
+
+        Returns:
+            signal_power, interference_power: Mỗi mảng có kích thước (..., K)
+        """
+        power = np.abs(G)**2
+        signal_power = np.diagonal(power, axis1=-2, axis2=-1)
+        interference_power = np.sum(power, axis=-1) - signal_power
+        return signal_power, interference_power
+
+    def sum_rate_gradient_batch(self, W_batch, H):
+        """
+        Sum Rate và gradient giải tích của nó theo W cho cả lô.
+        Viết R = sum_k [log2(T_k) - log2(T_k - |G_kk|^2)] với
+        T_k = sum_j |G_kj|^2 + noise; vì d|G_kj|^2 / d conj(w_mj) = G_kj h_mk:
+            dR / d conj(w_mjn) = sum_k C[k, j] H[m, k, n]
+            C[k, j] = G_kj (1 / T_k - [j != k] / (I_k + noise)) / ln 2
+        Hướng tăng nhanh nhất của R theo W chính là gradient này (đạo hàm
+        Wirtinger): dR = 2 Re(sum conj(gradient) * dW).
+
+        Args:
+            W_batch: (B, *solution_shape)
+            H: Ma trận kênh (M, K, N) hoặc ChannelContext
+
+        Returns:
+            sum_rates: (B,)
+            gradient: cùng kích thước với W_batch
+        """
+        G = self.effective_gain_batch(W_batch, H)
+        signal_power, interference_power = self.split_gain_power(G)
+        sum_rates = np.sum(self.rates_from_power(signal_power, interference_power), axis=-1)
+
+        total = signal_power + interference_power + self.noise_power
+        K = G.shape[-1]
+        coeff = G / total[..., np.newaxis] - (G / (interference_power + self.noise_power)[..., np.newaxis]) * \
+            (1 - np.eye(K, dtype=signal_power.dtype))
+        coeff *= 1 / np.log(2)
+        if isinstance(H, ChannelContext):
+            # Gradient theo tensor đầy đủ rồi lấy các khối của bố cục giải pháp (user-centric)
+            gradient = np.einsum('bkj,mkn->bmjn', coeff, H.H, optimize=True)
+            return sum_rates, H.from_dense(gradient)
+        return sum_rates, np.einsum('bkj,mkn->bmjn', coeff, H, optimize=True)
+
+    def rates_from_power(self, signal_power, interference_power):
+        """Rate của từng user theo Shannon: log2(1 + S / (I + noise))"""
+        sinr = signal_power / (interference_power + self.noise_power)
+        return np.log2(1 + sinr)
@@ -0,0 +1,127 @@
+import numpy as np
+
+from src.system_model.context import precision_dtypes
+
+# Cách gộp độ lợi cảm biến vào fitness (sensing.objective)
+OBJECTIVES = ('weighted', 'constrained')
+
+
+def steering_matrix(N, theta):
+    """
+    Ma trận vector dẫn hướng của mảng anten thẳng (ULA), d = lambda/2.
+    Tính một lần cho lưới góc theta rồi dùng lại cho mọi lần vẽ / đánh giá.
+
+    Returns:
+        A: (len(theta), N), hàng t là a(theta_t) = exp(-j*pi*n*sin(theta_t))
+    """
+    return np.exp(-1j * np.pi * np.outer(np.sin(theta), np.arange(N)))
+
+
+class SensingObjective:
+    def __init__(self, config, N, M=None):
+        """
+        Thành phần cảm biến (ISAC) của fitness: độ lợi búp sóng phát hướng về
+        các mục tiêu. Với ma trận hiệp phương sai phát R_m = sum_k w_mk w_mk^H
+        của AP m, độ lợi tại góc theta là a(theta)^H R_m a(theta); độ lợi
+        chuẩn hóa của một giải pháp là
+            g = sum_{m,k,t} |a(theta_t)^H w_mk|^2 / (M * T * N * P_max)  trong [0, 1]
+        (bằng 1 khi mọi AP dồn toàn bộ công suất về đúng hướng mục tiêu).
+
+        Từ điển dẫn hướng A (T, N) chỉ phụ thuộc hình học (N, góc mục tiêu) nên
+        được dựng một lần cho solver và giữ nguyên khi kênh thay đổi. Mọi mảng
+        cùng kiểu với quần thể (algorithm.precision).
+
+        :param config: Cấu hình đã load từ config.yaml (mục sensing)
+        :param N: Số anten mỗi AP
+        :param M: Số AP (None = system.M)
+        """
+        sensing_cfg = config.get('sensing') or {}
+        self.objective = sensing_cfg.get('objective', 'weighted')
+        if self.objective not in OBJECTIVES:
+            raise ValueError(f"sensing.objective không hợp lệ: {self.objective} (chọn một trong {OBJECTIVES})")
+        angles = np.asarray(sensing_cfg.get('target_angles_deg') or [], dtype=float)
+        if angles.ndim != 1 or len(angles) == 0:
+            raise ValueError("sensing.target_angles_deg phải là danh sách góc mục tiêu không rỗng")
+        self.weight = float(sensing_cfg.get('weight', 1.0))       # bps/Hz cho mỗi đơn vị độ lợi chuẩn hóa
+        self.min_gain = float(sensing_cfg.get('min_gain', 0.0))   # Ngưỡng độ lợi chuẩn hóa (constrained)
+        self.penalty = float(sensing_cfg.get('penalty', 100.0))   # Hệ số phạt khi vi phạm ngưỡng
+
+        real_dtype, complex_dtype = precision_dtypes(config)
+        self.N = N
+        self.M = int(config['system']['M']) if M is None else M
+        self.target_angles = np.deg2rad(angles)
+        # a(theta_t)^H w = sum_n conj(a_tn) w_n => nhân phải với conj(A)^T (N, T)
+        self.A = steering_matrix(N, self.target_angles).astype(complex_dtype)
+        self.A_adjoint = np.ascontiguousarray(self.A.conj().T)
+        p_max_watts = 10**((float(config['system']['p_max_dbm']) - 30) / 10)
+        self.scale = real_dtype(1.0 / (self.M * len(angles) * N * p_max_watts))
+
+    def block_gain(self, W):
+        """
+        Độ lợi chuẩn hóa đóng góp bởi một khối beamformer bất kỳ (..., N),
+        vd. một phần tử w_mk (N,) hay cả W[m] (K, N): tổng trên mọi hàng và mục tiêu.
+        """
+        return np.sum(np.abs(W @ self.A_adjoint)**2) * self.scale
+
+    def gain(self, W_batch, n_solution_axes):
+        """
+        Độ lợi chuẩn hóa của cả lô giải pháp, một phép nhân với từ điển dẫn hướng.
+
+        Args:
+            W_batch: (B, *solution_shape), solution_shape = (M, K, N) hoặc (P, N)
+            n_solution_axes: len(solution_shape)
+
+        Returns:
+            g: (B,)
+        """
+        projections = W_batch @ self.A_adjoint # (B, ..., T)
+        axes = tuple(range(-n_solution_axes, 0))
+        return np.sum(np.abs(projections)**2, axis=axes) * self.scale
+
+    def gain_gradient(self, W_batch, n_solution_axes):
+        """
+        Độ lợi chuẩn hóa và gradient của nó theo W (đạo hàm Wirtinger, cùng
+        quy ước với SystemMetrics.sum_rate_gradient_batch):
+            dg / d conj(w) = scale * sum_t (a_t^H w) a_t
+        """
+        projections = W_batch @ self.A_adjoint # (B, ..., T)
+        axes = tuple(range(-n_solution_axes, 0))
+        gain = np.sum(np.abs(projections)**2, axis=axes) * self.scale
+        return gain, (projections @ self.A) * self.scale
+
+    def combine_gradient(self, sum_rate, rate_gradient, gain, gain_gradient):
+        """Gradient của combine() theo W (quy tắc dây chuyền, cho cả lô)"""
+        expand = (slice(None),) + (np.newaxis,) * (rate_gradient.ndim - 1)
+        if self.objective == 'weighted':
+            return rate_gradient + self.weight * gain_gradient
+        if self.min_gain <= 0:
+            return rate_gradient
+        c = self.penalty / self.min_gain
+        violated = gain < self.min_gain
+        denominator = 1 + c * np.maximum(self.min_gain - gain, 0)
+        # f = R / D, D = 1 + c (g_min - g) khi vi phạm => df = dR / D + R c dg / D^2
+        return rate_gradient / denominator[expand] + \
+            (violated * sum_rate * c / denominator**2)[expand] * gain_gradient
+
+    def combine(self, sum_rate, gain):
+        """
+        Fitness kết hợp từ Sum Rate và độ lợi cảm biến:
+            weighted   : R + weight * g
+            constrained: R / (1 + penalty * max(0, g_min - g) / g_min)
+        Dạng phạt chia (thay vì trừ) giữ fitness không âm để Ong quan sát vẫn
+        chọn theo roulette được; nghiệm thỏa ngưỡng giữ nguyên Sum Rate.
+        """
+        if self.objective == 'weighted':
+            return sum_rate + self.weight * gain
+        if self.min_gain <= 0:
+            return sum_rate
+        violation = np.maximum(self.min_gain - gain, 0) / self.min_gain
+        return sum_rate / (1 + self.penalty * violation)
+
+
+def build_sensing(config, N, M=None):
+    """SensingObjective nếu sensing.enabled, ngược lại None (fitness chỉ là Sum Rate)"""
+    sensing_cfg = config.get('sensing') or {}
+    if not sensing_cfg.get('enabled', False):
+        return None
+    return SensingObjective(config, N, M)
@@ -0,0 +1,196 @@
+import traceback
+import weakref
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+
+from src.system_model.context import ChannelContext, SparseChannelContext
+from src.system_model.metrics import SystemMetrics
+
+
+def attach_shared(name, shape, dtype):
+    """
+    Gắn vào một khối shared memory đã có (do process chính tạo) và xem nó như
+    mảng numpy, không sao chép. Process con dùng chung resource_tracker với
+    process chính nên chỉ close(), việc unlink do process chính đảm nhận.
+    """
+    shm = SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def evaluation_worker(config, h_spec, tasks, done):
+    """
+    Vòng lặp của một process đánh giá. Mảng lớn (H, lô giải pháp, kết quả)
+    nằm trong shared memory; qua hàng đợi chỉ có các lệnh nhỏ:
+        ('channel', serving_mask)            H trong shared memory vừa đổi => dựng lại ngữ cảnh
+        ('buffers', w_spec, out_spec)        bộ đệm lô giải pháp / kết quả mới (khi tăng sức chứa)
+        ('evaluate', start, stop)            Sum Rate của W[start:stop] -> out[start:stop]
+        None                                 thoát
+    Mỗi lệnh được trả lời bằng None (xong) hoặc chuỗi traceback (lỗi).
+    Hàm ở mức module để process con dựng được với mọi start method.
+    """
+    metrics = SystemMetrics(config)
+    h_shm, H = attach_shared(*h_spec)
+    w_shm = out_shm = None
+    context = None
+    try:
+        for message in iter(tasks.get, None):
+            try:
+                kind = message[0]
+                if kind == 'channel':
+                    serving_mask = message[1]
+                    context = ChannelContext(H, config) if serving_mask is None \
+                        else SparseChannelContext(H, config, serving_mask)
+                elif kind == 'buffers':
+                    W = out = None # Bỏ view cũ trước khi đóng khối
+                    for shm in (w_shm, out_shm):
+                        if shm is not None:
+                            shm.close()
+                    w_shm, W = attach_shared(*message[1])
+                    out_shm, out = attach_shared(*message[2])
+                elif kind == 'evaluate':
+                    _, start, stop = message
+                    out[start:stop], _ = metrics.calculate_sum_rate_batch(W[start:stop], context)
+                done.put(None)
+            except Exception:
+                done.put(traceback.format_exc())
+    finally:
+        context = W = out = H = None
+        for shm in (h_shm, w_shm, out_shm):
+            if shm is not None:
+                shm.close()
+
+
+def shutdown(processes, task_queues, blocks):
+    """Dừng các process đánh giá và giải phóng shared memory (gọi một lần)"""
+    for queue in task_queues:
+        try:
+            queue.put(None)
+        except (OSError, ValueError):
+            pass
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+    for shm in blocks.values():
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedMemoryEvaluator:
+    def __init__(self, context, config, n_workers, min_batch=1, capacity=1):
+        """
+        Đánh giá Sum Rate song song cho một bài toán duy nhất: H và lô giải
+        pháp được đặt trong multiprocessing.shared_memory, các process đánh
+        giá (giữ sống suốt vòng đời solver) mỗi process tính một đoạn liên
+        tiếp của lô rồi ghi thẳng vào mảng kết quả dùng chung. Mỗi lần gọi chỉ
+        sao chép lô vào shared memory và gửi các cặp chỉ số (start, stop) qua
+        hàng đợi - không pickle mảng nào. Kết quả trùng bit với
+        SystemMetrics.calculate_sum_rate_batch (các giải pháp độc lập nhau).
+
+        :param context: ChannelContext / SparseChannelContext của bài toán
+        :param config: Cấu hình đã load từ config.yaml
+        :param n_workers: Số process đánh giá
+        :param min_batch: Lô nhỏ hơn ngưỡng này được tính ngay trong process chính
+                          (chi phí đồng bộ lớn hơn phần tính toán)
+        :param capacity: Sức chứa ban đầu của bộ đệm lô (tự tăng khi cần)
+        """
+        if type(context) not in (ChannelContext, SparseChannelContext):
+            raise ValueError("SharedMemoryEvaluator chỉ hỗ trợ ChannelContext / SparseChannelContext")
+        if n_workers < 1:
+            raise ValueError(f"n_workers phải >= 1 (nhận {n_workers})")
+        self.config = config
+        self.n_workers = int(n_workers)
+        self.min_batch = max(int(min_batch), 1)
+        self.metrics = SystemMetrics(config)
+        self.context = context
+        self.capacity = 0
+        self.blocks = {}
+
+        H = np.asarray(context.H)
+        self.blocks['H'] = SharedMemory(create=True, size=max(H.nbytes, 1))
+        self.H = np.ndarray(H.shape, dtype=H.dtype, buffer=self.blocks['H'].buf)
+        self.H[...] = H
+        h_spec = (self.blocks['H'].name, H.shape, H.dtype.str)
+
+        mp_context = mp.get_context()
+        self.done = mp_context.Queue()
+        self.task_queues = [mp_context.Queue() for _ in range(self.n_workers)]
+        self.processes = [mp_context.Process(target=evaluation_worker, daemon=True,
+                                             args=(config, h_spec, tasks, self.done))
+                          for tasks in self.task_queues]
+        # Dọn dẹp cả khi người dùng quên close() (thu gom rác hoặc thoát chương trình)
+        self.finalizer = weakref.finalize(self, shutdown, self.processes, self.task_queues, self.blocks)
+        for process in self.processes:
+            process.start()
+
+        self.broadcast(('channel', self.serving_mask(context)))
+        self.ensure_capacity(capacity)
+
+    @staticmethod
+    def serving_mask(context):
+        return getattr(context, 'serving_mask', None)
+
+    def broadcast(self, message):
+        """Gửi cùng một lệnh tới mọi process rồi chờ tất cả xác nhận"""
+        for tasks in self.task_queues:
+            tasks.put(message)
+        self.collect(self.n_workers)
+
+    def collect(self, n_replies):
+        errors = [reply for reply in (self.done.get() for _ in range(n_replies)) if reply is not None]
+        if errors:
+            raise RuntimeError("Process đánh giá gặp lỗi:\n" + errors[0])
+
+    def ensure_capacity(self, batch_size):
+        """Cấp lại bộ đệm lô / kết quả (gấp đôi) khi lô vượt sức chứa hiện tại"""
+        if batch_size <= self.capacity:
+            return
+        capacity = max(batch_size, 2 * self.capacity)
+        W_shape = (capacity,) + tuple(self.context.solution_shape)
+        W_dtype = np.dtype(self.context.complex_dtype)
+        out_dtype = np.dtype(self.context.real_dtype)
+        old_blocks = [self.blocks.pop(key) for key in ('W', 'out') if key in self.blocks]
+        self.blocks['W'] = SharedMemory(create=True, size=int(np.prod(W_shape)) * W_dtype.itemsize)
+        self.blocks['out'] = SharedMemory(create=True, size=capacity * out_dtype.itemsize)
+        self.W = np.ndarray(W_shape, dtype=W_dtype, buffer=self.blocks['W'].buf)
+        self.out = np.ndarray((capacity,), dtype=out_dtype, buffer=self.blocks['out'].buf)
+        self.capacity = capacity
+        self.broadcast(('buffers', (self.blocks['W'].name, W_shape, W_dtype.str),
+                        (self.blocks['out'].name, (capacity,), out_dtype.str)))
+        # Các process con đã đóng bộ đệm cũ => giải phóng được
+        for shm in old_blocks:
+            shm.close()
+            shm.unlink()
+
+    def set_context(self, context):
+        """Kênh mới (cùng kích thước): ghi đè H trong shared memory, các process dựng lại ngữ cảnh"""
+        H = np.asarray(context.H)
+        if H.shape != self.H.shape or H.dtype != self.H.dtype:
+            raise ValueError(f"Kênh mới {H.shape} {H.dtype} khác kênh ban đầu {self.H.shape} {self.H.dtype}")
+        self.context = context
+        self.H[...] = H
+        self.broadcast(('channel', self.serving_mask(context)))
+
+    def sum_rates(self, W_batch):
+        """
+        Sum Rate của cả lô (B, *solution_shape) -> (B,), chia thành n_workers
+        đoạn liên tiếp gần bằng nhau.
+        """
+        n = len(W_batch)
+        if n < self.min_batch:
+            return self.metrics.calculate_sum_rate_batch(W_batch, self.context)[0]
+        self.ensure_capacity(n)
+        self.W[:n] = W_batch
+        bounds = np.linspace(0, n, min(self.n_workers, n) + 1).astype(int)
+        for tasks, start, stop in zip(self.task_queues, bounds[:-1], bounds[1:]):
+            tasks.put(('evaluate', int(start), int(stop)))
+        self.collect(len(bounds) - 1)
+        return self.out[:n].copy()
+
+    def close(self):
+        self.finalizer()
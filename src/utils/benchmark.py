@@ -0,0 +1,322 @@
+import copy
+import json
+import os
+import platform
+import time
+import tracemalloc
+import numpy as np
+
+from src.system_model.channel import ChannelModel
+from src.system_model.metrics import SystemMetrics
+from src.system_model.constraints import enforce_power_constraint
+from src.system_model.context import ChannelContext
+from src.algorithms.abc_variants import GbestABC
+
+
+def time_call(fn, repeats=5, min_time=0.05):
+    """
+    Đo thời gian trung bình một lần gọi fn() (giây).
+    Mỗi lần đo lặp fn đủ lâu (>= min_time) để bớt nhiễu đồng hồ,
+    lấy kết quả tốt nhất trong repeats lần đo.
+    """
+    # Ước lượng số lần lặp cần cho mỗi lần đo
+    start = time.perf_counter()
+    fn()
+    single = max(time.perf_counter() - start, 1e-9)
+    n_inner = max(1, int(min_time / single))
+
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(n_inner):
+            fn()
+        best = min(best, (time.perf_counter() - start) / n_inner)
+    return best
+
+
+def peak_memory(fn):
+    """Bộ nhớ cấp phát đỉnh (bytes) trong một lần gọi fn(), đo bằng tracemalloc"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def make_problem(config, M, K, N, pop_size, seed):
+    """Config + kênh + metrics cố định seed cho một điểm (M, K, N, pop_size)"""
+    config = copy.deepcopy(config)
+    config['system'].update(M=M, K=K, N=N)
+    config['algorithm']['pop_size'] = pop_size
+    np.random.seed(seed)
+    H = ChannelModel(M, K, N).generate_from_config(config)
+    return config, H, SystemMetrics(config)
+
+
+def benchmark_kernels(config, H, metrics, repeats):
+    """Đo các kernel: hàm fitness, chiếu công suất, sinh ứng viên G-ABC"""
+    solver = GbestABC(config, H, metrics)
+    solver.initialize_population()
+    SN = solver.pop_size
+    W = solver.population[0].copy()
+    p_max_dbm = solver.p_max_dbm
+    context = solver.context
+    idx = np.arange(SN)
+    partners = solver.select_partners(idx)
+
+    results = {}
+    t = time_call(lambda: metrics.calculate_sum_rate(W, H), repeats)
+    results['sum_rate_loop'] = {'seconds_per_call': t, 'evals_per_second': 1 / t}
+    t = time_call(lambda: metrics.calculate_sum_rate(W, context), repeats)
+    results['sum_rate_context'] = {'seconds_per_call': t, 'evals_per_second': 1 / t}
+    t = time_call(lambda: metrics.calculate_sum_rate_batch(solver.population, context), repeats)
+    results['sum_rate_batch'] = {'seconds_per_call': t, 'evals_per_second': SN / t, 'batch_size': SN}
+
+    t = time_call(lambda: enforce_power_constraint(W, p_max_dbm), repeats)
+    results['power_constraint'] = {'seconds_per_call': t, 'solutions_per_second': 1 / t}
+    t = time_call(lambda: enforce_power_constraint(solver.population, p_max_dbm, context=context), repeats)
+    results['power_constraint_batch'] = {'seconds_per_call': t, 'solutions_per_second': SN / t, 'batch_size': SN}
+
+    t = time_call(lambda: solver.generate_candidate(0, 1), repeats)
+    results['generate_candidate'] = {'seconds_per_call': t, 'candidates_per_second': 1 / t}
+    t = time_call(lambda: solver.generate_candidates_batch(idx, partners), repeats)
+    results['generate_candidates_batch'] = {'seconds_per_call': t, 'candidates_per_second': SN / t,
+                                            'batch_size': SN}
+
+    results['sum_rate_batch']['peak_memory_bytes'] = peak_memory(
+        lambda: metrics.calculate_sum_rate_batch(solver.population, context))
+    return results
+
+
+def time_to_target(curve, timestamps, target_rate):
+    """Thời gian (giây) tới vòng lặp đầu tiên đạt target_rate, None nếu không đạt"""
+    reached = np.flatnonzero(np.asarray(curve) >= target_rate)
+    return timestamps[reached[0]] if len(reached) > 0 else None
+
+
+def benchmark_solve(config, H, metrics, engine, cycles, seed, eval_workers=0):
+    """
+    Chạy G-ABC với engine cho trước trong cycles vòng lặp, ghi lại thời gian
+    từng vòng để suy ra thời gian mỗi vòng và thời gian đạt target.
+    eval_workers > 1: đánh giá lô bằng SharedMemoryEvaluator (khởi động các
+    process trước khi bấm giờ).
+
+    Returns:
+        result: dict các chỉ số
+        trace: (convergence_curve, timestamps) để tính thời gian đạt target
+    """
+    config = copy.deepcopy(config)
+    config['algorithm']['engine'] = engine
+    config['algorithm']['eval_workers'] = eval_workers
+
+    def build():
+        np.random.seed(seed)
+        return GbestABC(config, H, metrics)
+
+    solver = build()
+    if eval_workers > 1:
+        solver.shared_evaluator()
+    start = time.perf_counter()
+    solver.initialize_population()
+    init_time = time.perf_counter() - start
+    timestamps = []
+    for _ in range(cycles):
+        solver.run_cycle()
+        timestamps.append(time.perf_counter() - start)
+    total_time = timestamps[-1]
+
+    # Bộ nhớ đỉnh đo ở lần chạy riêng (tracemalloc làm chậm phép đo thời gian)
+    def short_run():
+        s = build()
+        s.initialize_population()
+        for _ in range(min(cycles, 5)):
+            s.run_cycle()
+        s.close()
+
+    solver.close()
+
+    result = {
+        'engine': engine,
+        'eval_workers': eval_workers,
+        'cycles': cycles,
+        'init_seconds': init_time,
+        'seconds_per_cycle': (total_time - init_time) / cycles,
+        'evals_per_second': solver.n_evaluations / total_time,
+        'n_evaluations': solver.n_evaluations,
+        'final_rate': float(solver.best_fitness),
+        'population_bytes': solver.population.nbytes,
+        'peak_memory_bytes': peak_memory(short_run),
+    }
+    return result, (list(solver.convergence_curve), timestamps)
+
+
+def run_benchmark_suite(config):
+    """
+    Chạy toàn bộ benchmark trên lưới kích thước trong mục 'benchmark' của config.
+
+    Returns:
+        dict kết quả (có thể ghi ra JSON)
+    """
+    bench_cfg = config['benchmark']
+    seed = int(bench_cfg.get('seed', 0))
+    repeats = int(bench_cfg.get('repeats', 5))
+    cycles = int(bench_cfg.get('cycles', 20))
+    engines = list(bench_cfg.get('engines', ['loop', 'batched']))
+    target_fraction = float(bench_cfg.get('target_fraction', 0.9))
+    eval_workers = [int(n) for n in bench_cfg.get('eval_workers') or []]
+
+    points = []
+    for size in bench_cfg['grid']:
+        M, K, N, pop_size = (int(size[key]) for key in ('M', 'K', 'N', 'pop_size'))
+        name = f"M{M}_K{K}_N{N}_SN{pop_size}"
+        print(f"[benchmark] {name}")
+        point_config, H, metrics = make_problem(config, M, K, N, pop_size, seed)
+
+        kernels = benchmark_kernels(point_config, H, metrics, repeats)
+        solves, traces = [], []
+        for engine in engines:
+            result, trace = benchmark_solve(point_config, H, metrics, engine, cycles, seed)
+            solves.append(result)
+            traces.append(trace)
+            print(f"    solve[{engine}]: {result['seconds_per_cycle']*1e3:.2f} ms/cycle, "
+                  f"{result['evals_per_second']:.0f} evals/s")
+        for n in eval_workers:
+            result, trace = benchmark_solve(point_config, H, metrics, 'batched', cycles, seed, eval_workers=n)
+            solves.append(result)
+            traces.append(trace)
+            print(f"    solve[batched, {n} process đánh giá]: {result['seconds_per_cycle']*1e3:.2f} ms/cycle, "
+                  f"{result['evals_per_second']:.0f} evals/s")
+
+        # Không cấu hình target => lấy tỉ lệ target_fraction kết quả của engine đầu tiên
+        target_rate = bench_cfg.get('target_rate')
+        if target_rate is None:
+            target_rate = target_fraction * solves[0]['final_rate']
+        for result, (curve, timestamps) in zip(solves, traces):
+            result['target_rate'] = float(target_rate)
+            result['time_to_target'] = time_to_target(curve, timestamps, target_rate)
+
+        points.append({'name': name, 'M': M, 'K': K, 'N': N, 'pop_size': pop_size,
+                       'kernels': kernels, 'solve': solves})
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'seed': seed,
+        'points': points,
+    }
+
+
+def precision_deviation(config, H, metrics, n_solutions, seed):
+    """
+    Độ lệch Sum Rate khi đánh giá cùng một lô giải pháp ngẫu nhiên bằng
+    complex64 (precision: single) so với complex128.
+    """
+    config_single = copy.deepcopy(config)
+    config_single['algorithm']['precision'] = 'single'
+    config_double = copy.deepcopy(config)
+    config_double['algorithm']['precision'] = 'double'
+
+    np.random.seed(seed)
+    shape = (n_solutions,) + H.shape
+    W = enforce_power_constraint(np.random.randn(*shape) + 1j * np.random.randn(*shape),
+                                 float(config['system']['p_max_dbm']))
+    rate_double, _ = metrics.calculate_sum_rate_batch(W, ChannelContext(H, config_double))
+    rate_single, _ = metrics.calculate_sum_rate_batch(W.astype(np.complex64), ChannelContext(H, config_single))
+    deviation = np.abs(rate_single.astype(np.float64) - rate_double)
+    return {
+        'n_solutions': n_solutions,
+        'max_abs_deviation': float(np.max(deviation)),
+        'mean_abs_deviation': float(np.mean(deviation)),
+        'max_rel_deviation': float(np.max(deviation / rate_double)),
+    }
+
+
+def run_precision_check(config, n_solutions=1000):
+    """
+    Với mỗi điểm trên lưới benchmark: độ lệch Sum Rate single/double trên
+    cùng lô giải pháp, và kết quả + tốc độ solve() ở mỗi precision.
+    """
+    bench_cfg = config['benchmark']
+    seed = int(bench_cfg.get('seed', 0))
+    cycles = int(bench_cfg.get('cycles', 20))
+    engines = list(bench_cfg.get('engines', ['loop', 'batched']))
+
+    points = []
+    for size in bench_cfg['grid']:
+        M, K, N, pop_size = (int(size[key]) for key in ('M', 'K', 'N', 'pop_size'))
+        name = f"M{M}_K{K}_N{N}_SN{pop_size}"
+        print(f"[precision] {name}")
+        point_config, H, metrics = make_problem(config, M, K, N, pop_size, seed)
+
+        deviation = precision_deviation(point_config, H, metrics, n_solutions, seed)
+        print(f"    Sum Rate single - double: max {deviation['max_abs_deviation']:.3g} bps/Hz "
+              f"(tương đối {deviation['max_rel_deviation']:.3g})")
+        solves = []
+        for engine in engines:
+            for precision in ('double', 'single'):
+                precision_config = copy.deepcopy(point_config)
+                precision_config['algorithm']['precision'] = precision
+                result, _ = benchmark_solve(precision_config, H, metrics, engine, cycles, seed)
+                result['precision'] = precision
+                solves.append(result)
+                print(f"    solve[{engine}, {precision}]: {result['final_rate']:.4f} bps/Hz, "
+                      f"{result['seconds_per_cycle']*1e3:.2f} ms/cycle, quần thể {result['population_bytes']/1e6:.2f} MB")
+        points.append({'name': name, 'M': M, 'K': K, 'N': N, 'pop_size': pop_size,
+                       'deviation': deviation, 'solve': solves})
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'seed': seed,
+        'points': points,
+    }
+
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+
+def flatten_metrics(results):
+    """{(điểm, nhóm, chỉ số): giá trị} cho các chỉ số thời gian/thông lượng/bộ nhớ"""
+    flat = {}
+    for point in results['points']:
+        for kernel, values in point['kernels'].items():
+            for metric, value in values.items():
+                flat[(point['name'], kernel, metric)] = value
+        for solve in point['solve']:
+            # Kết quả cũ (trước khi có eval_workers) chỉ có đánh giá trong process chính
+            group = f"solve[{solve['engine']}]" if (solve.get('eval_workers') or 0) <= 1 \
+                else f"solve[{solve['engine']}, eval_workers={solve['eval_workers']}]"
+            for metric in ('seconds_per_cycle', 'evals_per_second', 'time_to_target', 'peak_memory_bytes'):
+                flat[(point['name'], group, metric)] = solve[metric]
+    return flat
+
+
+def compare_results(old, new, threshold=0.1):
+    """
+    So sánh 2 file kết quả. Chỉ số "càng lớn càng tốt" (*_per_second) và
+    "càng nhỏ càng tốt" (thời gian, bộ nhớ) được quy về cùng chiều.
+
+    Returns:
+        list các dòng (điểm, nhóm, chỉ số, cũ, mới, tỉ lệ cải thiện, hồi quy?)
+    """
+    old_flat, new_flat = flatten_metrics(old), flatten_metrics(new)
+    rows = []
+    for key in sorted(old_flat.keys() & new_flat.keys()):
+        before, after = old_flat[key], new_flat[key]
+        if not isinstance(before, (int, float)) or not isinstance(after, (int, float)):
+            continue
+        if key[2] == 'batch_size' or before == 0 or after == 0:
+            continue
+        higher_is_better = key[2].endswith('_per_second')
+        speedup = after / before if higher_is_better else before / after
+        rows.append((*key, before, after, speedup, speedup < 1 - threshold))
+    return rows
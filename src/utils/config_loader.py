@@ -0,0 +1,281 @@
+import copy
+import json
+import hashlib
+import numbers
+import yaml
+
+# ----------------------------------------------------------------------
+# Các hàm kiểm tra giá trị: trả về thông báo lỗi (str) hoặc None nếu hợp lệ
+# ----------------------------------------------------------------------
+def is_int(value):
+    return isinstance(value, numbers.Integral) and not isinstance(value, bool)
+
+
+def as_number(value):
+    """
+    Giá trị số của value, hoặc None. PyYAML đọc ký hiệu khoa học không có
+    dấu chấm (vd. 20e6) thành chuỗi, mã nguồn luôn float() lại nên chấp nhận.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, numbers.Real):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def integer(minimum=None):
+    def check(value):
+        if not is_int(value):
+            return "phải là số nguyên"
+        if minimum is not None and value < minimum:
+            return f"phải >= {minimum}"
+        return None
+    return check
+
+
+def number(minimum=None, maximum=None, exclusive_minimum=False):
+    def check(value):
+        value = as_number(value)
+        if value is None:
+            return "phải là số"
+        if minimum is not None and (value <= minimum if exclusive_minimum else value < minimum):
+            return f"phải {'>' if exclusive_minimum else '>='} {minimum}"
+        if maximum is not None and value > maximum:
+            return f"phải <= {maximum}"
+        return None
+    return check
+
+
+def boolean(value):
+    return None if isinstance(value, bool) else "phải là true/false"
+
+
+def string(value):
+    return None if isinstance(value, str) else "phải là chuỗi"
+
+
+def choice(*options):
+    def check(value):
+        return None if value in options else f"phải là một trong {options}"
+    return check
+
+
+def optional(check):
+    """Cho phép null (= tắt tính năng)"""
+    def wrapped(value):
+        return None if value is None else check(value)
+    return wrapped
+
+
+def list_of(check):
+    def wrapped(value):
+        if not isinstance(value, list):
+            return "phải là danh sách"
+        for item in value:
+            error = check(item)
+            if error is not None:
+                return f"phần tử {item!r} {error}"
+        return None
+    return wrapped
+
+
+def any_value(value):
+    return None
+
+
+# Lược đồ config: mục -> khóa -> hàm kiểm tra. Khóa trong REQUIRED bắt buộc có;
+# khóa lạ trong các mục đã biết bị coi là lỗi (thường do gõ nhầm tên).
+SCHEMA = {
+    'system': {
+        'M': integer(1), 'K': integer(1), 'N': integer(1),
+        'bandwidth': number(0, exclusive_minimum=True),
+        'noise_power_dbm': number(), 'p_max_dbm': number(),
+        'area_size': number(0, exclusive_minimum=True),
+        'channel_model': choice('rayleigh', 'pathloss', 'geometric'),
+        'ap_height': number(0), 'pathloss_intercept_db': number(),
+        'pathloss_exponent': number(0), 'shadowing_std_db': number(0),
+        'user_centric': boolean, 'cluster_size': integer(1),
+    },
+    'algorithm': {
+        'pop_size': integer(2), 'max_cycle': integer(1), 'limit': integer(0), 'psi': number(0),
+        'engine': choice('loop', 'batched', 'coordinate'),
+        'coordinate_unit': choice('element', 'ap'),
+        'cache_refresh': integer(1),
+        'precision': choice('double', 'single'),
+        'seed_precoders': optional(list_of(choice('mrt', 'zf', 'rzf', 'wmmse'))),
+        'seed_fraction': number(0, 1), 'seed_noise': number(0), 'scout_seed_prob': number(0, 1),
+        'wmmse_iterations': integer(0),
+        'memetic_interval': integer(0), 'memetic_elites': integer(1), 'memetic_steps': integer(0),
+        'memetic_step_size': number(0, exclusive_minimum=True), 'memetic_final_steps': integer(0),
+        'eval_workers': optional(integer(0)), 'eval_min_batch': integer(1),
+        'stall_window': optional(integer(1)), 'stall_tol': number(0),
+        'target_rate': optional(number()), 'max_evaluations': optional(integer(1)),
+        'time_limit': optional(number(0, exclusive_minimum=True)),
+        'checkpoint_interval': optional(integer(0)),
+        'log_interval': integer(0), 'instrument': boolean,
+    },
+    'tracking': {
+        'doppler_hz': number(0), 'slot_duration': number(0, exclusive_minimum=True),
+        'n_slots': integer(1), 'cycles_per_slot': integer(1),
+    },
+    'island': {
+        'n_islands': integer(1), 'migration_interval': optional(integer(1)), 'n_migrants': integer(0),
+        'topology': choice('ring', 'full'), 'psi_values': optional(list_of(number(0))),
+        'parallel': boolean,
+    },
+    'distributed': {
+        'n_clusters': optional(integer(1)), 'rounds': integer(1), 'local_cycles': integer(1),
+        'transport': choice('local', 'process'),
+    },
+    'sensing': {
+        'enabled': boolean, 'target_angles_deg': list_of(number(-90, 90)),
+        'objective': choice('weighted', 'constrained'),
+        'weight': number(0), 'min_gain': number(0, 1), 'penalty': number(0),
+    },
+    'service': {
+        'host': string, 'port': integer(0),
+        'deadline_ms': number(0, exclusive_minimum=True), 'deadline_margin_ms': number(0),
+        'max_cycles': integer(0),
+        'warm_start': boolean, 'n_workers': integer(1), 'latency_window': integer(1),
+        'replay_cells': integer(1), 'replay_slots': integer(1),
+        'replay_interval_ms': number(0, exclusive_minimum=True),
+    },
+    'live': {
+        'fps': number(0, exclusive_minimum=True),
+    },
+    'benchmark': {
+        'seed': integer(0), 'repeats': integer(1), 'cycles': integer(1),
+        'engines': list_of(choice('loop', 'batched', 'coordinate')),
+        'eval_workers': optional(list_of(integer(2))),
+        'target_rate': optional(number()), 'target_fraction': number(0, 1), 'grid': list_of(any_value),
+    },
+    'sweep': {
+        'axes': any_value, 'seed': optional(integer(0)), 'n_workers': optional(integer(0)),
+        'cache_dir': string, 'output': optional(string),
+    },
+    'simulation': {
+        'n_realizations': integer(1), 'n_workers': optional(integer(0)), 'seed': optional(integer(0)),
+        'mode': choice('tasks', 'multi_instance'), 'instance_batch': optional(integer(0)),
+        'channel_dataset': optional(string), 'results_dir': optional(string),
+        'adaptive': boolean, 'ci_level': number(0, 1, exclusive_minimum=True),
+        'ci_width': number(0, exclusive_minimum=True), 'min_realizations': integer(2),
+        'rate_hist_max': number(0, exclusive_minimum=True), 'rate_hist_bins': integer(1),
+    },
+}
+
+REQUIRED = {
+    'system': ('M', 'K', 'N', 'bandwidth', 'noise_power_dbm', 'p_max_dbm'),
+    'algorithm': ('pop_size', 'max_cycle', 'limit', 'psi'),
+    'simulation': ('n_realizations',),
+}
+
+# Khóa chỉ ảnh hưởng cách chạy / log, không ảnh hưởng kết quả => không đưa vào hash
+RUNTIME_KEYS = {
+    'algorithm': ('log_interval', 'instrument', 'checkpoint_interval', 'eval_workers', 'eval_min_batch'),
+    'simulation': ('n_workers', 'seed', 'results_dir'),
+}
+# Khóa chỉ quyết định số realization được chạy / cách gộp thống kê, không ảnh hưởng
+# kết quả của từng realization => kho kết quả (chạy tiếp, thêm realization) bỏ qua
+AGGREGATE_KEYS = {
+    'simulation': ('n_realizations', 'adaptive', 'ci_level', 'ci_width', 'min_realizations',
+                   'rate_hist_max', 'rate_hist_bins'),
+}
+# Các mục quyết định kết quả của một lần chạy Monte Carlo
+RESULT_SECTIONS = ('system', 'algorithm', 'simulation')
+# Mục chỉ ảnh hưởng kết quả khi được bật (tắt => hash giữ nguyên như trước khi có mục)
+OPTIONAL_RESULT_SECTIONS = ('sensing',)
+
+
+def validate_config(config):
+    """
+    Kiểm tra config theo SCHEMA, gom mọi lỗi rồi báo một lần.
+
+    Raises:
+        ValueError: Danh sách các khóa thiếu / sai kiểu / ngoài miền / không tồn tại
+    """
+    if not isinstance(config, dict):
+        raise ValueError("Config phải là một mapping YAML")
+    errors = []
+    for section, keys in REQUIRED.items():
+        if not isinstance(config.get(section), dict):
+            errors.append(f"thiếu mục '{section}'")
+            continue
+        errors += [f"thiếu khóa '{section}.{key}'" for key in keys if key not in config[section]]
+
+    for section, checks in SCHEMA.items():
+        values = config.get(section)
+        if values is None:
+            continue
+        if not isinstance(values, dict):
+            errors.append(f"mục '{section}' phải là mapping")
+            continue
+        for key, value in values.items():
+            if key not in checks:
+                errors.append(f"khóa không hợp lệ '{section}.{key}'")
+                continue
+            error = checks[key](value)
+            if error is not None:
+                errors.append(f"'{section}.{key}' = {value!r} {error}")
+
+    system = config.get('system') or {}
+    if system.get('user_centric') and is_int(system.get('cluster_size')) and is_int(system.get('M')) \
+            and system['cluster_size'] > system['M']:
+        errors.append("'system.cluster_size' không được lớn hơn 'system.M'")
+
+    if errors:
+        raise ValueError("Config không hợp lệ:\n  - " + "\n  - ".join(errors))
+    return config
+
+
+def load_config(path='config.yaml'):
+    """Đọc config.yaml (UTF-8, có chú thích tiếng Việt) và kiểm tra hợp lệ"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return validate_config(yaml.safe_load(f))
+
+
+def apply_overrides(config, overrides):
+    """
+    Bản sao config với các giá trị ghi đè theo đường dẫn dạng 'mục.khóa',
+    vd. {'system.M': 32, 'algorithm.psi': 1.0}; kết quả được kiểm tra lại.
+    """
+    config = copy.deepcopy(config)
+    for path, value in overrides.items():
+        section, _, key = path.partition('.')
+        if not key:
+            raise ValueError(f"Đường dẫn ghi đè phải có dạng 'mục.khóa': {path!r}")
+        config.setdefault(section, {})[key] = value
+    return validate_config(config)
+
+
+def result_config(config, per_realization=False):
+    """
+    Phần config quyết định kết quả (bỏ các khóa chỉ ảnh hưởng cách chạy).
+    Định nghĩa duy nhất cho cả khóa cache của sweep (config_hash) và
+    fingerprint của kho kết quả (results_store.config_fingerprint).
+
+    :param per_realization: True => chỉ giữ phần quyết định kết quả của từng
+        realization (bỏ thêm AGGREGATE_KEYS), để kho kết quả chạy tiếp được
+        khi đổi số realization / tiêu chí dừng thích nghi
+    """
+    resolved = {}
+    for section in RESULT_SECTIONS:
+        excluded = RUNTIME_KEYS.get(section, ())
+        if per_realization:
+            excluded += AGGREGATE_KEYS.get(section, ())
+        resolved[section] = {key: value for key, value in (config.get(section) or {}).items()
+                             if key not in excluded}
+    for section in OPTIONAL_RESULT_SECTIONS:
+        if (config.get(section) or {}).get('enabled', False):
+            resolved[section] = dict(config[section])
+    return resolved
+
+
+def config_hash(config, seed=None):
+    """Khóa nội dung (content address) của một điểm: hash của config đã resolve + seed"""
+    payload = json.dumps({'config': result_config(config), 'seed': seed}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
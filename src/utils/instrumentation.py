@@ -0,0 +1,61 @@
+import time
+from contextlib import contextmanager
+
+# Các pha được đo thời gian trong mỗi vòng lặp
+PHASES = ('employed', 'onlooker', 'scout', 'memetic', 'evaluation')
+
+
+class Instrumentation:
+    def __init__(self):
+        """
+        Ghi lại thống kê theo từng vòng lặp của ArtificialBeeColony:
+        thời gian từng pha (Ong thợ, Ong quan sát, Ong trinh sát, tìm kiếm cục
+        bộ memetic, đánh giá fitness), số lần đánh giá, số lần chấp nhận tham lam, số lần reset.
+        Với engine 'coordinate', fitness được cập nhật tăng dần ngay trong
+        từng lần thử nên thời gian đó tính vào thời gian của pha tương ứng.
+
+        Chỉ được gắn vào solver khi bật (algorithm.instrument), nên khi tắt
+        solver không tốn thêm chi phí đo đạc nào.
+        """
+        self.history = []
+        self.phase_times = dict.fromkeys(PHASES, 0.0)
+        self.cycle_start = None
+
+    def start_cycle(self):
+        self.phase_times = dict.fromkeys(PHASES, 0.0)
+        self.cycle_start = time.perf_counter()
+
+    @contextmanager
+    def timer(self, phase):
+        """Cộng dồn thời gian của khối lệnh vào pha phase của vòng lặp hiện tại"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[phase] += time.perf_counter() - start
+
+    def end_cycle(self, stats):
+        """Bổ sung thời gian vào thống kê của vòng lặp và lưu vào lịch sử"""
+        stats['time_cycle'] = time.perf_counter() - self.cycle_start
+        for phase, seconds in self.phase_times.items():
+            stats[f'time_{phase}'] = seconds
+        self.history.append(stats)
+        return stats
+
+    def summary(self):
+        """Tổng hợp toàn bộ lần chạy: tổng thời gian từng pha và tổng các bộ đếm"""
+        keys = ['time_cycle'] + [f'time_{phase}' for phase in PHASES] + \
+               ['n_evaluations', 'n_acceptances', 'n_scout_resets']
+        return {key: sum(stats[key] for stats in self.history) for key in keys}
+
+
+class ProgressPrinter:
+    def __init__(self, interval, max_cycle):
+        """Callback in tiến độ mỗi interval vòng lặp (thay cho print cố định trong solve)"""
+        self.interval = interval
+        self.max_cycle = max_cycle
+
+    def __call__(self, solver, stats):
+        cycle = stats['cycle']
+        if cycle % self.interval == 0:
+            print(f"Cycle {cycle}/{self.max_cycle}: Best Rate = {stats['best_fitness']:.4f} bps/Hz")
@@ -0,0 +1,47 @@
+import threading
+
+
+class LatestValueQueue:
+    def __init__(self):
+        """
+        Hàng đợi dung lượng 1, giá trị mới nhất thắng (latest-value-wins).
+        Bên sản xuất (solver) không bao giờ bị chặn: put() ghi đè snapshot
+        cũ chưa được đọc. Bên tiêu thụ (renderer) luôn nhận trạng thái mới
+        nhất, bỏ qua các snapshot trung gian nếu vẽ chậm hơn tốc độ tối ưu.
+        """
+        self.condition = threading.Condition()
+        self.value = None
+        self.has_value = False
+        self.closed = False
+
+    def put(self, value):
+        with self.condition:
+            self.value = value
+            self.has_value = True
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        """
+        Lấy snapshot mới nhất (và xóa khỏi hàng đợi).
+        Chờ tối đa timeout giây; trả về None nếu không có gì mới.
+        """
+        with self.condition:
+            if not self.has_value and not self.closed:
+                self.condition.wait(timeout)
+            if not self.has_value:
+                return None
+            value = self.value
+            self.value = None
+            self.has_value = False
+            return value
+
+    def close(self):
+        """Báo bên sản xuất đã kết thúc (get() không còn phải chờ)"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def is_finished(self):
+        """True khi đã đóng và snapshot cuối cùng đã được đọc"""
+        with self.condition:
+            return self.closed and not self.has_value
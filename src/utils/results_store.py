@@ -0,0 +1,149 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+from src.utils.config_loader import result_config
+
+FORMAT_VERSION = 1
+
+
+def config_fingerprint(config):
+    """
+    Hash của các tham số ảnh hưởng tới kết quả từng realization, để không trộn
+    kết quả của 2 cấu hình. Khóa nào được tính do config_loader.result_config
+    quyết định (bỏ số worker, số realization, seed, đường dẫn, ...).
+    """
+    payload = json.dumps(result_config(config, per_realization=True), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class ResultsStore:
+    def __init__(self, path):
+        """
+        Kho kết quả Monte Carlo trên đĩa, mỗi realization một file nén:
+            meta.json                 : root entropy, fingerprint config, M, K, N
+            realization_XXXXX.npz     : với mỗi thuật toán: curve, best_fitness,
+                                        best_solution, n_evaluations, stop_reason,
+                                        user_rates
+            checkpoints/              : checkpoint của các solver đang chạy dở
+
+        Mỗi file được ghi xong mới đổi tên, nên sau khi bị ngắt giữa chừng
+        kho chỉ chứa các realization hoàn chỉnh và có thể chạy tiếp.
+
+        :param path: Thư mục của kho (tạo mới nếu chưa có)
+        """
+        self.path = path
+        self.checkpoint_dir = os.path.join(path, 'checkpoints')
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        meta_path = os.path.join(path, 'meta.json')
+        self.meta = None
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                self.meta = json.load(f)
+
+    def bind(self, config, root_entropy, fixed_seed=True):
+        """
+        Gắn kho với một lần chạy. Kho mới => ghi meta; kho cũ => kiểm tra
+        cùng cấu hình và dùng lại root entropy đã lưu.
+
+        :param root_entropy: Entropy gốc của lần chạy hiện tại
+        :param fixed_seed: False nếu root_entropy là ngẫu nhiên (không cố định seed)
+            => chạy tiếp kho cũ bằng entropy của kho thay vì báo lỗi
+        :return: root entropy dùng cho lần chạy
+        """
+        fingerprint = config_fingerprint(config)
+        if self.meta is None:
+            self.meta = {
+                'format_version': FORMAT_VERSION,
+                'root_entropy': str(root_entropy),
+                'config_fingerprint': fingerprint,
+                'M': int(config['system']['M']),
+                'K': int(config['system']['K']),
+                'N': int(config['system']['N']),
+            }
+            self.write_file('meta.json', lambda f: f.write(
+                json.dumps(self.meta, indent=2, ensure_ascii=False).encode('utf-8')))
+            return root_entropy
+
+        if self.meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Phiên bản định dạng không hỗ trợ: {self.meta.get('format_version')}")
+        if self.meta['config_fingerprint'] != fingerprint:
+            raise ValueError(f"Kho kết quả {self.path} được tạo với cấu hình khác "
+                             f"({self.meta['config_fingerprint']} != {fingerprint})")
+        stored_entropy = int(self.meta['root_entropy'])
+        if fixed_seed and int(root_entropy) != stored_entropy:
+            raise ValueError(f"Kho kết quả {self.path} được tạo với seed khác")
+        return stored_entropy
+
+    def write_file(self, name, write):
+        """Ghi file qua file tạm + os.replace (nguyên tử)"""
+        path = os.path.join(self.path, name)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def realization_name(realization):
+        return f'realization_{realization:05d}.npz'
+
+    def checkpoint_path(self, realization, algorithm):
+        return os.path.join(self.checkpoint_dir, f'realization_{realization:05d}_{algorithm}.npz')
+
+    def save_realization(self, realization, results):
+        """
+        :param results: dict {tên thuật toán: dict kết quả của run_realization_task}
+        """
+        arrays = {}
+        for name, result in results.items():
+            arrays[f'{name}/curve'] = np.asarray(result['curve'], dtype=float)
+            arrays[f'{name}/best_fitness'] = np.float64(result['best_fitness'])
+            arrays[f'{name}/best_solution'] = np.asarray(result['best_solution'])
+            arrays[f'{name}/n_evaluations'] = np.int64(result['n_evaluations'])
+            arrays[f'{name}/stop_reason'] = np.array(result['stop_reason'])
+            if result.get('user_rates') is not None:
+                arrays[f'{name}/user_rates'] = np.asarray(result['user_rates'], dtype=float)
+        self.write_file(self.realization_name(realization), lambda f: np.savez_compressed(f, **arrays))
+
+    def load_realization(self, realization):
+        """Đọc lại đúng dạng dict đã truyền vào save_realization"""
+        results = {}
+        with np.load(os.path.join(self.path, self.realization_name(realization))) as data:
+            for key in data.files:
+                name, field = key.split('/')
+                value = data[key]
+                results.setdefault(name, {'realization': realization, 'algorithm': name})[field] = \
+                    value.item() if value.ndim == 0 else value
+        return results
+
+    def completed(self):
+        """Tập chỉ số realization đã có kết quả hoàn chỉnh"""
+        return {int(name[len('realization_'):-len('.npz')]) for name in os.listdir(self.path)
+                if name.startswith('realization_') and name.endswith('.npz')}
+
+    def load_curves(self):
+        """
+        Returns:
+            realizations: Các chỉ số realization đã lưu (đã sắp xếp)
+            curves: dict {tên thuật toán: list đường hội tụ theo realization}
+        """
+        realizations = sorted(self.completed())
+        curves = {}
+        for realization in realizations:
+            for name, result in self.load_realization(realization).items():
+                curves.setdefault(name, []).append(result['curve'])
+        return realizations, curves
+
+    def average_curves(self, length):
+        """
+        Đường hội tụ trung bình của từng thuật toán trên các realization đã lưu
+        (đường dừng sớm được kéo dài bằng giá trị cuối tới length vòng lặp).
+        """
+        _, curves = self.load_curves()
+        averages = {}
+        for name, name_curves in curves.items():
+            padded = [np.concatenate([curve[:length], np.full(max(0, length - len(curve)), curve[-1])])
+                      for curve in name_curves]
+            averages[name] = np.mean(padded, axis=0)
+        return averages
@@ -0,0 +1,159 @@
+import collections
+import numpy as np
+from scipy import stats
+
+
+class RunningStats:
+    def __init__(self, shape=()):
+        """
+        Trung bình và phương sai trực tuyến (thuật toán Welford) cho các mẫu
+        có kích thước shape, vd. () cho Sum Rate cuối hoặc (max_cycle,) cho
+        cả đường hội tụ. Bộ nhớ không đổi theo số mẫu.
+        """
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape) # Tổng bình phương độ lệch so với trung bình
+
+    def update(self, value):
+        self.count += 1
+        delta = np.asarray(value, dtype=float) - self.mean
+        self.mean = self.mean + delta / self.count
+        self.m2 = self.m2 + delta * (np.asarray(value, dtype=float) - self.mean)
+
+    @property
+    def variance(self):
+        """Phương sai mẫu (ddof = 1); nan khi chưa đủ 2 mẫu"""
+        if self.count < 2:
+            return np.full(np.shape(self.mean), np.nan)
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def confidence_interval(self, level=0.95):
+        """
+        Khoảng tin cậy Student-t của trung bình: (thấp, cao).
+        Khi chưa đủ 2 mẫu, khoảng là (-inf, inf).
+        """
+        if self.count < 2:
+            return np.full(np.shape(self.mean), -np.inf), np.full(np.shape(self.mean), np.inf)
+        half_width = stats.t.ppf((1 + level) / 2, self.count - 1) * self.std / np.sqrt(self.count)
+        return self.mean - half_width, self.mean + half_width
+
+
+class StreamingHistogram:
+    def __init__(self, low, high, n_bins):
+        """
+        Histogram có lưới cố định [low, high) để ước lượng CDF / phân vị của
+        một luồng giá trị với bộ nhớ không đổi. Giá trị ngoài lưới được đếm
+        riêng (dưới / trên); min và max thực tế được giữ lại để phân vị ở
+        hai đầu không vượt quá dữ liệu.
+        """
+        if not high > low or n_bins < 1:
+            raise ValueError(f"Lưới histogram không hợp lệ: [{low}, {high}), {n_bins} bin")
+        self.edges = np.linspace(low, high, n_bins + 1)
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def total(self):
+        return int(self.counts.sum()) + self.underflow + self.overflow
+
+    def update(self, values):
+        values = np.ravel(np.asarray(values, dtype=float))
+        if len(values) == 0:
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.underflow += int(np.sum(values < self.edges[0]))
+        self.overflow += int(np.sum(values >= self.edges[-1]))
+        inside = values[(values >= self.edges[0]) & (values < self.edges[-1])]
+        self.counts += np.histogram(inside, bins=self.edges)[0]
+
+    def cdf_points(self):
+        """(x, F(x)) tại các mép bin, nội suy tuyến tính trong từng bin"""
+        total = max(self.total, 1)
+        cumulative = self.underflow + np.concatenate([[0], np.cumsum(self.counts)])
+        return self.edges, cumulative / total
+
+    def cdf(self, x):
+        """Ước lượng P(X <= x)"""
+        edges, F = self.cdf_points()
+        return np.interp(x, edges, F, left=0.0, right=1.0)
+
+    def quantile(self, q):
+        """Ước lượng phân vị q trong [0, 1], giới hạn trong [min, max] đã thấy"""
+        if self.total == 0:
+            return np.full(np.shape(q), np.nan)
+        edges, F = self.cdf_points()
+        # Bin rỗng => F đi ngang; chỉ giữ mép cuối của mỗi đoạn ngang để trục F
+        # tăng ngặt (np.interp) và khối lượng nằm đúng trong bin có dữ liệu
+        keep = np.append(np.diff(F) > 0, True)
+        value = np.interp(q, F[keep], edges[keep])
+        return np.clip(value, self.min, self.max)
+
+
+class MonteCarloStatistics:
+    def __init__(self, algorithms, curve_length, rate_range=(0.0, 40.0), n_bins=400):
+        """
+        Bộ gộp thống kê Monte Carlo dạng luồng, bộ nhớ không đổi theo số realization:
+        - đường hội tụ: trung bình + độ lệch chuẩn theo từng vòng lặp
+        - Sum Rate cuối và số lần đánh giá của từng thuật toán
+        - chênh lệch theo cặp G-ABC - ABC trên cùng kênh (cho khoảng tin cậy)
+        - histogram rate của từng user (CDF / phân vị)
+        - số lần của từng lý do dừng
+
+        :param algorithms: Tên các thuật toán (thứ tự cố định)
+        :param curve_length: Độ dài đường hội tụ sau khi pad
+        :param rate_range: Lưới histogram rate từng user (bps/Hz)
+        :param n_bins: Số bin của histogram
+        """
+        self.algorithms = list(algorithms)
+        self.curves = {name: RunningStats((curve_length,)) for name in self.algorithms}
+        self.final = {name: RunningStats() for name in self.algorithms}
+        self.evaluations = {name: RunningStats() for name in self.algorithms}
+        self.user_rates = {name: StreamingHistogram(*rate_range, n_bins) for name in self.algorithms}
+        self.stop_reasons = {name: collections.Counter() for name in self.algorithms}
+        self.gap = RunningStats()
+
+    @property
+    def count(self):
+        return self.gap.count
+
+    def update(self, results, curves):
+        """
+        :param results: dict {tên thuật toán: kết quả của một realization}
+        :param curves: dict {tên thuật toán: đường hội tụ đã pad}
+        """
+        for name in self.algorithms:
+            result = results[name]
+            self.curves[name].update(curves[name])
+            self.final[name].update(result['best_fitness'])
+            self.evaluations[name].update(result['n_evaluations'])
+            self.stop_reasons[name][str(result['stop_reason'])] += 1
+            # Kho kết quả cũ (trước khi lưu rate từng user) không có trường này
+            if result.get('user_rates') is not None:
+                self.user_rates[name].update(result['user_rates'])
+        first, last = self.algorithms[0], self.algorithms[-1]
+        self.gap.update(results[last]['best_fitness'] - results[first]['best_fitness'])
+
+    def gap_interval(self, level=0.95):
+        """Khoảng tin cậy của chênh lệch trung bình (thuật toán cuối - thuật toán đầu)"""
+        return self.gap.confidence_interval(level)
+
+    def summary(self, level=0.95, quantiles=(0.05, 0.5, 0.95)):
+        """dict tóm tắt để in / lưu (số thực Python)"""
+        low, high = self.gap_interval(level)
+        summary = {'n_realizations': self.count, 'gap_mean': float(self.gap.mean),
+                   'gap_ci_low': float(low), 'gap_ci_high': float(high)}
+        for name in self.algorithms:
+            summary[f'{name}_mean'] = float(self.final[name].mean)
+            summary[f'{name}_std'] = float(self.final[name].std)
+            summary[f'{name}_evaluations'] = float(self.evaluations[name].mean)
+            for q, value in zip(quantiles, self.user_rates[name].quantile(np.array(quantiles))):
+                summary[f'{name}_user_rate_p{round(q * 100)}'] = float(value)
+        return summary
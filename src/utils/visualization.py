@@ -1,6 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+from src.system_model.sensing import steering_matrix
 
 def plot_convergence(curve1, curve2):
     """Vẽ so sánh tốc độ hội tụ"""
@@ -21,11 +22,19 @@ def plot_convergence(curve1, curve2):
     print(f"\n[1/2] Đã lưu biểu đồ hội tụ tại: {save_path}")
     # plt.show() # Bỏ comment nếu muốn hiện cửa sổ
 
-def plot_beampattern(W, N, save_name="beampattern.png"):
+def beampattern(w, A):
+    """
+    Độ lợi |w^H a(theta)|^2 trên toàn bộ lưới góc bằng một phép nhân ma trận.
+    w: (N,) hoặc (K, N) cho nhiều beam; A: ma trận dẫn hướng (T, N).
+    """
+    return np.abs(A @ np.conj(w).T)**2
+
+def plot_beampattern(W, N, save_name="beampattern.png", target_angles_deg=None):
     """
     Vẽ hình dạng búp sóng (Beam Pattern) của AP đầu tiên.
     W: Ma trận Beamforming tốt nhất (M, K, N)
     N: Số lượng anten
+    target_angles_deg: Hướng các mục tiêu cảm biến cần đánh dấu (None = không vẽ)
     """
     M, K, _ = W.shape
     
@@ -35,26 +44,59 @@ def plot_beampattern(W, N, save_name="beampattern.png"):
     plt.figure(figsize=(10, 8))
     ax = plt.subplot(111, projection='polar')
     
-    # Vẽ pattern cho từng User (tại AP đầu tiên m=0)
+    # Tính Array Factor: Gain(theta) = |w^H * a(theta)|^2 cho mọi User
+    # (tại AP đầu tiên m=0) bằng một phép nhân với ma trận dẫn hướng
+    A = steering_matrix(N, theta)
+    patterns = beampattern(W[0], A) # (360, K)
+    
+    # Vẽ pattern cho từng User
     for k in range(K):
-        w_k = W[0, k, :] # Vector beamforming của AP 0 dành cho User k
-        
-        # Tính Array Factor: Gain(theta) = |w^H * a(theta)|
-        pattern = []
-        for ang in theta:
-            # Vector dẫn hướng (Steering vector) cho mảng anten thẳng (ULA)
-            # Giả sử khoảng cách d = lambda/2 -> phase shift = pi * sin(theta)
-            a_theta = np.exp(-1j * np.pi * np.arange(N) * np.sin(ang))
-            
-            # Tính độ lợi
-            gain = np.abs(np.vdot(w_k, a_theta))**2
-            pattern.append(gain)
-            
-        ax.plot(theta, pattern, label=f'Beam to User {k+1}', linewidth=2)
+        ax.plot(theta, patterns[:, k], label=f'Beam to User {k+1}', linewidth=2)
+    for t, angle in enumerate(target_angles_deg or []):
+        ax.axvline(np.deg2rad(angle), color='k', linestyle='--', linewidth=1,
+                   label='Sensing target' if t == 0 else None)
 
     plt.title(f"Visualizing Beam Pattern at AP #1 (N={N})", y=1.08, fontsize=14)
     plt.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1))
     
     save_path = f'results/figures/{save_name}'
     plt.savefig(save_path, dpi=300, bbox_inches='tight')
-    print(f"[2/2] Đã lưu biểu đồ búp sóng tại: {save_path}")
\ No newline at end of file
+    print(f"[2/2] Đã lưu biểu đồ búp sóng tại: {save_path}")
+
+def plot_tracking(tracked_rates, cold_rates, save_name="channel_tracking.png"):
+    """Vẽ Sum Rate theo từng slot: theo dõi kênh (warm start) vs giải lại từ đầu"""
+    plt.figure(figsize=(10, 6))
+    slots = np.arange(1, len(tracked_rates) + 1)
+    plt.plot(slots, tracked_rates, 'r-s', markevery=5, label='G-ABC Tracking (warm start)', linewidth=2)
+    plt.plot(slots, cold_rates, 'b--o', markevery=5, label='G-ABC Cold start', linewidth=2)
+    
+    plt.title('Channel Tracking: Warm start vs Cold start', fontsize=14)
+    plt.xlabel('Slot', fontsize=12)
+    plt.ylabel('Sum Rate (bps/Hz)', fontsize=12)
+    plt.legend(fontsize=12)
+    plt.grid(True, linestyle='--', alpha=0.7)
+    
+    os.makedirs('results/figures', exist_ok=True)
+    save_path = f'results/figures/{save_name}'
+    plt.savefig(save_path, dpi=300)
+    print(f"Đã lưu biểu đồ theo dõi kênh tại: {save_path}")
+
+def plot_island_convergence(island_curves, psi_values, single_curve=None, save_name="island_convergence.png"):
+    """Vẽ đường hội tụ của từng đảo, đường tốt nhất toàn cục và (tùy chọn) 1 quần thể lớn"""
+    plt.figure(figsize=(10, 6))
+    for i, (curve, psi) in enumerate(zip(island_curves, psi_values)):
+        plt.plot(curve, linewidth=1, alpha=0.6, label=f'Đảo {i} (psi = {psi})')
+    plt.plot(np.max(island_curves, axis=0), 'r-', linewidth=2.5, label='Island model (best)')
+    if single_curve is not None:
+        plt.plot(single_curve, 'k--', linewidth=2, label='1 quần thể (cùng tổng SN)')
+    
+    plt.title('Island-model G-ABC: Convergence per Island', fontsize=14)
+    plt.xlabel('Iterations (Cycles)', fontsize=12)
+    plt.ylabel('Sum Rate (bps/Hz)', fontsize=12)
+    plt.legend(fontsize=10)
+    plt.grid(True, linestyle='--', alpha=0.7)
+    
+    os.makedirs('results/figures', exist_ok=True)
+    save_path = f'results/figures/{save_name}'
+    plt.savefig(save_path, dpi=300)
+    print(f"Đã lưu biểu đồ hội tụ mô hình đảo tại: {save_path}")
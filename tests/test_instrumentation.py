@@ -0,0 +1,37 @@
+import os
+import copy
+import numpy as np
+
+from src.utils.config_loader import load_config
+from src.utils.instrumentation import PHASES
+from src.system_model.channel import ChannelModel
+from src.system_model.metrics import SystemMetrics
+from src.algorithms.abc_variants import GbestABC
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.yaml')
+
+
+def small_config():
+    config = copy.deepcopy(load_config(CONFIG_PATH))
+    config['system'].update(M=4, K=2, N=2)
+    config['algorithm'].update(pop_size=6, max_cycle=4, log_interval=0, engine='batched')
+    return config
+
+
+def test_instrumented_solver_with_memetic_refinement():
+    config = small_config()
+    config['algorithm'].update(instrument=True, memetic_interval=2, memetic_elites=2, memetic_steps=2)
+    np.random.seed(0)
+    H = ChannelModel(4, 2, 2).generate_rayleigh_channel()
+    solver = GbestABC(config, H, SystemMetrics(config))
+    solver.solve()
+
+    assert 'memetic' in PHASES
+    history = solver.instrumentation.history
+    assert len(history) == config['algorithm']['max_cycle']
+    # Vòng 2 và 4 chạy tìm kiếm cục bộ, vòng 1 và 3 thì không
+    assert [stats['time_memetic'] > 0 for stats in history] == [False, True, False, True]
+    assert solver.n_gradient_evaluations > 0
+    summary = solver.instrumentation.summary()
+    assert summary['time_memetic'] > 0
+    assert summary['n_evaluations'] == solver.n_evaluations - config['algorithm']['pop_size']
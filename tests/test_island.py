@@ -0,0 +1,58 @@
+import os
+import copy
+import numpy as np
+
+from src.utils.config_loader import load_config
+from src.system_model.channel import ChannelModel
+from src.system_model.metrics import SystemMetrics
+from src.algorithms.abc_variants import GbestABC
+from src.algorithms.island import IslandModelGABC
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.yaml')
+
+
+def small_config(pop_size=4):
+    config = copy.deepcopy(load_config(CONFIG_PATH))
+    config['system'].update(M=4, K=2, N=2)
+    config['algorithm'].update(pop_size=pop_size, max_cycle=6, log_interval=0, engine='batched')
+    config['island'].update(n_islands=4, migration_interval=2, n_migrants=2, topology='full',
+                            psi_values=[0.5, 1.5])
+    return config
+
+
+def make_channel(seed=0):
+    np.random.seed(seed)
+    return ChannelModel(4, 2, 2).generate_rayleigh_channel()
+
+
+def test_inject_more_solutions_than_population():
+    config = small_config()
+    H = make_channel()
+    solver = GbestABC(config, H, SystemMetrics(config))
+    solver.initialize_population()
+    migrants = solver.scout_solutions(6)
+    fitness = solver.evaluate_batch(migrants) + 100.0 # Tốt hơn mọi nguồn hiện có
+
+    assert solver.inject_solutions(migrants, fitness) == config['algorithm']['pop_size']
+    # Chỉ pop_size giải pháp tốt nhất được nhận
+    best = np.sort(fitness)[::-1][:config['algorithm']['pop_size']]
+    assert np.array_equal(np.sort(solver.fitness)[::-1], best)
+    assert solver.best_fitness == fitness.max()
+
+
+def test_full_topology_migrants_outnumber_population():
+    config = small_config()
+    H = make_channel()
+    config['island']['parallel'] = False
+    serial = IslandModelGABC(config, H, seed=11)
+    serial_fit, serial_curve = serial.solve()
+
+    config['island']['parallel'] = True
+    parallel = IslandModelGABC(config, H, seed=11)
+    parallel_fit, parallel_curve = parallel.solve()
+
+    # 3 đảo nguồn x 2 di dân = 6 > pop_size = 4 mà vẫn chạy được, và cho cùng kết quả
+    assert serial_fit == parallel_fit
+    assert np.array_equal(serial_curve, parallel_curve)
+    assert np.array_equal(serial.island_curves, parallel.island_curves)
+    assert np.all(np.diff(serial_curve) >= 0)
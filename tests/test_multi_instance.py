@@ -0,0 +1,71 @@
+import os
+import copy
+import numpy as np
+import pytest
+
+from src.utils.config_loader import load_config
+from src.system_model.channel import ChannelModel
+from src.system_model.metrics import SystemMetrics
+from src.algorithms.multi_instance import MultiInstanceABC
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.yaml')
+
+
+def small_config():
+    config = copy.deepcopy(load_config(CONFIG_PATH))
+    config['system'].update(M=4, K=2, N=2)
+    config['algorithm'].update(pop_size=4, max_cycle=3, log_interval=0)
+    return config
+
+
+def make_channels(n_instances=2, seed=0):
+    np.random.seed(seed)
+    channel_model = ChannelModel(4, 2, 2)
+    return np.stack([channel_model.generate_rayleigh_channel() for _ in range(n_instances)])
+
+
+def test_default_config_solves():
+    config = small_config()
+    solver = MultiInstanceABC(config, make_channels(), SystemMetrics(config))
+    best_fitness, _ = solver.solve()
+    assert np.all(np.isfinite(best_fitness))
+
+
+@pytest.mark.parametrize('key, value', [
+    ('engine', 'coordinate'),
+    ('seed_precoders', ['rzf']),
+    ('scout_seed_prob', 0.5),
+    ('memetic_interval', 2),
+    ('memetic_final_steps', 5),
+    ('stall_window', 10),
+    ('target_rate', 5.0),
+    ('max_evaluations', 100),
+    ('time_limit', 1.0),
+])
+def test_unsupported_options_rejected(key, value):
+    config = small_config()
+    config['algorithm'][key] = value
+    with pytest.raises(ValueError, match=f"algorithm.{key}"):
+        MultiInstanceABC(config, make_channels(), SystemMetrics(config))
+
+
+@pytest.mark.parametrize('generator', ['rayleigh', 'pathloss', 'geometric'])
+def test_batch_generator_matches_single_realization(generator):
+    config = small_config()
+    config['system']['channel_model'] = generator
+    channel_model = ChannelModel(4, 2, 2)
+
+    np.random.seed(1)
+    H_batch, beta_batch = channel_model.generate_batch_from_config(config, 3)
+    assert H_batch.shape == (3, 4, 2, 2)
+    assert (beta_batch is None) == (generator == 'rayleigh')
+
+    # Một realization = lô kích thước 1, cùng luồng RNG
+    np.random.seed(1)
+    H_single = channel_model.generate_from_config(config)
+    beta_single = channel_model.beta
+    np.random.seed(1)
+    H_one, beta_one = channel_model.generate_batch_from_config(config, 1)
+    assert np.array_equal(H_single, H_one[0])
+    if beta_one is not None:
+        assert np.array_equal(beta_single, beta_one[0])
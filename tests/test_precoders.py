@@ -0,0 +1,29 @@
+import os
+import copy
+import numpy as np
+
+from src.utils.config_loader import load_config
+from src.system_model.channel import ChannelModel
+from src.system_model.metrics import SystemMetrics
+from src.algorithms.precoders import regularized_zf, wmmse
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.yaml')
+
+
+def test_wmmse_per_ap_power_and_improves_on_rzf():
+    config = copy.deepcopy(load_config(CONFIG_PATH))
+    config['system'].update(M=4, K=2, N=2, channel_model='rayleigh')
+    metrics = SystemMetrics(config)
+    p_max_dbm = float(config['system']['p_max_dbm'])
+    p_max_watts = 10**((p_max_dbm - 30) / 10)
+
+    gains = []
+    for seed in range(5):
+        np.random.seed(seed)
+        H = ChannelModel(4, 2, 2).generate_from_config(config)
+        W, rate = wmmse(H, p_max_dbm, metrics.noise_power, metrics, n_iter=20)
+        assert np.all(np.sum(np.abs(W)**2, axis=(1, 2)) <= p_max_watts * (1 + 1e-9))
+        assert np.isclose(rate, metrics.calculate_sum_rate(W, H))
+        gains.append(rate - metrics.calculate_sum_rate(regularized_zf(H, p_max_dbm, metrics.noise_power), H))
+    # Ràng buộc từng AP trong vòng lặp => thực sự cải thiện so với RZF (trước đây trả về chính RZF)
+    assert min(gains) > 1e-3
@@ -0,0 +1,37 @@
+import os
+import copy
+
+from src.utils.config_loader import load_config, config_hash
+from src.utils.results_store import ResultsStore, config_fingerprint
+from src.simulation.monte_carlo import MonteCarloRunner
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.yaml')
+
+
+def small_config(n_realizations, eval_workers):
+    config = copy.deepcopy(load_config(CONFIG_PATH))
+    config['system'].update(M=4, K=2, N=2)
+    config['algorithm'].update(pop_size=8, max_cycle=3, log_interval=0, engine='batched',
+                               eval_workers=eval_workers, eval_min_batch=2)
+    config['simulation'].update(n_realizations=n_realizations, adaptive=False)
+    return config
+
+
+def test_runtime_keys_do_not_change_fingerprint():
+    serial, parallel = small_config(2, 0), small_config(2, 2)
+    parallel['algorithm']['eval_min_batch'] = 16
+    assert config_fingerprint(serial) == config_fingerprint(parallel)
+    assert config_hash(serial, 0) == config_hash(parallel, 0)
+
+
+def test_resume_store_after_changing_eval_workers(tmp_path):
+    path = str(tmp_path / 'store')
+    first = MonteCarloRunner(small_config(2, 0), n_workers=1, seed=7, store=ResultsStore(path))
+    first.run()
+    assert ResultsStore(path).completed() == {0, 1}
+
+    # Cùng kho, đổi số process đánh giá và thêm một realization => chỉ chạy phần còn thiếu
+    resumed = MonteCarloRunner(small_config(3, 2), n_workers=1, seed=7, store=ResultsStore(path))
+    resumed.run()
+    assert resumed.n_completed == 3
+    assert ResultsStore(path).completed() == {0, 1, 2}
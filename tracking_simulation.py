@@ -0,0 +1,18 @@
+import numpy as np
+
+from main import load_config
+from src.simulation.tracking import run_tracking_simulation
+from src.utils.visualization import plot_tracking
+
+def run_tracking():
+    config = load_config()
+    print("--- MÔ PHỎNG THEO DÕI KÊNH BIẾN ĐỔI THEO THỜI GIAN (Gauss-Markov / Jakes) ---")
+    
+    tracked_rates, cold_rates = run_tracking_simulation(config)
+    
+    print(f"\nTrung bình Tracking: {np.mean(tracked_rates):.4f} bps/Hz | "
+          f"Cold start: {np.mean(cold_rates):.4f} bps/Hz")
+    plot_tracking(tracked_rates, cold_rates)
+
+if __name__ == "__main__":
+    run_tracking()